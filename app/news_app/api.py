@@ -1,30 +1,72 @@
 # SPDX-License-Identifier: MIT
+import asyncio
+import math
+from contextlib import asynccontextmanager
 from fastapi.responses import RedirectResponse
-import os
-from fastapi import FastAPI, HTTPException, Query
+from typing import Any, Dict, Optional
+from fastapi import (
+    Depends, FastAPI, Header, HTTPException, Query, Request, Response,
+    WebSocket, WebSocketDisconnect)
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
-import requests
-from .providers import gnews
+import httpx
+from . import (
+    clients, compression, deadline, encoding, metrics, poller, service,
+    streaming, subscriptions)
+from .config import env_float
+from .models import (
+    BatchRequest, BatchResponse, NewsQuery, SubscriptionRequest)
+from .providers import http, keys
+from .providers.breaker import CLOSED, HALF_OPEN, OPEN, CircuitOpen
+from .ratelimit import RateLimited
 
 # Load environment variables
 load_dotenv()
 
+# Encoded and compressed /news bodies, reused while a result stays hot
+responses = compression.ResponseEncoder.from_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the pooled upstream HTTP client and start the topic poller and
+    subscription pushes on startup; stop and close them on shutdown.
+    """
+    await http.startup()
+    app.state.poller = poller.TopicPoller.from_env(service.limiter)
+    if poller.in_app():
+        app.state.poller.start()
+    if subscriptions.in_app():
+        subscriptions.hub.start()
+    try:
+        yield
+    finally:
+        await app.state.poller.stop()
+        drain_timeout = env_float("NEWS_DRAIN_TIMEOUT", 10.0)
+        await subscriptions.hub.stop(drain_timeout)
+        await service.drain(drain_timeout)
+        await http.close()
+        await service.cache.close()
+        await service.store.close()
+        subscriptions.hub.store.close()
+
+
 app = FastAPI(
     title="GNews Fetcher API",
     description="Fetch AI news using GNews.io",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 def get_api_key() -> str:
-    """Get the API key from environment variables."""
-    api_key = os.getenv("GNEWS_API_KEY")
-    if not api_key:
-        raise ValueError(
-            "GNEWS_API_KEY environment variable is required but not set. "
-            "Please configure it in your environment or .env file."
-        )
-    return api_key.strip()
+    """Get the first configured GNews API key (see ``GNEWS_API_KEYS``)."""
+    pool = keys.pool()
+    if not pool.keys:
+        raise ValueError(keys.MISSING_KEY)
+    return pool.keys[0].key
 
 
 @app.get("/")
@@ -38,12 +80,136 @@ async def root():
     return {
         "status": "healthy",
         "message": "GNews Fetcher API is running",
-        "api_key_configured": api_key_configured
+        "api_key_configured": api_key_configured,
+        "http_pool": http.pool_stats(),
+        "cache": service.cache.stats(),
+        "coalescing": service.flights.stats(),
+        "upstream_budget": service.limiter.stats(),
+        "api_keys": keys.pool().stats(),
+        "clients": clients.registry.stats(),
+        "routing": service.providers.stats(),
+        "store": service.store.stats(),
+        "duplicates": service.duplicates.stats(),
+        "compression": responses.stats(),
+        "subscriptions": subscriptions.hub.stats(),
+        "poller": (app.state.poller.stats()
+                   if hasattr(app.state, "poller") else None)
     }
 
 
-@app.get("/news")
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus metrics in the text exposition format."""
+    # Set as a header: starlette appends a second charset to a text/*
+    # media_type even when it carries one already
+    return Response(content=metrics.registry.render(),
+                    headers={"Content-Type": metrics.CONTENT_TYPE})
+
+
+def _service_metrics():
+    """Scrape-time metric families from the service's own counters."""
+    cache = service.cache.stats()
+    if "hits" in cache:
+        yield ("news_cache_lookups_total", "counter",
+               "Response cache lookups by result",
+               [({"result": "hit"}, cache["hits"]),
+                ({"result": "miss"}, cache["misses"])])
+    flights = service.flights.stats()
+    yield ("news_coalesced_calls_in_flight", "gauge",
+           "Upstream lookups shared by concurrent requests",
+           [({}, flights["in_flight"])])
+    yield ("news_coalesced_requests_total", "counter",
+           "Requests that joined another request's upstream lookup",
+           [({}, flights["coalesced"])])
+    budget = service.limiter.stats()
+    yield ("news_upstream_tokens", "gauge",
+           "Upstream calls the rate limiter would admit right now",
+           [({}, budget["tokens"])])
+    if budget["daily_remaining"] is not None:
+        yield ("news_upstream_daily_remaining", "gauge",
+               "Upstream calls left in today's budget",
+               [({}, budget["daily_remaining"])])
+    pool = keys.pool().stats()
+    if pool["keys"]:
+        yield ("news_upstream_key_calls_total", "counter",
+               "Upstream calls per GNews API key (last four characters)",
+               [({"key": usage["key"]}, usage["calls"])
+                for usage in pool["usage"]])
+        yield ("news_upstream_keys_available", "gauge",
+               "GNews API keys neither cooling down nor out of quota",
+               [({}, pool["available"])])
+    accounts = clients.registry.stats()["clients"]
+    if accounts:
+        yield ("news_client_requests_total", "counter",
+               "Client requests by outcome (admitted or throttled)",
+               [({"client": name, "outcome": outcome}, stats[outcome])
+                for name, stats in accounts.items()
+                for outcome in ("admitted", "throttled")])
+    routing = service.providers.stats()["providers"]
+    yield ("news_provider_breaker_state", "gauge",
+           "Circuit breaker state per provider (1 for the current state)",
+           [({"provider": name, "state": state},
+             float(stats["breaker"]["state"] == state))
+            for name, stats in routing.items()
+            for state in (CLOSED, HALF_OPEN, OPEN)])
+
+
+metrics.registry.collector(_service_metrics)
+
+
+async def apply_deadline(
+    x_request_timeout: Optional[float] = Header(
+        None,
+        gt=0,
+        description="Seconds the client will wait; upstream calls and "
+                    "retries stop at this deadline"
+    ),
+) -> None:
+    """
+    Set the request deadline from ``X-Request-Timeout``.
+
+    The header can shorten the configured ``NEWS_REQUEST_TIMEOUT`` but not
+    extend it.
+    """
+    timeout = deadline.default_timeout()
+    if x_request_timeout is not None:
+        timeout = (x_request_timeout if timeout is None
+                   else min(timeout, x_request_timeout))
+    deadline.set_timeout(timeout)
+
+
+async def authenticate(
+    x_api_key: Optional[str] = Header(
+        None,
+        description="Client key, required when NEWS_CLIENTS is configured"
+    ),
+) -> Optional[clients.Client]:
+    """Identify the calling client from ``X-API-Key`` (401 if unknown)."""
+    try:
+        return clients.registry.authenticate(x_api_key)
+    except clients.Unauthorized as e:
+        raise HTTPException(status_code=401, detail=str(e),
+                            headers={"WWW-Authenticate": "ApiKey"})
+
+
+def _admit(client: Optional[clients.Client], cost: int = 1) -> None:
+    """Charge ``cost`` requests to ``client`` (429 when over its rate)."""
+    if client is None:
+        return
+    try:
+        clients.registry.admit(client, cost)
+    except clients.Throttled as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
+
+@app.get("/news", dependencies=[Depends(apply_deadline)])
 async def get_news(
+    request: Request,
+    client: Optional[clients.Client] = Depends(authenticate),
     query: str = Query(
         "latest",
         min_length=1,
@@ -59,9 +225,9 @@ async def get_news(
     ),
     sort_by: str = Query(
         "publishedAt",
-        pattern="^(publishedAt|title)$",
+        pattern="^(publishedAt|title|relevance)$",
         title="Sort by",
-        description='"publishedAt" or "title"'
+        description='"publishedAt", "title" or "relevance"'
     ),
     language: str = Query(
         "en",
@@ -70,6 +236,37 @@ async def get_news(
         title="Language",
         description="Language code, e.g. en"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        title="Cursor",
+        description="next_cursor from a previous response, to read the "
+                    "following page"
+    ),
+    stream: Optional[str] = Query(
+        None,
+        pattern="^(ndjson|sse)$",
+        title="Stream",
+        description='Stream articles as "ndjson" or "sse" events'
+    ),
+    source: str = Query(
+        "upstream",
+        pattern="^(upstream|local|auto)$",
+        title="Source",
+        description='"upstream", "local" (stored articles only) or "auto" '
+                    '(stored articles when upstream fails)'
+    ),
+    since: Optional[str] = Query(
+        None,
+        title="Since",
+        description="Only articles published after this ISO 8601 time, "
+                    "e.g. the newest publishedAt already seen"
+    ),
+    dedupe: bool = Query(
+        False,
+        title="Deduplicate",
+        description="Return one article per story syndicated by several "
+                    "sources"
+    ),
 ):
     """
     Fetch news articles from GNews.io.
@@ -77,29 +274,375 @@ async def get_news(
     Args:
         query: Search query (default: "latest")
         limit: Number of articles to return (1-20)
-        sort_by: Sort by "publishedAt" or "title"
+        sort_by: Sort by "publishedAt", "title" or "relevance"
         language: Language code (default: "en")
+        cursor: Opaque ``next_cursor`` of a previous response; its page
+            size takes precedence over ``limit``
+        stream: "ndjson" or "sse" to stream articles; an ``Accept`` of
+            application/x-ndjson or text/event-stream does the same
+        source: "local" answers from the article store without calling
+            GNews; "auto" falls back to it when GNews cannot answer
+        since: Only return articles published after this timestamp
+        dedupe: Keep the first article of each near-duplicate cluster
 
     Returns:
-        JSON response with articles, total count, and query
+        JSON response with articles, total count, query and
+        ``next_cursor`` (null on the last page). The
+        ``X-Cache-Status`` header is "fresh", "stale", "revalidated" or
+        "local".
+        Streamed responses emit one "article" event per article and a
+        final "end" event with the total and query. JSON responses carry
+        an ``ETag``; a matching ``If-None-Match`` gets an empty 304.
     """
+    _admit(client)
+
     # Ensure API key is present (return 502 if not)
+    if source != "local":
+        try:
+            get_api_key()
+        except ValueError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+
+    page = 1
     try:
-        get_api_key()
+        if cursor:
+            page, limit = service.decode_cursor(cursor)
+        if since is not None:
+            since = service.parse_since(since)
     except ValueError as e:
-        raise HTTPException(status_code=502, detail=str(e))
+        raise HTTPException(status_code=422, detail=str(e))
 
     try:
-        # Use the GNews provider
-        result = gnews.fetch(query, limit, sort_by, language)
-        return result
-    except requests.exceptions.Timeout:
-        raise HTTPException(status_code=504, detail="Request timeout")
+        # Served from the response cache or the GNews provider
+        result = await service.fetch_news(query, limit, sort_by, language,
+                                          page, source, since, dedupe)
     except Exception as e:
-        raise HTTPException(
-            status_code=502,
-            detail=f"Error fetching news: {e}"
+        raise _http_error(e)
+
+    media_type = streaming.negotiate(stream, request.headers.get("accept"))
+    if media_type:
+        return StreamingResponse(
+            streaming.encode_stream(media_type, _article_events(result)),
+            media_type=media_type,
+            headers=_result_headers(result, client)
         )
+    with metrics.stage("encode"):
+        etag = result.etag()
+    headers = {**_result_headers(result, client), "ETag": etag,
+               "Vary": "Accept, Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        # Nothing changed since the client's copy: skip the body entirely
+        return Response(status_code=304, headers=headers)
+    # Without a version the ETag was hashed from the JSON; reuse it
+    return _encoded_response(
+        request, result.body, headers, key=headers["ETag"],
+        json=None if result.version else result.json)
+
+
+def _result_headers(result: service.NewsResult,
+                    client: Optional[clients.Client]) -> Dict[str, str]:
+    """Freshness headers of ``result``, private when a key was required."""
+    headers = result.headers()
+    if client is not None:
+        # A shared cache would otherwise answer callers without a key
+        headers["Cache-Control"] = "private, " + headers["Cache-Control"]
+    return headers
+
+
+def _encoded_response(request: Request, body: Dict[str, Any],
+                      headers: Dict[str, str], formats=None, key=None,
+                      json: Optional[bytes] = None) -> Response:
+    """
+    Send ``body`` in the format and content coding the client accepts.
+
+    Args:
+        formats: Media types the endpoint offers (default: all)
+        key: Cache key of the encoded body, e.g. its ETag
+        json: ``body`` already encoded as JSON
+    """
+    media_type = encoding.negotiate(request.headers.get("accept"),
+                                    formats or encoding.FORMATS)
+    coding = compression.negotiate(request.headers.get("accept-encoding"))
+    with metrics.stage("encode"):
+        content, applied = responses.render(
+            body, media_type, coding, key,
+            json if media_type == encoding.JSON else None)
+    headers = {**headers, "Vary": "Accept, Accept-Encoding"}
+    if applied:
+        headers["Content-Encoding"] = applied
+    return Response(content, media_type=media_type, headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+async def _article_events(result: service.NewsResult):
+    for article in result.body["articles"]:
+        yield "article", article
+    yield "end", {
+        "total": result.body["total"],
+        "query": result.body["query"],
+        "next_cursor": result.body["next_cursor"],
+        "cache_status": result.cache_status
+    }
+
+
+@app.post("/news/batch", response_model=BatchResponse,
+          dependencies=[Depends(apply_deadline)])
+async def get_news_batch(
+    batch: BatchRequest,
+    request: Request,
+    client: Optional[clients.Client] = Depends(authenticate),
+    stream: Optional[str] = Query(
+        None,
+        pattern="^(ndjson|sse)$",
+        title="Stream",
+        description='Stream results as "ndjson" or "sse" events'
+    ),
+):
+    """
+    Fetch news for many queries in one call.
+
+    Queries are fanned out concurrently (bounded by
+    ``NEWS_BATCH_CONCURRENCY``) and identical queries are fetched once.
+    A failing query is reported in its own result item with the status
+    code ``/news`` would have returned, without failing the batch.
+
+    Args:
+        batch: List of query specs, each with the ``/news`` parameters
+        stream: "ndjson" or "sse" to stream results as queries complete
+
+    Returns:
+        JSON response with one result per query, in request order.
+        Streamed responses emit one "result" event per query as soon as it
+        completes (with its ``index`` in the request) and a final "end"
+        event with the counts.
+    """
+    # Each query counts as one request against the client's rate
+    _admit(client, len(batch.queries))
+
+    try:
+        get_api_key()
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+    specs = [(q.query, q.limit, q.sort_by, q.language)
+             for q in batch.queries]
+
+    media_type = streaming.negotiate(stream, request.headers.get("accept"))
+    if media_type:
+        return StreamingResponse(
+            streaming.encode_stream(media_type,
+                                    _batch_events(batch, specs)),
+            media_type=media_type
+        )
+
+    outcomes = await service.fetch_batch(specs)
+    results = [_batch_item(query, outcome)
+               for query, outcome in zip(batch.queries, outcomes)]
+    succeeded = sum(item["status"] == 200 for item in results)
+    # Already in the BatchResponse shape; skip re-validating the articles
+    return _encoded_response(request, {
+        "results": results,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded
+    }, {}, formats=(encoding.JSON, encoding.MSGPACK))
+
+
+async def _batch_events(batch: BatchRequest, specs):
+    succeeded = 0
+    async for index, outcome in service.iter_batch(specs):
+        item = _batch_item(batch.queries[index], outcome)
+        succeeded += item["status"] == 200
+        yield "result", {"index": index, **item}
+    yield "end", {
+        "total": len(specs),
+        "succeeded": succeeded,
+        "failed": len(specs) - succeeded
+    }
+
+
+def _batch_item(query: NewsQuery, outcome) -> Dict[str, Any]:
+    """Wrap a batch outcome (result or exception) as a BatchItem dict."""
+    item = {"request": query.model_dump(), "status": 200, "data": None,
+            "error": None, "cache_status": None}
+    if isinstance(outcome, Exception):
+        error = _http_error(outcome)
+        item.update(status=error.status_code, error=error.detail)
+    else:
+        item.update(data=outcome.body, cache_status=outcome.cache_status)
+    return item
+
+
+def _http_error(e: Exception) -> HTTPException:
+    """Map a service error onto the HTTP error /news responds with."""
+    if isinstance(e, RateLimited):
+        return HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    if isinstance(e, CircuitOpen):
+        return HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    if isinstance(e, httpx.TimeoutException):
+        return HTTPException(status_code=504, detail="Request timeout")
+    return HTTPException(
+        status_code=502,
+        detail=f"Error fetching news: {e}"
+    )
+
+
+@app.post("/subscriptions", status_code=201)
+async def create_subscription(
+    subscription: SubscriptionRequest,
+    client: Optional[clients.Client] = Depends(authenticate),
+):
+    """
+    Subscribe a webhook to new articles about a topic.
+
+    The topic is fetched once per ``NEWS_PUSH_INTERVAL`` for all of its
+    subscribers, and articles not seen before are POSTed to
+    ``callback_url`` as JSON batches: ``{"subscription", "query",
+    "language", "articles"}``. Articles already published when the topic
+    is first fetched are not sent.
+
+    Each call carries ``X-News-Timestamp`` and ``X-News-Signature``, an
+    HMAC-SHA256 of ``"{timestamp}.{body}"`` keyed with the subscription's
+    ``secret``, which receivers should check.
+
+    Returns:
+        The subscription, with the ``id`` used to cancel it and the
+        ``secret``, which is not shown again
+    """
+    _admit(client)
+    try:
+        await subscriptions.hub.check_callback(subscription.callback_url)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except (subscriptions.UnsafeCallback, httpx.ConnectError,
+            httpx.InvalidURL) as e:
+        raise HTTPException(status_code=422,
+                            detail=f"Invalid callback_url: {e}")
+    try:
+        created = subscriptions.hub.subscribe(
+            subscription.query, subscription.language,
+            subscription.callback_url, _owner(client))
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {**created.describe(), "secret": created.secret}
+
+
+def _owner(client: Optional[clients.Client]) -> Optional[str]:
+    return client.name if client is not None else None
+
+
+def _owned_subscription(subscription_id: str,
+                        client: Optional[clients.Client]
+                        ) -> subscriptions.Subscription:
+    """
+    The subscription ``client`` created (404 if it does not exist or
+    belongs to another client, so ids of others are not disclosed).
+    """
+    found = subscriptions.hub.get(subscription_id)
+    if found is None or found.owner != _owner(client):
+        raise HTTPException(status_code=404, detail="Unknown subscription")
+    return found
+
+
+@app.get("/subscriptions/{subscription_id}")
+async def get_subscription(
+    subscription_id: str,
+    client: Optional[clients.Client] = Depends(authenticate),
+):
+    """Delivery counters of a subscription the caller created."""
+    return _owned_subscription(subscription_id, client).describe()
+
+
+@app.delete("/subscriptions/{subscription_id}", status_code=204)
+async def delete_subscription(
+    subscription_id: str,
+    client: Optional[clients.Client] = Depends(authenticate),
+):
+    """Cancel a subscription the caller created."""
+    _owned_subscription(subscription_id, client)
+    if not subscriptions.hub.unsubscribe(subscription_id):
+        raise HTTPException(status_code=404, detail="Unknown subscription")
+    return Response(status_code=204)
+
+
+@app.websocket("/subscriptions/ws")
+async def subscription_socket(
+    websocket: WebSocket,
+    query: str = Query(..., min_length=1),
+    language: str = Query("en", min_length=2, max_length=2),
+    api_key: Optional[str] = Query(
+        None, description="Client key, for clients that cannot send "
+                          "X-API-Key"),
+):
+    """
+    Receive new articles about a topic over a websocket.
+
+    The first message describes the subscription; each following message
+    is a batch like the webhook body. The subscription ends with the
+    connection.
+    """
+    try:
+        client = clients.registry.authenticate(
+            websocket.headers.get("x-api-key") or api_key)
+        if client is not None:
+            clients.registry.admit(client)
+    except clients.Unauthorized:
+        await websocket.close(code=1008)
+        return
+    except clients.Throttled:
+        await websocket.close(code=1013)
+        return
+    try:
+        subscription = subscriptions.hub.subscribe(
+            query, language, owner=_owner(client))
+    except OverflowError:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+
+    async def forward():
+        try:
+            await websocket.send_text(
+                encoding.dumps(subscription.describe()).decode())
+            async for batch in subscriptions.hub.follow(subscription):
+                await websocket.send_text(encoding.dumps(batch).decode())
+        except (WebSocketDisconnect, RuntimeError):
+            # The client left while a batch was being sent
+            return
+
+    async def until_closed():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    tasks = [asyncio.ensure_future(forward()),
+             asyncio.ensure_future(until_closed())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscriptions.hub.unsubscribe(subscription.id)
 
 
 @app.get("/ui", include_in_schema=False)
@@ -109,5 +652,5 @@ def redirect_to_docs():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from .server import main
+    main()
@@ -0,0 +1,43 @@
+# Cache backends package
+# SPDX-License-Identifier: MIT
+import os
+import tempfile
+
+from ..config import env_int
+from .base import CacheBackend
+from .memory import MemoryBackend, TTLCache
+from .redis import RedisBackend
+from .sqlite import SQLiteBackend
+
+__all__ = [
+    "CacheBackend",
+    "MemoryBackend",
+    "RedisBackend",
+    "SQLiteBackend",
+    "TTLCache",
+    "build_backend",
+]
+
+
+def build_backend() -> CacheBackend:
+    """
+    Build the cache backend selected by ``NEWS_CACHE_BACKEND``.
+
+    "memory" (default) is per process, "sqlite" is shared by the workers of
+    one host through ``NEWS_CACHE_PATH``, and "redis" is shared across
+    hosts through ``NEWS_CACHE_REDIS_URL``.
+    """
+    kind = os.getenv("NEWS_CACHE_BACKEND", "memory").strip().lower()
+    max_entries = env_int("NEWS_CACHE_MAX_ENTRIES", 512)
+    max_bytes = env_int("NEWS_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+
+    if kind == "sqlite":
+        path = os.getenv("NEWS_CACHE_PATH") or os.path.join(
+            tempfile.gettempdir(), "gnews-cache.sqlite3")
+        return SQLiteBackend(path, max_entries, max_bytes)
+    if kind == "redis":
+        url = os.getenv("NEWS_CACHE_REDIS_URL", "redis://localhost:6379/0")
+        return RedisBackend(url)
+    if kind != "memory":
+        raise ValueError(f"Unknown NEWS_CACHE_BACKEND: {kind!r}")
+    return MemoryBackend(max_entries, max_bytes)
@@ -0,0 +1,39 @@
+"""
+Cache backend interface.
+
+Backends store opaque byte strings under string keys with a per-entry TTL.
+Callers serialize values themselves (see ``CachedResult.to_bytes`` in
+:mod:`news_app.service`), so the same bytes can be shared by every worker
+process reading an out-of-process backend.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class CacheBackend(ABC):
+    """Async key/value store with per-entry expiry."""
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the live value for ``key`` or None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Drop ``key`` if present."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Drop every entry owned by this backend."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Report hit/miss counters and occupancy for the health endpoint."""
+
+    async def close(self) -> None:
+        """Release connections or file handles held by the backend."""
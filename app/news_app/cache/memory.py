@@ -0,0 +1,135 @@
+"""
+Bounded in-process TTL + LRU cache backend.
+
+Entries expire after a per-entry TTL and are evicted least-recently-used
+first once either the entry count or the byte budget is exceeded. The
+cache lives in one worker process; see :mod:`news_app.cache.sqlite` and
+:mod:`news_app.cache.redis` for backends shared between workers.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .base import CacheBackend
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its expiry time and approximate size in bytes."""
+
+    value: Any
+    expires_at: float
+    size: int
+
+
+class TTLCache:
+    """
+    LRU cache with per-entry TTL, bounded by entry count and byte size.
+
+    Args:
+        ttl: Default time-to-live in seconds for new entries
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total size of entries, as reported to ``set``
+        clock: Monotonic time source (overridable for tests)
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the live value for ``key`` or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, size: int,
+            ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key``, evicting LRU entries as needed."""
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        self._entries[key] = CacheEntry(value, self._clock() + ttl, size)
+        self._bytes += size
+        while (len(self._entries) > self.max_entries
+               or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Drop ``key`` if present."""
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Report hit/miss/eviction counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local backend keeping serialized values in a TTLCache."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self._cache = TTLCache(0.0, max_entries, max_bytes, clock=clock)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, len(value), ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self._cache.stats()}
@@ -0,0 +1,190 @@
+"""
+Redis-protocol cache backend shared across hosts and replicas.
+
+Speaks RESP2 directly over an asyncio stream so it works with Redis,
+Valkey, KeyDB or any local stand-in implementing GET/SET/DEL/SCAN, without
+an extra client dependency. Expiry and memory bounds are left to the
+server (``SET ... PX`` plus the server's ``maxmemory-policy``).
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+from .base import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+Reply = Union[None, int, bytes, List[Any]]
+
+
+class RedisError(Exception):
+    """Error reply returned by the server."""
+
+
+def encode_command(*args: Union[str, bytes, int, float]) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Reply:
+    """Read one RESP2 reply from ``reader``."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload
+    if kind == b"-":
+        raise RedisError(payload.decode(errors="replace"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(payload)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise RedisError(f"Unexpected reply type: {line!r}")
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache stored on a Redis-protocol server.
+
+    Connection failures are logged and treated as cache misses so an
+    unavailable cache never fails a request.
+
+    Args:
+        url: ``redis://[:password@]host[:port][/db]``
+        prefix: Namespace for keys written by this service
+        timeout: Seconds to wait for a connection or a reply
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "gnews:",
+                 timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def execute(self, *args: Union[str, bytes, int, float]) -> Reply:
+        """Send one command and return its reply."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Streams and locks are bound to the loop that created them
+            self._drop_connection()
+            self._loop = loop
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(self._roundtrip(args),
+                                              self.timeout)
+            except asyncio.IncompleteReadError as e:
+                self._drop_connection()
+                raise ConnectionError("Connection closed by server") from e
+            except RedisError:
+                # The error reply was read whole; the stream is in step
+                raise
+            except BaseException:
+                # Timeouts, I/O errors and cancellation may leave a reply
+                # unread on the stream, where the next command would read
+                # it as its own
+                self._drop_connection()
+                raise
+
+    async def _roundtrip(self, args: tuple) -> Reply:
+        if self._writer is None or self._writer.is_closing():
+            await self._connect()
+        self._writer.write(encode_command(*args))
+        await self._writer.drain()
+        return await read_reply(self._reader)
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port)
+        if self.password:
+            self._writer.write(encode_command("AUTH", self.password))
+            await read_reply(self._reader)
+        if self.db:
+            self._writer.write(encode_command("SELECT", self.db))
+            await read_reply(self._reader)
+
+    def _drop_connection(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self.execute("GET", self.prefix + key)
+        except (OSError, RedisError) as e:
+            self.errors += 1
+            logger.warning("Redis cache GET failed: %s", e)
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ttl_ms = max(int(ttl * 1000), 1)
+        try:
+            await self.execute("SET", self.prefix + key, value, "PX", ttl_ms)
+        except (OSError, RedisError) as e:
+            self.errors += 1
+            logger.warning("Redis cache SET failed: %s", e)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.execute("DEL", self.prefix + key)
+        except (OSError, RedisError) as e:
+            self.errors += 1
+            logger.warning("Redis cache DEL failed: %s", e)
+
+    async def clear(self) -> None:
+        cursor = b"0"
+        while True:
+            cursor, keys = await self.execute(
+                "SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 500)
+            if keys:
+                await self.execute("DEL", *keys)
+            if cursor == b"0":
+                break
+        self.hits = self.misses = self.errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    async def close(self) -> None:
+        self._drop_connection()
@@ -0,0 +1,196 @@
+"""
+SQLite cache backend shared by the worker processes of one host.
+
+The database runs in WAL mode so readers in one worker never block a
+writer in another. Expiry uses wall-clock time because monotonic clocks
+are not comparable between processes. Statements run in a worker thread,
+since another worker holding the write lock can keep one waiting for up to
+the busy timeout.
+
+Hits only note the access time in memory; the notes are written in one
+batch every ``touch_batch`` hits and before each eviction pass. Entry count
+and total size are kept up to date by triggers in a one-row table, so
+eviction never scans the cache to learn whether it is over budget.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .base import CacheBackend
+
+_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS news_cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS news_cache_accessed
+    ON news_cache (accessed_at);
+CREATE INDEX IF NOT EXISTS news_cache_expires
+    ON news_cache (expires_at);
+
+CREATE TABLE IF NOT EXISTS news_cache_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO news_cache_totals
+    SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM news_cache;
+CREATE TRIGGER IF NOT EXISTS news_cache_ai AFTER INSERT ON news_cache BEGIN
+    UPDATE news_cache_totals
+    SET entries = entries + 1, bytes = bytes + new.size;
+END;
+CREATE TRIGGER IF NOT EXISTS news_cache_ad AFTER DELETE ON news_cache BEGIN
+    UPDATE news_cache_totals
+    SET entries = entries - 1, bytes = bytes - old.size;
+END;
+CREATE TRIGGER IF NOT EXISTS news_cache_au AFTER UPDATE OF size
+    ON news_cache BEGIN
+    UPDATE news_cache_totals SET bytes = bytes - old.size + new.size;
+END;
+COMMIT;
+"""
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    LRU + TTL cache stored in a SQLite database file.
+
+    Args:
+        path: Database file; every worker pointing at it shares entries
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total size of stored values
+        clock: Wall-clock time source (overridable for tests)
+        touch_batch: Hits noted in memory before their access times are
+            written
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int,
+                 clock: Callable[[], float] = time.time,
+                 touch_batch: int = 100):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.touch_batch = touch_batch
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0,
+                                     check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._touched: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM news_cache WHERE key = ?",
+                (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._write_touches()
+            self.hits += 1
+        return bytes(row[0])
+
+    def _write_touches(self) -> None:
+        """Write the access times noted since the last batch."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE news_cache SET accessed_at = MAX(accessed_at, ?) "
+                "WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()])
+            self._touched.clear()
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if len(value) > self.max_bytes or self.max_entries <= 0:
+            return
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        now = self._clock()
+        with self._lock:
+            # An upsert, unlike REPLACE, fires the triggers keeping totals
+            self._conn.execute(
+                "INSERT INTO news_cache "
+                "(key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                "size = excluded.size, expires_at = excluded.expires_at, "
+                "accessed_at = excluded.accessed_at",
+                (key, sqlite3.Binary(value), len(value), now + ttl, now))
+            self._evict(now)
+
+    def _totals(self) -> Tuple[int, int]:
+        return self._conn.execute(
+            "SELECT entries, bytes FROM news_cache_totals").fetchone()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least recently used ones over budget."""
+        self._conn.execute(
+            "DELETE FROM news_cache WHERE expires_at <= ?", (now,))
+        count, total = self._totals()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        self._write_touches()
+        victims = []
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM news_cache ORDER BY accessed_at"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany(
+            "DELETE FROM news_cache WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute,
+                                "DELETE FROM news_cache WHERE key = ?", key)
+
+    def _execute(self, sql: str, *params: Any) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM news_cache")
+        with self._lock:
+            self._touched.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._totals()
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "entries": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    async def close(self) -> None:
+        with self._lock:
+            self._write_touches()
+            self._conn.close()
@@ -0,0 +1,187 @@
+"""
+Client authentication and per-client quotas.
+
+Clients listed in ``NEWS_CLIENTS`` call the API with their key in the
+``X-API-Key`` header. Each gets a token bucket of requests per second,
+checked before any work is done, so a noisy client is answered 429 instead
+of slowing everyone else down. Its upstream calls are queued under the
+client's weight (see :class:`news_app.ratelimit.FairQueue`), so when the
+GNews quota is contended each client gets its share of it.
+
+Buckets are kept in the quota file shared by the workers of a host when
+``NEWS_LIMITER_PATH`` is set. Without ``NEWS_CLIENTS`` the API stays open
+and unthrottled, as before.
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from . import ratelimit
+from .config import env_float, env_int
+from .ratelimit import QuotaFile, SharedTokenBucket, TokenBucket
+
+
+@dataclass
+class Client:
+    """An API client, its key and its share of the service."""
+
+    name: str
+    key: str
+    rate: float = 5.0
+    weight: float = 1.0
+
+
+def parse_clients(spec: str, default_rate: float = 5.0) -> List[Client]:
+    """
+    Parse ``name:key[:rate[:weight]]`` entries separated by commas. A rate
+    of 0 leaves the client unthrottled.
+
+    Example: ``"dashboard:s3cret:10:2, batch-job:t0ken:1"``
+
+    Raises:
+        ValueError: If an entry has no key or a rate or weight is invalid
+    """
+    clients = []
+    for entry in spec.split(","):
+        parts = [part.strip() for part in entry.split(":")]
+        if not parts[0]:
+            continue
+        if len(parts) < 2 or not parts[1]:
+            raise ValueError(f"Missing key for client {parts[0]!r}")
+        rate, weight = default_rate, 1.0
+        try:
+            if len(parts) > 2 and parts[2]:
+                rate = float(parts[2])
+            if len(parts) > 3 and parts[3]:
+                weight = float(parts[3])
+        except ValueError:
+            rate = weight = -1.0
+        if rate < 0 or weight <= 0:
+            raise ValueError(
+                f"Invalid rate or weight for client {parts[0]!r}")
+        clients.append(Client(parts[0], parts[1], rate, weight))
+    return clients
+
+
+class Unauthorized(Exception):
+    """The request carries no valid client key."""
+
+
+class Throttled(Exception):
+    """A client sent requests faster than its rate."""
+
+    def __init__(self, client: str, retry_after: float):
+        super().__init__(f"Request rate of client {client!r} exceeded, "
+                         f"retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def _digest(key: str) -> bytes:
+    # Lookups by digest take the same time whatever prefix of a key matches
+    return hashlib.sha256(key.encode()).digest()
+
+
+class ClientRegistry:
+    """
+    Known clients and their request buckets.
+
+    Args:
+        clients: Clients allowed to call the API; none leaves it open
+        burst: Requests a client may send at once above its rate
+        quota: Shared quota file holding the buckets, if any
+    """
+
+    def __init__(self, clients: List[Client], burst: int = 20,
+                 quota: Optional[QuotaFile] = None):
+        self.clients = clients
+        self._by_key = {_digest(client.key): client for client in clients}
+        self._buckets: Dict[str, TokenBucket] = {}
+        for client in clients:
+            if quota is not None:
+                self._buckets[client.name] = SharedTokenBucket(
+                    quota, client.rate, burst, name=f"client:{client.name}")
+            else:
+                self._buckets[client.name] = TokenBucket(client.rate, burst)
+        # Buckets start as they are; a shared one may hold other workers'
+        # recent requests
+        self.admitted: Dict[str, int] = {}
+        self.throttled: Dict[str, int] = {}
+        self.unauthorized = 0
+
+    @classmethod
+    def from_env(cls) -> "ClientRegistry":
+        """
+        Build the registry from ``NEWS_CLIENTS``, ``NEWS_CLIENT_RATE``
+        (default requests/second per client, 5), ``NEWS_CLIENT_BURST``
+        (20) and ``NEWS_LIMITER_PATH``.
+        """
+        clients = parse_clients(os.getenv("NEWS_CLIENTS", ""),
+                                env_float("NEWS_CLIENT_RATE", 5.0))
+        path = os.getenv("NEWS_LIMITER_PATH")
+        return cls(clients, env_int("NEWS_CLIENT_BURST", 20),
+                   QuotaFile(path) if path and clients else None)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.clients)
+
+    def authenticate(self, key: Optional[str]) -> Optional[Client]:
+        """
+        The client owning ``key``; None when authentication is off.
+
+        Raises:
+            Unauthorized: If clients are configured and ``key`` is unknown
+        """
+        if not self.enabled:
+            return None
+        client = self._by_key.get(_digest(key)) if key else None
+        if client is None:
+            self.unauthorized += 1
+            raise Unauthorized("Missing or invalid X-API-Key")
+        return client
+
+    def admit(self, client: Client, cost: int = 1) -> None:
+        """
+        Take ``cost`` requests from the client's bucket and charge its
+        upstream calls to it.
+
+        Raises:
+            Throttled: If the client is over its request rate
+        """
+        bucket = self._buckets[client.name]
+        # A batch larger than the burst still gets through once refilled
+        wait = bucket.try_acquire(min(cost, bucket.burst))
+        if wait:
+            self.throttled[client.name] = (
+                self.throttled.get(client.name, 0) + 1)
+            raise Throttled(client.name, wait)
+        self.admitted[client.name] = self.admitted.get(client.name, 0) + 1
+        ratelimit.charge_to(client.name, client.weight)
+
+    def reset(self) -> None:
+        """Refill every bucket and reset counters (used by tests)."""
+        for bucket in self._buckets.values():
+            bucket.reset()
+        self.admitted: Dict[str, int] = {}
+        self.throttled: Dict[str, int] = {}
+        self.unauthorized = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "unauthorized": self.unauthorized,
+            "clients": {
+                client.name: {
+                    "rate_per_second": client.rate,
+                    "weight": client.weight,
+                    "tokens": round(self._buckets[client.name].tokens, 2),
+                    "admitted": self.admitted.get(client.name, 0),
+                    "throttled": self.throttled.get(client.name, 0),
+                }
+                for client in self.clients
+            },
+        }
+
+
+registry = ClientRegistry.from_env()
@@ -0,0 +1,163 @@
+"""
+Negotiated response compression.
+
+Bodies of at least ``NEWS_COMPRESS_MIN_BYTES`` are compressed with the best
+coding the client accepts in ``Accept-Encoding``: zstd (needs
+``zstandard``), brotli (needs ``brotli``) or gzip. Smaller bodies are sent
+as they are, since compressing them saves less than it costs.
+
+Encoded representations of /news results are kept in a byte-bounded LRU
+keyed by the result's ETag, format and coding, so a hot result is encoded
+and compressed once per worker however often it is served.
+"""
+import gzip
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from . import encoding
+from .config import env_int
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional coding
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional coding
+    zstandard = None
+
+
+def _gzip(data: bytes) -> bytes:
+    # A fixed mtime keeps equal bodies byte-identical
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+# Installed codings, most preferred first
+CODECS: Dict[str, Callable[[bytes], bytes]] = {}
+if zstandard is not None:
+    CODECS["zstd"] = zstandard.ZstdCompressor(level=3).compress
+if brotli is not None:
+    CODECS["br"] = lambda data: brotli.compress(data, quality=5)
+CODECS["gzip"] = _gzip
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding for an ``Accept-Encoding`` header.
+
+    Returns:
+        The installed coding with the highest quality value (ties go to
+        the better compressor), or None to send the body uncompressed
+    """
+    if not accept_encoding:
+        return None
+    quality: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, param = item.partition(";")
+        q = 1.0
+        name, _, value = param.partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        quality[coding.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for coding in CODECS:
+        q = quality.get(coding, quality.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class ResponseEncoder:
+    """
+    Encode and compress response bodies, caching hot representations.
+
+    Args:
+        min_size: Smallest encoded body worth compressing, in bytes
+        cache_bytes: Total size of cached representations (0 disables)
+    """
+
+    def __init__(self, min_size: int = 1024, cache_bytes: int = 16 << 20):
+        self.min_size = min_size
+        self.cache_bytes = cache_bytes
+        self.clear()
+
+    @classmethod
+    def from_env(cls) -> "ResponseEncoder":
+        """
+        Build the encoder from ``NEWS_COMPRESS_MIN_BYTES`` (1024) and
+        ``NEWS_COMPRESS_CACHE_MB`` (16).
+        """
+        return cls(min_size=env_int("NEWS_COMPRESS_MIN_BYTES", 1024),
+                   cache_bytes=env_int("NEWS_COMPRESS_CACHE_MB", 16) << 20)
+
+    def render(self, body: Dict[str, Any], media_type: str,
+               coding: Optional[str], key: Optional[Hashable] = None,
+               encoded: Optional[bytes] = None
+               ) -> Tuple[bytes, Optional[str]]:
+        """
+        Encode ``body`` as ``media_type`` and compress it with ``coding``.
+
+        Args:
+            body: Response body
+            media_type: Format from :func:`news_app.encoding.negotiate`
+            coding: Coding from :func:`negotiate`, None for none
+            key: Identifies the body (e.g. its ETag) to cache the result
+            encoded: ``body`` already encoded as ``media_type``, if at hand
+
+        Returns:
+            The bytes to send and the coding applied (None if the body
+            was too small to compress)
+        """
+        cache_key = (key, media_type, coding) if key is not None else None
+        if cache_key is not None:
+            hit = self._cache.get(cache_key)
+            if hit is not None:
+                self._cache.move_to_end(cache_key)
+                self.hits += 1
+                return hit
+        if encoded is None:
+            encoded = encoding.encode(body, media_type)
+        if coding is None or len(encoded) < self.min_size:
+            rendered = (encoded, None)
+        else:
+            rendered = (CODECS[coding](encoded), coding)
+            self.compressed += 1
+        if cache_key is not None:
+            self.misses += 1
+            self._remember(cache_key, rendered)
+        return rendered
+
+    def _remember(self, key: Hashable,
+                  rendered: Tuple[bytes, Optional[str]]) -> None:
+        size = len(rendered[0])
+        if size > self.cache_bytes:
+            return
+        self._cache[key] = rendered
+        self._size += size
+        while self._size > self.cache_bytes:
+            _, (data, _) = self._cache.popitem(last=False)
+            self._size -= len(data)
+
+    def clear(self) -> None:
+        self._cache: "OrderedDict[Hashable, Tuple[bytes, Optional[str]]]" = (
+            OrderedDict())
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.compressed = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "codings": list(CODECS),
+            "min_size": self.min_size,
+            "cached": len(self._cache),
+            "cached_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "compressed": self.compressed,
+        }
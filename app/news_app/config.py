@@ -0,0 +1,45 @@
+"""
+Environment-driven settings helpers.
+
+Every tunable in the service is read from an environment variable (see
+``.env.sample``); malformed values fall back to the documented default
+instead of failing at import time.
+"""
+import os
+from typing import List
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back on errors."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back on errors."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean flag ("1", "true", "yes", "on") from the environment."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_list(name: str) -> List[str]:
+    """Read a comma-separated setting, dropping blanks around and between."""
+    return [item.strip() for item in os.getenv(name, "").split(",")
+            if item.strip()]
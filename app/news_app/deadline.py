@@ -0,0 +1,57 @@
+"""
+End-to-end request deadlines.
+
+A deadline is set once per request, from the client's ``X-Request-Timeout``
+header or ``NEWS_REQUEST_TIMEOUT``, and carried in a context variable. Every
+await below the route (quota admission, provider calls, retry backoff) can
+then check how much of the caller's time is left without threading it
+through each signature. Tasks copy the context they are created in, so work
+spawned for a request inherits its deadline.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+import httpx
+
+from .config import env_float
+
+_deadline: ContextVar[Optional[float]] = ContextVar("news_deadline",
+                                                    default=None)
+
+
+def default_timeout() -> Optional[float]:
+    """Configured request timeout in seconds (``NEWS_REQUEST_TIMEOUT``)."""
+    timeout = env_float("NEWS_REQUEST_TIMEOUT", 15.0)
+    return timeout if timeout > 0 else None
+
+
+def set_timeout(seconds: Optional[float]) -> None:
+    """Give the current context ``seconds`` from now; None clears it."""
+    _deadline.set(None if seconds is None else time.monotonic() + seconds)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline (may be negative), or None."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def cap(timeout: float) -> float:
+    """Shorten ``timeout`` to the time left before the deadline."""
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+
+def check() -> None:
+    """
+    Raise if the deadline has passed.
+
+    Raises:
+        httpx.TimeoutException: If no time is left
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise httpx.TimeoutException("Request timeout")
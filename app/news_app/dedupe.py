@@ -0,0 +1,199 @@
+"""
+Near-duplicate detection for syndicated stories.
+
+The same wire story is often published by many sources with slightly
+different titles. Each article's title and description are reduced to a
+set of words, summarized by a MinHash signature, and clustered with
+banded locality-sensitive hashing: articles sharing any band are compared
+by estimated Jaccard similarity, and one at or above the threshold joins
+the earlier article's cluster. Only the first article of each cluster is
+kept in the bands, and each band bucket holds at most ``bucket_size`` of
+them, so ingesting an article costs a bounded number of comparisons
+however many copies of a story arrive, and clustering scales linearly
+with volume.
+"""
+import hashlib
+import random
+import re
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+from .config import env_float, env_int
+
+Signature = Tuple[int, ...]
+
+_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+
+def shingles(article: Dict[str, Any]) -> FrozenSet[str]:
+    """Words of the title and description, minus a trailing " - Source"."""
+    title = article.get("title") or ""
+    source = article.get("source") or ""
+    if source and title.endswith(f" - {source}"):
+        title = title[:-len(source) - 3]
+    text = f"{title} {article.get('description') or ''}".lower()
+    return frozenset(_WORD.findall(text))
+
+
+def _key(article: Dict[str, Any]) -> str:
+    return article.get("url") or article.get("title") or ""
+
+
+class MinHasher:
+    """
+    MinHash signatures from ``num_perm`` universal hash permutations.
+
+    Args:
+        num_perm: Signature length
+        seed: Seed of the permutation parameters (fixed so signatures are
+            comparable across processes)
+    """
+
+    def __init__(self, num_perm: int = 32, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME))
+                       for _ in range(num_perm)]
+
+    def signature(self, words: FrozenSet[str]) -> Signature:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(w.encode(), digest_size=8)
+                           .digest(), "big")
+            for w in words
+        ]
+        if not hashes:
+            return ()
+        return tuple(min((a * h + b) % _PRIME for h in hashes)
+                     for a, b in self._perms)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or not b:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class DuplicateIndex:
+    """
+    Streaming near-duplicate clustering over recently seen articles.
+
+    Each cluster is named after the URL of its first article, which is
+    also its representative: later articles are compared with
+    representatives only, and members just remember their cluster.
+
+    Args:
+        threshold: Estimated Jaccard similarity that makes a duplicate
+        num_perm: MinHash signature length
+        bands: LSH bands (``num_perm`` must be divisible by it); more
+            bands find less similar candidates
+        capacity: Articles remembered; the oldest are forgotten first
+        bucket_size: Representatives kept per band bucket; the oldest
+            are dropped first
+    """
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 32,
+                 bands: int = 8, capacity: int = 20000,
+                 bucket_size: int = 64):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.capacity = capacity
+        self.bucket_size = max(bucket_size, 1)
+        self._hasher = MinHasher(num_perm)
+        self.clear()
+
+    @classmethod
+    def from_env(cls) -> "DuplicateIndex":
+        """
+        Build the index from ``NEWS_DEDUPE_THRESHOLD`` (0.6) and
+        ``NEWS_DEDUPE_CAPACITY`` (20000).
+        """
+        return cls(threshold=env_float("NEWS_DEDUPE_THRESHOLD", 0.6),
+                   capacity=env_int("NEWS_DEDUPE_CAPACITY", 20000))
+
+    def _band_keys(self, signature: Signature) -> List[Tuple[int, Signature]]:
+        rows = self.rows
+        return [(band, signature[band * rows:(band + 1) * rows])
+                for band in range(self.bands)]
+
+    def assign(self, article: Dict[str, Any]) -> str:
+        """
+        Ingest an article and return its cluster id.
+
+        Articles already seen (by URL) keep their cluster.
+        """
+        url = _key(article)
+        entry = self._entries.get(url)
+        if entry is not None:
+            return entry[1]
+
+        signature = self._hasher.signature(shingles(article))
+        keys = self._band_keys(signature) if signature else []
+        candidates = set()
+        for key in keys:
+            candidates.update(self._buckets.get(key, ()))
+        cluster, best = url, self.threshold
+        for other in candidates:
+            score = similarity(signature, self._entries[other][0])
+            if score >= best:
+                cluster, best = other, score
+
+        if cluster != url:
+            self.duplicates += 1
+            # Members are never compared, so their signature is not kept
+            self._entries[url] = ((), cluster)
+        else:
+            self._entries[url] = (signature, url)
+            for key in keys:
+                bucket = self._buckets[key]
+                bucket[url] = None
+                if len(bucket) > self.bucket_size:
+                    del bucket[next(iter(bucket))]
+        if len(self._entries) > self.capacity:
+            self._forget_oldest()
+        return cluster
+
+    def _forget_oldest(self) -> None:
+        url, (signature, _) = self._entries.popitem(last=False)
+        for key in self._band_keys(signature) if signature else []:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.pop(url, None)
+                if not bucket:
+                    del self._buckets[key]
+
+    def dedupe(self, articles: List[Dict[str, Any]]
+               ) -> List[Dict[str, Any]]:
+        """Keep the first article of each cluster, in order."""
+        seen = set()
+        unique = []
+        for article in articles:
+            cluster = self.assign(article)
+            if cluster not in seen:
+                seen.add(cluster)
+                unique.append(article)
+        return unique
+
+    def originals(self, articles: List[Dict[str, Any]]
+                  ) -> List[Dict[str, Any]]:
+        """Ingest ``articles`` and keep those heading their own cluster."""
+        return [a for a in articles if self.assign(a) == _key(a)]
+
+    def clear(self) -> None:
+        self._entries: "OrderedDict[str, Tuple[Signature, str]]" = (
+            OrderedDict())
+        # Insertion-ordered, so a full bucket drops its oldest first
+        self._buckets: Dict[Tuple[int, Signature], Dict[str, None]] = (
+            defaultdict(dict))
+        self.duplicates = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "articles": len(self._entries),
+            "duplicates": self.duplicates,
+            "threshold": self.threshold,
+        }
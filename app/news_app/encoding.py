@@ -0,0 +1,131 @@
+"""
+Response body formats.
+
+Response bodies are plain dicts, lists and strings, so they are encoded
+straight to bytes instead of going through FastAPI's generic
+``jsonable_encoder``, which walks and copies every value first. JSON uses
+orjson when installed, otherwise the stdlib encoder with the same compact
+output as FastAPI's ``JSONResponse``.
+
+Clients may ask for a compact binary format through ``Accept`` when the
+optional package is installed: MessagePack (``application/msgpack``, needs
+``msgpack``) or an Arrow IPC stream of the articles
+(``application/vnd.apache.arrow.stream``, needs ``pyarrow``) for analytics
+consumers. Anything else gets JSON.
+"""
+import json
+from typing import Any, Dict, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional format
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - optional format
+    pyarrow = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+FORMATS = (JSON, MSGPACK, ARROW)
+
+# Also accepted in Accept for MessagePack
+_ALIASES = {"application/x-msgpack": MSGPACK}
+
+ARTICLE_COLUMNS = ("title", "url", "description", "source", "publishedAt",
+                   "urlToImage")
+
+_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False,
+                            check_circular=False, separators=(",", ":"))
+
+
+def dumps(value: Any) -> bytes:
+    """Encode JSON-native ``value`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _encoder.encode(value).encode()
+
+
+def available(media_type: str) -> bool:
+    """Whether the package needed for ``media_type`` is installed."""
+    if media_type == MSGPACK:
+        return msgpack is not None
+    if media_type == ARROW:
+        return pyarrow is not None
+    return media_type == JSON
+
+
+def negotiate(accept: Optional[str],
+              formats: Sequence[str] = FORMATS) -> str:
+    """
+    Pick the body format for an ``Accept`` header.
+
+    Args:
+        accept: The request ``Accept`` header
+        formats: Formats the endpoint can produce, most preferred first
+
+    Returns:
+        The installed format with the highest quality value, JSON when
+        nothing else is acceptable
+    """
+    if not accept:
+        return JSON
+    quality: Dict[str, float] = {}
+    for media_range in accept.split(","):
+        media_type, *params = media_range.split(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality[_ALIASES.get(media_type, media_type)] = q
+
+    best, best_q = JSON, 0.0
+    for media_type in formats:
+        if not available(media_type):
+            continue
+        q = quality.get(media_type,
+                        quality.get(media_type.split("/")[0] + "/*",
+                                    quality.get("*/*", 0.0)))
+        if q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def encode(body: Dict[str, Any], media_type: str = JSON) -> bytes:
+    """
+    Encode a response body in ``media_type``.
+
+    Arrow streams hold the ``articles`` as a table of string columns; the
+    other top-level fields are JSON-encoded schema metadata.
+    """
+    if media_type == MSGPACK:
+        return msgpack.packb(body)
+    if media_type == ARROW:
+        return _arrow_stream(body)
+    return dumps(body)
+
+
+def _arrow_stream(body: Dict[str, Any]) -> bytes:
+    metadata = {key: dumps(value) for key, value in body.items()
+                if key != "articles"}
+    schema = pyarrow.schema(
+        [(column, pyarrow.string()) for column in ARTICLE_COLUMNS],
+        metadata=metadata)
+    table = pyarrow.Table.from_pylist(body["articles"], schema=schema)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,302 @@
+"""
+Prometheus metrics and per-request stage timings.
+
+A minimal in-process implementation of labelled counters, gauges and
+histograms, rendered in the Prometheus text exposition format (0.0.4) on
+``/metrics``. Values already tracked elsewhere (cache, coalescing,
+breakers, quota) are read by collectors at scrape time instead of being
+counted twice.
+
+Code running under ``with stage("upstream"):`` adds its duration to the
+current request's timings, which :class:`MetricsMiddleware` sends as a
+``Server-Timing`` header together with the total time.
+"""
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Sequence, Tuple)
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (sub-millisecond) to slow upstream calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+
+# (name, type, help, [(labels, value), ...]) as produced by collectors
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = (str(value).replace("\\", "\\\\").replace("\n", "\\n")
+                 .replace('"', '\\"'))
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.reset()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def reset(self) -> None:
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield (f"{self.name}{_format_labels(self._labels(key))} "
+                   f"{_format_value(value)}")
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. requests served."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. requests in flight."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, help, labels)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # Per-bucket counts, then sum and count
+            series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self) -> Iterator[str]:
+        for key, series in sorted(self._values.items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket = {**labels, "le": _format_value(bound)}
+                yield (f"{self.name}_bucket{_format_labels(bucket)} "
+                       f"{cumulative}")
+            yield (f"{self.name}_sum{_format_labels(labels)} "
+                   f"{_format_value(series[-2])}")
+            yield f"{self.name}_count{_format_labels(labels)} {series[-1]}"
+
+
+class Registry:
+    """Metrics and scrape-time collectors rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str,
+                labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str,
+              labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], Iterable[Family]]) -> None:
+        """Register a callable yielding metric families at scrape time."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} "
+                                 f"{_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Zero every metric (used by tests)."""
+        for metric in self._metrics:
+            metric.reset()
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    "news_http_requests_total", "HTTP requests by route, method and status",
+    ("route", "method", "status"))
+REQUEST_SECONDS = registry.histogram(
+    "news_http_request_duration_seconds", "HTTP request latency by route",
+    ("route",))
+IN_FLIGHT = registry.gauge(
+    "news_http_requests_in_flight", "HTTP requests being served by route",
+    ("route",))
+RESULTS = registry.counter(
+    "news_results_total",
+    "News results served by cache status (fresh and stale are hits)",
+    ("cache_status",))
+PROVIDER_CALLS = registry.counter(
+    "news_provider_calls_total",
+    "Provider calls by outcome (ok, error or cancelled)",
+    ("provider", "outcome"))
+PROVIDER_SECONDS = registry.histogram(
+    "news_provider_call_duration_seconds", "Provider call latency",
+    ("provider",))
+PROVIDER_IN_FLIGHT = registry.gauge(
+    "news_provider_calls_in_flight", "Provider calls awaiting an answer",
+    ("provider",))
+UPSTREAM_RESPONSES = registry.counter(
+    "news_upstream_responses_total",
+    "Upstream HTTP responses by host and status code (or timeout/error)",
+    ("host", "code"))
+PUSHES = registry.counter(
+    "news_push_deliveries_total",
+    "Batches pushed to subscribers by transport and outcome (ok, retried, "
+    "failed, refused or dropped)",
+    ("transport", "outcome"))
+
+
+# Stage durations of the current request, in seconds
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "news_stage_timings", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the time spent in the block to the request's ``name`` stage."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def detach() -> None:
+    """Stop recording stages, for work outliving the current request."""
+    _timings.set(None)
+
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    """Format stage timings as a ``Server-Timing`` header value."""
+    entries = [f"{name};dur={seconds * 1000:.1f}"
+               for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def route_of(scope: Dict[str, Any]) -> str:
+    """Path template of the route matching ``scope``; "other" if none."""
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "other"
+
+
+class MetricsMiddleware:
+    """
+    Count requests, time them per route and send ``Server-Timing``.
+
+    Pure ASGI middleware, so stage timings recorded by the endpoint share
+    its context.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = route_of(scope)
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(
+                    timings, time.perf_counter() - start))
+            await send(message)
+
+        IN_FLIGHT.inc(route=route)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            IN_FLIGHT.dec(route=route)
+            REQUESTS.inc(route=route, method=scope["method"],
+                         status=str(status))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route=route)
+            _timings.reset(token)
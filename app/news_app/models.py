@@ -0,0 +1,56 @@
+"""
+Request and response models shared by the API routes.
+"""
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class NewsQuery(BaseModel):
+    """One /news query; fields and limits mirror the GET parameters."""
+
+    query: str = Field("latest", min_length=1,
+                       description="Search term for news")
+    limit: int = Field(20, ge=1, le=20,
+                       description="Number of articles to return (1–20)")
+    sort_by: str = Field("publishedAt",
+                         pattern="^(publishedAt|title|relevance)$",
+                         description='"publishedAt", "title" or "relevance"')
+    language: str = Field("en", min_length=2, max_length=2,
+                          description="Language code, e.g. en")
+
+
+class BatchRequest(BaseModel):
+    """Body of ``POST /news/batch``."""
+
+    queries: List[NewsQuery] = Field(..., min_length=1, max_length=50)
+
+
+class BatchItem(BaseModel):
+    """Outcome of one query in a batch: either ``data`` or ``error``."""
+
+    request: NewsQuery
+    status: int
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cache_status: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Body returned by ``POST /news/batch``, one item per input query."""
+
+    results: List[BatchItem]
+    total: int
+    succeeded: int
+    failed: int
+
+
+class SubscriptionRequest(BaseModel):
+    """Body of ``POST /subscriptions``."""
+
+    query: str = Field(..., min_length=1, description="Topic to follow")
+    language: str = Field("en", min_length=2, max_length=2,
+                          description="Language code, e.g. en")
+    callback_url: str = Field(..., pattern="^https?://",
+                              description="Webhook receiving new articles "
+                                          "as JSON POSTs")
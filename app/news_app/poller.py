@@ -0,0 +1,229 @@
+"""
+Background poller keeping standing topics warm.
+
+Topics listed in ``NEWS_POLL_TOPICS`` are fetched on a schedule so the
+response cache and the article store already hold them when clients ask.
+The poller runs inside the API's lifespan, or as a separate worker
+(``python -m news_app.poller``) next to API workers sharing a cache
+backend and article store.
+
+Polling is fitted to the upstream quota: intervals are stretched until the
+topics use at most ``NEWS_POLL_BUDGET_SHARE`` of the per-second rate and
+of the daily budget, first polls are spread evenly over the shortest
+interval, and consecutive polls keep a minimum gap so they never burst.
+"""
+import asyncio
+import heapq
+import logging
+import os
+import signal
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from . import service
+from .config import env_bool, env_float
+from .providers import http
+from .ratelimit import RateLimited, UpstreamLimiter
+
+logger = logging.getLogger(__name__)
+
+# Topics are fetched at the largest page size so every /news limit is
+# served from the warmed entry
+POLL_LIMIT = 20
+
+
+@dataclass
+class Topic:
+    """A standing (query, language) topic and its polling interval."""
+
+    query: str
+    language: str = "en"
+    interval: float = 300.0
+
+
+def parse_topics(spec: str, default_interval: float = 300.0) -> List[Topic]:
+    """
+    Parse ``query[:language[:seconds]]`` entries separated by commas.
+
+    Example: ``"AI:en:120, climate change::600, elections:de"``
+
+    Raises:
+        ValueError: If an interval is not a positive number
+    """
+    topics = []
+    for entry in spec.split(","):
+        parts = [part.strip() for part in entry.split(":")]
+        if not parts[0]:
+            continue
+        language = parts[1] if len(parts) > 1 and parts[1] else "en"
+        interval = default_interval
+        if len(parts) > 2 and parts[2]:
+            try:
+                interval = float(parts[2])
+            except ValueError:
+                interval = 0.0
+        if interval <= 0:
+            raise ValueError(f"Invalid poll interval in {entry.strip()!r}")
+        topics.append(Topic(parts[0], language, interval))
+    return topics
+
+
+class TopicPoller:
+    """
+    Fetch topics on a schedule fitted to the upstream quota.
+
+    Args:
+        topics: Topics to keep warm
+        limiter: Upstream limiter whose rate and daily budget polling must
+            fit into (None to poll at the configured intervals)
+        budget_share: Share of the rate and daily budget polling may use
+    """
+
+    def __init__(self, topics: List[Topic],
+                 limiter: Optional[UpstreamLimiter] = None,
+                 budget_share: float = 0.5):
+        self.topics = topics
+        self.budget_share = min(max(budget_share, 0.01), 1.0)
+        self.stretch = 1.0
+        self.gap = 0.0
+        if limiter is not None:
+            self._fit(limiter)
+        self.polls = 0
+        self.skipped = 0
+        self.errors = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    def from_env(cls, limiter: Optional[UpstreamLimiter] = None
+                 ) -> "TopicPoller":
+        """
+        Build the poller from ``NEWS_POLL_TOPICS``, ``NEWS_POLL_INTERVAL``
+        (default seconds per topic, 300) and ``NEWS_POLL_BUDGET_SHARE``
+        (0.5).
+        """
+        topics = parse_topics(os.getenv("NEWS_POLL_TOPICS", ""),
+                              env_float("NEWS_POLL_INTERVAL", 300.0))
+        return cls(topics, limiter,
+                   env_float("NEWS_POLL_BUDGET_SHARE", 0.5))
+
+    def _fit(self, limiter: UpstreamLimiter) -> None:
+        """Stretch intervals and space polls to stay within the quota."""
+        polls_per_second = sum(1 / t.interval for t in self.topics)
+        rate = limiter.bucket.rate * self.budget_share
+        if rate > 0:
+            self.gap = 1 / rate
+            self.stretch = max(self.stretch, polls_per_second / rate)
+        daily = limiter.budget.limit * self.budget_share
+        if daily > 0:
+            self.stretch = max(self.stretch,
+                               polls_per_second * 86400 / daily)
+
+    def interval(self, topic: Topic) -> float:
+        """Effective seconds between polls of ``topic``."""
+        return topic.interval * self.stretch
+
+    def first_polls(self) -> List[float]:
+        """Delay before each topic's first poll, spread evenly."""
+        if not self.topics:
+            return []
+        window = min(self.interval(t) for t in self.topics)
+        step = max(window / len(self.topics), self.gap)
+        return [i * step for i in range(len(self.topics))]
+
+    async def poll(self, topic: Topic) -> None:
+        """Warm one topic unless it was fetched recently anyway."""
+        warmed = await service.warm(topic.query, POLL_LIMIT, topic.language,
+                                    max_age=self.interval(topic) / 2)
+        if warmed:
+            self.polls += 1
+        else:
+            self.skipped += 1
+
+    async def run(self) -> None:
+        """Poll topics until cancelled."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        due = [(start + delay, i)
+               for i, delay in enumerate(self.first_polls())]
+        heapq.heapify(due)
+        not_before = start
+        while due:
+            when, i = heapq.heappop(due)
+            when = max(when, not_before)
+            await asyncio.sleep(max(when - loop.time(), 0))
+            topic = self.topics[i]
+            not_before = loop.time() + self.gap
+            try:
+                await self.poll(topic)
+            except RateLimited as e:
+                self.errors += 1
+                # Leave the rest of the quota to client traffic
+                not_before = loop.time() + e.retry_after
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Polling %r failed: %s", topic.query, e)
+            heapq.heappush(due, (when + self.interval(topic), i))
+
+    def start(self) -> None:
+        """Run the poller in the background of the current event loop."""
+        if self._task is None and self.topics:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the background poller and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "topics": len(self.topics),
+            "interval_stretch": round(self.stretch, 2),
+            "polls": self.polls,
+            "skipped": self.skipped,
+            "errors": self.errors,
+        }
+
+
+def in_app() -> bool:
+    """Whether API processes run the poller (``NEWS_POLL_IN_APP``)."""
+    return env_bool("NEWS_POLL_IN_APP", True)
+
+
+async def _serve() -> None:
+    poller = TopicPoller.from_env(service.limiter)
+    if not poller.topics:
+        logger.error("NEWS_POLL_TOPICS is empty, nothing to poll")
+        return
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await http.startup()
+    poller.start()
+    logger.info("Polling %d topics", len(poller.topics))
+    try:
+        await stop.wait()
+    finally:
+        await poller.stop()
+        await service.drain()
+        await http.close()
+        await service.cache.close()
+        await service.store.close()
+
+
+def main() -> None:
+    """Entry point of the standalone poller worker."""
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Provider interface shared by every news source.
+
+A provider turns a (query, limit, language, page) lookup into a list of
+:class:`Article` dicts in the shape the API returns, newest first.
+Upstream failures are raised as ``httpx.HTTPError`` (with
+``httpx.TimeoutException`` for timeouts) so callers handle every provider
+the same way.
+"""
+from abc import ABC, abstractmethod
+from typing import List, TypedDict
+
+
+class Article(TypedDict):
+    """
+    One normalized article.
+
+    A plain dict at runtime, so articles are cached with ``marshal``,
+    stored and encoded to JSON without conversion.
+    """
+
+    title: str
+    url: str
+    description: str
+    source: str
+    publishedAt: str
+    urlToImage: str
+
+
+class NewsProvider(ABC):
+    """A source of news articles."""
+
+    name = "base"
+
+    async def admit(self) -> None:
+        """
+        Wait for permission to call the upstream (e.g. a quota slot).
+
+        Runs before :meth:`fetch` and outside its latency measurement and
+        timeout. The default admits immediately.
+        """
+
+    @abstractmethod
+    async def fetch(self, query: str, limit: int, language: str,
+                    page: int = 1) -> List[Article]:
+        """
+        Fetch one page of articles.
+
+        Args:
+            query: Search query term
+            limit: Page size (1-20)
+            language: Language code (e.g., "en")
+            page: 1-based page number
+
+        Returns:
+            Normalized article dicts, newest first
+        """
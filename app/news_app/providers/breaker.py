@@ -0,0 +1,152 @@
+"""
+Circuit breaker for upstream providers.
+
+A breaker watches the outcomes of recent calls to one provider. While
+closed, every call goes through. Once enough calls have been seen and the
+share of failed or slow calls crosses the threshold, it opens and calls
+fail fast for ``open_for`` seconds. It then goes half-open and admits a
+single probe call: success closes it again, failure re-opens it.
+
+Only errors saying the provider is unwell count as failures (see
+:func:`is_failure`); a 4xx answer for a bad request is a healthy response.
+"""
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+import httpx
+
+from ..config import env_float, env_int
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(httpx.HTTPError):
+    """Every provider's breaker is open; no upstream call was made."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"Upstream unavailable, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def is_failure(error: BaseException) -> bool:
+    """
+    Whether ``error`` counts against a provider's breaker: timeouts,
+    connection errors, 5xx and 429 answers.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a window of recent calls.
+
+    Args:
+        failure_rate: Share of failed (or of slow) calls that trips it
+        slow_call: Latency in seconds at which a call counts as slow
+        min_calls: Calls needed in the window before it can trip
+        open_for: Seconds to fail fast before probing again
+        window: Number of recent calls considered
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, failure_rate: float = 0.5, slow_call: float = 5.0,
+                 min_calls: int = 10, open_for: float = 30.0,
+                 window: int = 20,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.min_calls = max(min_calls, 1)
+        self.open_for = open_for
+        self._clock = clock
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(
+            maxlen=max(window, self.min_calls))
+        self.state = CLOSED
+        self.trips = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """
+        Build a breaker from ``NEWS_BREAKER_FAILURE_RATE`` (0.5),
+        ``NEWS_BREAKER_SLOW_MS`` (5000), ``NEWS_BREAKER_MIN_CALLS`` (10)
+        and ``NEWS_BREAKER_OPEN_SECONDS`` (30).
+        """
+        return cls(
+            failure_rate=env_float("NEWS_BREAKER_FAILURE_RATE", 0.5),
+            slow_call=env_float("NEWS_BREAKER_SLOW_MS", 5000.0) / 1000,
+            min_calls=env_int("NEWS_BREAKER_MIN_CALLS", 10),
+            open_for=env_float("NEWS_BREAKER_OPEN_SECONDS", 30.0),
+        )
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go through now.
+
+        In the half-open state only one probe is admitted at a time; the
+        caller must report its outcome with :meth:`record` or
+        :meth:`release`.
+        """
+        if self.state == OPEN:
+            if self._clock() - self._opened_at < self.open_for:
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker admits a probe (0 otherwise)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self.open_for - (self._clock() - self._opened_at), 0.0)
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Report the outcome of an admitted call."""
+        slow = latency >= self.slow_call
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if ok and not slow:
+                self.state = CLOSED
+            else:
+                self._trip()
+            return
+        if self.state == OPEN:
+            # Late result of a call admitted before the breaker opened
+            return
+        self._outcomes.append((ok, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failed = sum(not ok for ok, _ in self._outcomes) / calls
+        slowed = sum(slow for _, slow in self._outcomes) / calls
+        if failed >= self.failure_rate or slowed >= self.failure_rate:
+            self._trip()
+
+    def release(self) -> None:
+        """Give back an admitted call that ended without a verdict."""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self.trips += 1
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "retry_after": round(self.retry_after(), 1),
+        }
@@ -3,8 +3,86 @@
 GNews.io API provider for fetching news articles.
 """
 import os
+from typing import Any, Dict, List, Optional
+
+import httpx
 import requests
-from typing import Dict, Any
+
+from .. import metrics
+from ..ratelimit import UpstreamLimiter
+from . import http, keys
+from .base import Article, NewsProvider
+
+GNEWS_BASE_URL = "https://gnews.io/api/v4"
+
+
+def search_url() -> str:
+    """
+    GNews search endpoint under ``GNEWS_BASE_URL``, which can point at a
+    stand-in such as the load-test server in ``qa/loadtest.py``.
+    """
+    base = os.getenv("GNEWS_BASE_URL") or GNEWS_BASE_URL
+    return base.rstrip("/") + "/search"
+
+
+def _build_params(query: str, limit: int, language: str,
+                  api_key: str) -> Dict[str, Any]:
+    """Map our REST parameters onto the GNews query string."""
+    return {
+        "q": query,
+        "max": limit,
+        "lang": language,
+        "token": api_key
+    }
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header, if it holds a number."""
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def sort_articles(articles: List[Dict[str, Any]],
+                  sort_by: str) -> List[Dict[str, Any]]:
+    """
+    Return articles in the requested order.
+
+    GNews already returns articles newest first, so only "title" needs a
+    client-side sort; "relevance" keeps the provider's order.
+    """
+    if sort_by == "title":
+        return sorted(articles, key=lambda x: x.get("title", "").lower())
+    return articles
+
+
+def to_article(raw: Dict[str, Any]) -> Article:
+    """Normalize one GNews article into the API's article shape."""
+    source = raw.get("source")
+    return {
+        "title": raw.get("title", ""),
+        "url": raw.get("url", ""),
+        "description": raw.get("description", ""),
+        "source": source.get("name", "Unknown") if source else "Unknown",
+        "publishedAt": raw.get("publishedAt", ""),
+        "urlToImage": raw.get("image", ""),
+    }
+
+
+def _transform(data: Dict[str, Any], query: str,
+               sort_by: str) -> Dict[str, Any]:
+    """Transform a GNews payload into our NewsAPI-like response."""
+    articles = [to_article(raw) for raw in data.get("articles", ())]
+
+    # Sort articles if needed (client-side since GNews doesn't support it)
+    articles = sort_articles(articles, sort_by)
+
+    return {
+        "articles": articles,
+        "total": len(articles),
+        "query": query
+    }
 
 
 def fetch(query: str, limit: int, sort_by: str,
@@ -23,63 +101,108 @@ def fetch(query: str, limit: int, sort_by: str,
 
     Raises:
         ValueError: If GNEWS_API_KEY is not configured
+        RateLimited: If every configured key is resting or out of quota
         requests.exceptions.RequestException: If API request fails
     """
-    api_key = os.getenv("GNEWS_API_KEY")
-    if not api_key:
-        raise ValueError(
-            "GNEWS_API_KEY environment variable is required but not set. "
-            "Please configure it in your environment or .env file."
-        )
-
-    # GNews API parameters mapping
-    params = {
-        "q": query,
-        "max": limit,
-        "lang": language,
-        "token": api_key.strip()
-    }
+    pool = keys.pool()
+    key = pool.acquire()
+    params = _build_params(query, limit, language, key.key)
 
     # GNews doesn't support sort_by parameter in the same way,
     # but we'll store it for response consistency
 
     try:
         response = requests.get(
-            "https://gnews.io/api/v4/search",
+            search_url(),
             params=params,
             timeout=10
         )
+        pool.report(key, response.status_code,
+                    _retry_after(response.headers))
         response.raise_for_status()
 
-        data = response.json()
-
-        # Transform GNews response to match NewsAPI format
-        articles = []
-        if "articles" in data:
-            for article in data["articles"]:
-                # GNews structure is slightly different
-                transformed_article = {
-                    "title": article.get("title", ""),
-                    "url": article.get("url", ""),
-                    "description": article.get("description", ""),
-                    "source": article.get("source", {}).get("name", "Unknown"),
-                    "publishedAt": article.get("publishedAt", ""),
-                    "urlToImage": article.get("image", "")
-                }
-                articles.append(transformed_article)
-
-        # Sort articles if needed (client-side since GNews doesn't support it)
-        if sort_by == "title":
-            articles.sort(key=lambda x: x.get("title", "").lower())
-        # Default is publishedAt (already sorted by GNews)
-
-        return {
-            "articles": articles,
-            "total": len(articles),
-            "query": query
-        }
+        return _transform(response.json(), query, sort_by)
 
     except requests.exceptions.Timeout:
         raise requests.exceptions.Timeout("Request timeout")
     except requests.exceptions.RequestException as e:
         raise requests.exceptions.RequestException(f"Error fetching news: {e}")
+
+
+async def fetch_async(query: str, limit: int, sort_by: str,
+                      language: str, page: int = 1) -> Dict[str, Any]:
+    """
+    Fetch news articles from GNews.io without blocking the event loop.
+
+    Uses the shared pooled client from :mod:`news_app.providers.http`, so
+    many upstream calls can be in flight on a single worker. A key answered
+    with 429 or 403 is rested and the call is repeated with the next key
+    of the pool, if any is available.
+
+    Args:
+        query: Search query term
+        limit: Number of articles to return (1-20)
+        sort_by: Sort order - "publishedAt" or "title"
+        language: Language code (e.g., "en")
+        page: 1-based page of ``limit`` articles (GNews ``page``)
+
+    Returns:
+        Dict containing articles, total count, and query
+
+    Raises:
+        ValueError: If GNEWS_API_KEY is not configured
+        RateLimited: If every configured key is resting or out of quota
+        httpx.TimeoutException: If the upstream call times out
+        httpx.HTTPError: If API request fails
+    """
+    pool = keys.pool()
+    # With no key the loop below would not run at all
+    pool.check()
+    try:
+        for attempt in range(len(pool)):
+            key = pool.acquire()
+            params = _build_params(query, limit, language, key.key)
+            if page > 1:
+                params["page"] = page
+            response = await http.get(search_url(), params=params)
+            pool.report(key, response.status_code,
+                        _retry_after(response.headers))
+            if response.status_code not in (403, 429) or (
+                    attempt == len(pool) - 1):
+                break
+        response.raise_for_status()
+        with metrics.stage("parse"):
+            data = response.json()
+        with metrics.stage("transform"):
+            return _transform(data, query, sort_by)
+
+    except httpx.TimeoutException:
+        raise httpx.TimeoutException("Request timeout")
+    except httpx.HTTPError as e:
+        raise http.upstream_error(e, f"Error fetching news: {e}")
+
+
+class GNewsProvider(NewsProvider):
+    """
+    GNews.io as a :class:`NewsProvider`.
+
+    Args:
+        limiter: Upstream quota admission; every call acquires a slot first
+    """
+
+    name = "gnews"
+
+    def __init__(self, limiter: Optional[UpstreamLimiter] = None):
+        self.limiter = limiter
+
+    async def admit(self) -> None:
+        # Fail before taking a rate-limit token if no key could be used
+        keys.pool().check()
+        if self.limiter is not None:
+            await self.limiter.acquire()
+
+    async def fetch(self, query: str, limit: int, language: str,
+                    page: int = 1) -> List[Article]:
+        result = await fetch_async(query, limit, "publishedAt", language,
+                                   page)
+        return result["articles"]
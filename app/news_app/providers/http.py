@@ -0,0 +1,164 @@
+"""
+Shared async HTTP client used by the news providers.
+
+A single pooled ``httpx.AsyncClient`` is reused for every upstream call so
+that requests made from the event loop never block it and TCP/TLS
+connections to the upstream are kept alive between requests. The client is
+opened and closed by the FastAPI lifespan in :mod:`news_app.api`; calls
+made outside the lifespan (scripts, tests) open it lazily.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .. import metrics
+from ..config import env_bool, env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+_http2 = False
+
+# Pool usage counters, see pool_stats()
+_stats = {"requests": 0, "new_connections": 0}
+
+
+def build_timeout() -> httpx.Timeout:
+    """
+    Build the upstream timeout configuration.
+
+    ``GNEWS_CONNECT_TIMEOUT`` and ``GNEWS_READ_TIMEOUT`` (seconds) override
+    the defaults of 5s to connect and 10s to read the response.
+    """
+    connect = env_float("GNEWS_CONNECT_TIMEOUT", 5.0)
+    read = env_float("GNEWS_READ_TIMEOUT", 10.0)
+    return httpx.Timeout(read, connect=connect)
+
+
+def build_limits() -> httpx.Limits:
+    """
+    Build the connection pool limits.
+
+    ``HTTP_POOL_SIZE`` caps open connections (default 100),
+    ``HTTP_POOL_KEEPALIVE`` caps idle keep-alive connections (default 20)
+    and ``HTTP_KEEPALIVE_EXPIRY`` is the idle lifetime in seconds (30).
+    """
+    return httpx.Limits(
+        max_connections=env_int("HTTP_POOL_SIZE", 100),
+        max_keepalive_connections=env_int("HTTP_POOL_KEEPALIVE", 20),
+        keepalive_expiry=env_float("HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 is opt-in via ``HTTP2=true`` and needs the ``h2`` package."""
+    if not env_bool("HTTP2"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP2 requested but 'h2' is not installed; "
+                       "falling back to HTTP/1.1")
+        return False
+    return True
+
+
+def _new_client() -> httpx.AsyncClient:
+    global _http2
+    _http2 = _http2_enabled()
+    return httpx.AsyncClient(
+        timeout=build_timeout(),
+        limits=build_limits(),
+        http2=_http2,
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared async client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _new_client()
+    return _client
+
+
+async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+    """httpcore trace hook: a TCP connect means the pool had no idle conn."""
+    if event_name == "connection.connect_tcp.complete":
+        _stats["new_connections"] += 1
+
+
+async def get(url: str, **kwargs: Any) -> httpx.Response:
+    """Issue a GET request through the shared client."""
+    _stats["requests"] += 1
+    extensions = kwargs.pop("extensions", None) or {}
+    extensions.setdefault("trace", _trace)
+    host = httpx.URL(url).host
+    try:
+        response = await get_client().get(url, extensions=extensions,
+                                          **kwargs)
+    except httpx.TimeoutException:
+        metrics.UPSTREAM_RESPONSES.inc(host=host, code="timeout")
+        raise
+    except httpx.HTTPError:
+        metrics.UPSTREAM_RESPONSES.inc(host=host, code="error")
+        raise
+    metrics.UPSTREAM_RESPONSES.inc(host=host, code=str(response.status_code))
+    return response
+
+
+def upstream_error(error: httpx.HTTPError, message: str) -> httpx.HTTPError:
+    """
+    Re-word an upstream error while keeping its type.
+
+    Callers tell transient failures (transport errors, 5xx statuses) from
+    permanent ones by type, so wrapping must not collapse them into a bare
+    ``httpx.HTTPError``.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return httpx.HTTPStatusError(message, request=error.request,
+                                     response=error.response)
+    try:
+        return type(error)(message)
+    except TypeError:
+        return httpx.HTTPError(message)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Report connection reuse for the shared client.
+
+    Returns:
+        Dict with request count, new and reused connections, reuse ratio
+        and whether the client was built with HTTP/2 enabled.
+    """
+    total = _stats["requests"]
+    new = min(_stats["new_connections"], total)
+    reused = total - new
+    return {
+        "requests": total,
+        "new_connections": new,
+        "reused_connections": reused,
+        "reuse_ratio": round(reused / total, 3) if total else 0.0,
+        "http2": _http2,
+    }
+
+
+def reset_stats() -> None:
+    """Reset the pool counters (used by tests and on startup)."""
+    _stats["requests"] = 0
+    _stats["new_connections"] = 0
+
+
+async def startup() -> None:
+    """Open the shared client; called from the application lifespan."""
+    reset_stats()
+    get_client()
+
+
+async def close() -> None:
+    """Close the shared client and release its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,208 @@
+"""
+Pool of GNews API keys.
+
+``GNEWS_API_KEYS`` (comma-separated; ``GNEWS_API_KEY`` for a single key)
+is parsed once into a :class:`KeyPool`. Each call takes the key with the
+most daily quota left, so calls spread evenly and aggregate throughput
+grows with the number of keys. A key answered with 429 rests for the
+``Retry-After`` the upstream sent (``GNEWS_KEY_COOLDOWN`` otherwise); one
+answered with 403, which GNews sends once a key's daily quota is spent,
+rests until the quota resets at midnight UTC.
+
+Per-key usage is kept in the limiter's shared quota file when
+``NEWS_LIMITER_PATH`` is set, so workers do not overdraw a key between
+them. Cooldowns are per process: each worker learns of a resting key from
+its own first 429.
+"""
+import hashlib
+import itertools
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import env_float, env_int, env_list
+from ..ratelimit import (
+    DailyBudget, QuotaFile, RateLimited, SharedDailyBudget)
+
+MISSING_KEY = ("GNEWS_API_KEY environment variable is required but not "
+               "set. Please configure it in your environment or .env file.")
+
+
+def configured_keys() -> List[str]:
+    """Keys from ``GNEWS_API_KEYS``, else the single ``GNEWS_API_KEY``."""
+    return env_list("GNEWS_API_KEYS") or env_list("GNEWS_API_KEY")
+
+
+def _label(key: str) -> str:
+    """Short identifier for logs and stats that does not reveal the key."""
+    return "…" + key[-4:] if len(key) > 8 else "…"
+
+
+class ApiKey:
+    """One key, its daily quota and cooldown."""
+
+    def __init__(self, key: str, budget: DailyBudget):
+        self.key = key
+        self.label = _label(key)
+        self.budget = budget
+        self.cooldown_until = 0.0
+        self.last_used = 0
+        self.calls = 0
+        self.rate_limited = 0
+        self.forbidden = 0
+
+
+class KeyPool:
+    """
+    Rotate calls across API keys by remaining quota.
+
+    Args:
+        keys: GNews API keys
+        daily_limit: Requests per key per day (0 for no limit)
+        cooldown: Seconds a rate-limited key rests without ``Retry-After``
+        quota: Shared quota file holding per-key usage, if any
+        clock: Wall clock (injectable for tests)
+    """
+
+    def __init__(self, keys: List[str], daily_limit: int = 100,
+                 cooldown: float = 60.0, quota: Optional[QuotaFile] = None,
+                 clock: Callable[[], float] = time.time):
+        self.cooldown = cooldown
+        self._clock = clock
+        self._uses = itertools.count(1)
+        self.keys: List[ApiKey] = []
+        for key in dict.fromkeys(keys):
+            if quota is not None:
+                name = "key:" + hashlib.sha256(key.encode()).hexdigest()[:16]
+                budget: DailyBudget = SharedDailyBudget(
+                    quota, daily_limit, name=name, clock=clock)
+            else:
+                budget = DailyBudget(daily_limit, clock=clock)
+            self.keys.append(ApiKey(key, budget))
+
+    @classmethod
+    def from_env(cls) -> "KeyPool":
+        """
+        Build the pool from ``GNEWS_API_KEYS``/``GNEWS_API_KEY``,
+        ``GNEWS_DAILY_LIMIT`` (per key, 100), ``GNEWS_KEY_COOLDOWN``
+        (seconds, 60) and ``NEWS_LIMITER_PATH``.
+        """
+        keys = configured_keys()
+        path = os.getenv("NEWS_LIMITER_PATH")
+        return cls(keys, env_int("GNEWS_DAILY_LIMIT", 100),
+                   env_float("GNEWS_KEY_COOLDOWN", 60.0),
+                   QuotaFile(path) if path and keys else None)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _available(self) -> List[ApiKey]:
+        now = self._clock()
+        return [k for k in self.keys
+                if k.cooldown_until <= now and k.budget.remaining >= 1]
+
+    def retry_after(self) -> float:
+        """Seconds until some key can be used again."""
+        now = self._clock()
+        return max(min(
+            max(k.cooldown_until - now,
+                0.0 if k.budget.remaining >= 1
+                else k.budget.seconds_until_reset())
+            for k in self.keys), 0.0)
+
+    def check(self) -> None:
+        """
+        Raise unless a key is available, before spending other quota.
+
+        Raises:
+            ValueError: If no key is configured
+            RateLimited: If every key is resting or out of quota
+        """
+        if not self.keys:
+            raise ValueError(MISSING_KEY)
+        if not self._available():
+            raise RateLimited(self.retry_after(), "API key")
+
+    def acquire(self) -> ApiKey:
+        """
+        Take the key with the most quota left (least recently used first).
+
+        Raises:
+            ValueError: If no key is configured
+            RateLimited: If every key is resting or out of quota
+        """
+        self.check()
+        for key in sorted(self._available(),
+                          key=lambda k: (-k.budget.remaining, k.last_used)):
+            if key.budget.try_consume():
+                key.last_used = next(self._uses)
+                key.calls += 1
+                return key
+        # Other workers spent the last of the shared quota meanwhile
+        raise RateLimited(self.retry_after(), "API key")
+
+    def report(self, key: ApiKey, status: int,
+               retry_after: Optional[float] = None) -> None:
+        """
+        Rest ``key`` after an upstream 429 or 403 answer.
+
+        Args:
+            key: The key the call was made with
+            status: Upstream HTTP status
+            retry_after: The upstream ``Retry-After``, in seconds
+        """
+        now = self._clock()
+        if status == 429:
+            key.rate_limited += 1
+            key.cooldown_until = now + (
+                retry_after if retry_after is not None else self.cooldown)
+        elif status == 403:
+            key.forbidden += 1
+            key.cooldown_until = now + key.budget.seconds_until_reset()
+
+    def reset(self) -> None:
+        """Lift cooldowns, refill quotas and zero counters (for tests)."""
+        for key in self.keys:
+            key.budget.reset()
+            key.cooldown_until = 0.0
+            key.calls = key.rate_limited = key.forbidden = 0
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        available = self._available()
+        return {
+            "keys": len(self.keys),
+            "available": len(available),
+            "usage": [{
+                "key": key.label,
+                "calls": key.calls,
+                "daily_remaining": (None if key.budget.limit <= 0
+                                    else key.budget.remaining),
+                "cooling_down_for": round(
+                    max(key.cooldown_until - now, 0.0), 1),
+                "rate_limited": key.rate_limited,
+                "forbidden": key.forbidden,
+            } for key in self.keys],
+        }
+
+
+_pool: Optional[KeyPool] = None
+
+
+def pool() -> KeyPool:
+    """
+    The process-wide key pool, built from the environment on first use.
+
+    Keys are parsed once, so per-key state survives across calls; tests
+    that change the key settings call :func:`reset`.
+    """
+    global _pool
+    if _pool is None:
+        _pool = KeyPool.from_env()
+    return _pool
+
+
+def reset() -> None:
+    """Forget the pool, to be rebuilt from the environment (for tests)."""
+    global _pool
+    _pool = None
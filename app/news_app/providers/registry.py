@@ -0,0 +1,265 @@
+"""
+Provider registry with latency-based routing and hedged requests.
+
+Providers are ranked by their observed p95 latency, inflated by their
+error rate (see :class:`~news_app.providers.stats.ProviderStats`). A call
+goes to the best-ranked provider; if it has not answered within the hedge
+budget, the next provider is called as well and the first successful
+answer wins. A provider that fails outright is failed over immediately.
+
+Each provider also has a circuit breaker (skipped while open), a per-call
+timeout adapted from its rolling latency window and bounded by the request
+deadline, and budgeted retries for transient failures.
+"""
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from .. import deadline, metrics
+from ..config import env_float
+from ..ratelimit import UpstreamLimiter
+from .base import Article, NewsProvider
+from .breaker import CLOSED, CircuitBreaker, CircuitOpen, is_failure
+from .gnews import GNewsProvider
+from .retry import RetryPolicy
+from .rss import GOOGLE_NEWS_RSS_URL, RSSProvider
+from .stats import ProviderStats
+
+# Adaptive timeout: this multiple of the p99 latency, once enough samples
+TIMEOUT_P99_FACTOR = 3.0
+TIMEOUT_MIN_SAMPLES = 20
+
+
+class _Attempt:
+    """One provider call within a routed lookup."""
+
+    def __init__(self, provider: NewsProvider):
+        self.provider = provider
+        self.started: Optional[float] = None
+
+
+class ProviderRegistry:
+    """
+    Route lookups across configured providers.
+
+    Args:
+        providers: Providers in configured order (ties keep this order)
+        hedge_after: Seconds to wait on a provider before also calling the
+            next one; 0 or less disables hedging (failover still applies)
+        breaker: Factory for each provider's circuit breaker
+        timeout_min: Floor of the adaptive per-call timeout, seconds
+        timeout_max: Ceiling of the adaptive timeout, used until enough
+            latency samples exist
+        retry: Retry policy for transient failures (default: no retries)
+    """
+
+    def __init__(self, providers: Sequence[NewsProvider],
+                 hedge_after: float = 0.0,
+                 breaker: Callable[[], CircuitBreaker] = CircuitBreaker,
+                 timeout_min: float = 1.0, timeout_max: float = 10.0,
+                 retry: Optional[RetryPolicy] = None):
+        if not providers:
+            raise ValueError("At least one news provider is required")
+        self.providers = list(providers)
+        self.hedge_after = hedge_after
+        self.timeout_min = timeout_min
+        self.timeout_max = max(timeout_max, timeout_min)
+        self._breaker = breaker
+        self.retry = retry if retry is not None else RetryPolicy(attempts=1)
+        self.reset()
+
+    @classmethod
+    def from_env(cls, limiter: Optional[UpstreamLimiter] = None
+                 ) -> "ProviderRegistry":
+        """
+        Build the registry from ``NEWS_PROVIDERS`` (comma separated, from
+        "gnews" and "rss"; default "gnews"), ``NEWS_RSS_URL``,
+        ``NEWS_HEDGE_AFTER_MS`` (default 1000), ``NEWS_TIMEOUT_MIN_MS``
+        (1000), ``NEWS_TIMEOUT_MAX_MS`` (10000) and the
+        ``NEWS_BREAKER_*`` and ``NEWS_RETRY_*`` settings.
+        """
+        providers: List[NewsProvider] = []
+        names = os.getenv("NEWS_PROVIDERS", "gnews")
+        for name in (n.strip().lower() for n in names.split(",")):
+            if name == "gnews":
+                providers.append(GNewsProvider(limiter))
+            elif name == "rss":
+                providers.append(RSSProvider(
+                    os.getenv("NEWS_RSS_URL", GOOGLE_NEWS_RSS_URL)))
+            elif name:
+                raise ValueError(f"Unknown news provider: {name!r}")
+        return cls(
+            providers,
+            hedge_after=env_float("NEWS_HEDGE_AFTER_MS", 1000.0) / 1000,
+            breaker=CircuitBreaker.from_env,
+            timeout_min=env_float("NEWS_TIMEOUT_MIN_MS", 1000.0) / 1000,
+            timeout_max=env_float("NEWS_TIMEOUT_MAX_MS", 10000.0) / 1000,
+            retry=RetryPolicy.from_env(),
+        )
+
+    def ranked(self) -> List[NewsProvider]:
+        """Providers ordered from best to worst routing score."""
+        return sorted(self.providers,
+                      key=lambda p: self.stats_by_name[p.name].score())
+
+    def timeout_for(self, provider: NewsProvider) -> float:
+        """
+        Per-call timeout adapted from the provider's recent latency.
+
+        ``TIMEOUT_P99_FACTOR`` times the rolling p99, clamped to
+        [timeout_min, timeout_max]; the ceiling applies until
+        ``TIMEOUT_MIN_SAMPLES`` calls have been seen.
+        """
+        stats = self.stats_by_name[provider.name]
+        if len(stats) < TIMEOUT_MIN_SAMPLES:
+            return self.timeout_max
+        adaptive = TIMEOUT_P99_FACTOR * stats.percentile(0.99)
+        return min(max(adaptive, self.timeout_min), self.timeout_max)
+
+    async def _call(self, attempt: _Attempt, query: str, limit: int,
+                    language: str, page: int) -> List[Article]:
+        """Call one provider, retrying transient failures."""
+        provider = attempt.provider
+        breaker = self.breakers[provider.name]
+        loop = asyncio.get_running_loop()
+        self.retry.budget.deposit()
+        tries = 0
+        while True:
+            deadline.check()
+            await provider.admit()
+            deadline.check()
+            attempt.started = loop.time()
+            metrics.PROVIDER_IN_FLIGHT.inc(provider=provider.name)
+            try:
+                articles = await asyncio.wait_for(
+                    provider.fetch(query, limit, language, page),
+                    deadline.cap(self.timeout_for(provider)))
+            except asyncio.TimeoutError:
+                error: Exception = httpx.TimeoutException("Request timeout")
+            except Exception as e:
+                error = e
+            else:
+                self._settle(attempt, True)
+                return articles
+            self._settle(attempt, False, error)
+            tries += 1
+            # Half-open probes get a single try
+            wait = (self.retry.delay(error, tries)
+                    if breaker.state == CLOSED else None)
+            if wait is None:
+                raise error
+            await asyncio.sleep(wait)
+
+    def _settle(self, attempt: _Attempt, ok: Optional[bool],
+                error: Optional[Exception] = None) -> None:
+        """
+        Record a try; ``ok=None`` means no verdict (cancelled). A failed
+        try only counts against the breaker if ``error`` is a failure.
+        """
+        name = attempt.provider.name
+        breaker = self.breakers[name]
+        if attempt.started is not None:
+            latency = asyncio.get_running_loop().time() - attempt.started
+            outcome = {True: "ok", False: "error", None: "cancelled"}[ok]
+            metrics.PROVIDER_IN_FLIGHT.dec(provider=name)
+            metrics.PROVIDER_CALLS.inc(provider=name, outcome=outcome)
+            metrics.PROVIDER_SECONDS.observe(latency, provider=name)
+            # A cancelled loser took at least this long; keep it in the
+            # window
+            self.stats_by_name[name].record(
+                latency, ok is not False)
+            if ok is not None:
+                breaker.record(latency, ok or not (
+                    error is not None and is_failure(error)))
+            attempt.started = None
+        if ok is None:
+            breaker.release()
+
+    async def fetch(self, query: str, limit: int, language: str,
+                    page: int = 1) -> Tuple[str, List[Article]]:
+        """
+        Fetch a page from the best provider, hedging slow calls.
+
+        Providers whose circuit breaker is open are skipped, and
+        transient failures are retried within the request deadline.
+
+        Returns:
+            (name of the provider that answered, its articles)
+
+        Raises:
+            CircuitOpen: If every provider's breaker is open
+            httpx.TimeoutException: If the request deadline has passed
+            The error of the first provider tried if every provider fails
+        """
+        deadline.check()
+        remaining = self.ranked()
+        pending: Dict["asyncio.Task[List[Article]]", _Attempt] = {}
+        first_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            while remaining:
+                provider = remaining.pop(0)
+                if self.breakers[provider.name].allow():
+                    attempt = _Attempt(provider)
+                    task = asyncio.ensure_future(
+                        self._call(attempt, query, limit, language, page))
+                    pending[task] = attempt
+                    return True
+            return False
+
+        if not launch():
+            raise CircuitOpen(min(
+                b.retry_after() for b in self.breakers.values()))
+        try:
+            while pending:
+                budget = self.hedge_after
+                timeout = budget if remaining and budget > 0 else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Latency budget exceeded: race the next provider
+                    if launch():
+                        self.hedges += 1
+                    continue
+                for task in done:
+                    attempt = pending.pop(task)
+                    error = task.exception()
+                    # Frees a half-open probe that never reached upstream
+                    self._settle(attempt, None)
+                    if error is None:
+                        self.wins[attempt.provider.name] += 1
+                        return attempt.provider.name, task.result()
+                    first_error = first_error or error
+                if not pending:
+                    launch()
+            raise first_error
+        finally:
+            for task, attempt in pending.items():
+                task.cancel()
+                self._settle(attempt, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-provider routing stats for the health endpoint."""
+        return {
+            "hedge_after_ms": round(self.hedge_after * 1000),
+            "hedges": self.hedges,
+            "retries": self.retry.stats(),
+            "providers": {
+                p.name: {**self.stats_by_name[p.name].snapshot(),
+                         "wins": self.wins[p.name],
+                         "timeout_ms": round(self.timeout_for(p) * 1000),
+                         "breaker": self.breakers[p.name].snapshot()}
+                for p in self.ranked()
+            },
+        }
+
+    def reset(self) -> None:
+        """Forget routing stats, close every breaker, refill retries."""
+        self.stats_by_name = {p.name: ProviderStats() for p in self.providers}
+        self.breakers = {p.name: self._breaker() for p in self.providers}
+        self.wins = {p.name: 0 for p in self.providers}
+        self.hedges = 0
+        self.retry.budget.reset()
@@ -0,0 +1,123 @@
+"""
+Retries for idempotent provider calls.
+
+Transient failures (transport errors, timeouts, 5xx responses) are retried
+with full-jitter exponential backoff. Retries are paid for from a budget
+that earns a fraction of a retry per call, so under a sustained outage
+retries add at most that percentage to upstream traffic. A retry is never
+started if its backoff would run past the request deadline.
+"""
+import random
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from .. import deadline
+from ..config import env_float, env_int
+
+
+class RetryBudget:
+    """
+    Token budget capping retries to a share of calls.
+
+    Args:
+        ratio: Retries earned per call (0.1 allows retries on 10% of calls)
+        reserve: Retries available up front and the most that can be saved
+    """
+
+    def __init__(self, ratio: float = 0.1, reserve: float = 3.0):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.reset()
+
+    def deposit(self) -> None:
+        """Credit one call."""
+        self.balance = min(self.balance + self.ratio, self.reserve)
+
+    def try_withdraw(self) -> bool:
+        """Spend one retry if the budget allows it."""
+        if self.balance < 1:
+            self.denied += 1
+            return False
+        self.balance -= 1
+        self.retries += 1
+        return True
+
+    def reset(self) -> None:
+        self.balance = self.reserve
+        self.retries = 0
+        self.denied = 0
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed call.
+
+    Args:
+        attempts: Total tries per call, including the first
+        base: Backoff ceiling in seconds for the first retry
+        cap: Largest backoff ceiling in seconds
+        budget: Retry budget shared by all calls
+        rng: Random source returning [0, 1) (injectable for tests)
+    """
+
+    def __init__(self, attempts: int = 3, base: float = 0.1,
+                 cap: float = 2.0, budget: Optional[RetryBudget] = None,
+                 rng: Callable[[], float] = random.random):
+        self.attempts = max(attempts, 1)
+        self.base = base
+        self.cap = cap
+        self.budget = budget if budget is not None else RetryBudget()
+        self._rng = rng
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """
+        Build a policy from ``NEWS_RETRY_ATTEMPTS`` (3),
+        ``NEWS_RETRY_BASE_MS`` (100), ``NEWS_RETRY_MAX_MS`` (2000) and
+        ``NEWS_RETRY_BUDGET_PERCENT`` (10).
+        """
+        return cls(
+            attempts=env_int("NEWS_RETRY_ATTEMPTS", 3),
+            base=env_float("NEWS_RETRY_BASE_MS", 100.0) / 1000,
+            cap=env_float("NEWS_RETRY_MAX_MS", 2000.0) / 1000,
+            budget=RetryBudget(
+                env_float("NEWS_RETRY_BUDGET_PERCENT", 10.0) / 100),
+        )
+
+    @staticmethod
+    def retryable(error: BaseException) -> bool:
+        """Whether ``error`` is transient and worth another try."""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter delay before retry number ``retry`` (1-based)."""
+        return self._rng() * min(self.cap, self.base * 2 ** (retry - 1))
+
+    def delay(self, error: BaseException, tries: int) -> Optional[float]:
+        """
+        Seconds to wait before another try, or None to give up.
+
+        Args:
+            error: The error of the last try
+            tries: Tries made so far
+        """
+        if tries >= self.attempts or not self.retryable(error):
+            return None
+        wait = self.backoff(tries)
+        left = deadline.remaining()
+        if left is not None and wait >= left:
+            return None
+        if not self.budget.try_withdraw():
+            return None
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "retries": self.budget.retries,
+            "denied_by_budget": self.budget.denied,
+            "budget": round(self.budget.balance, 2),
+        }
@@ -0,0 +1,95 @@
+"""
+RSS feed provider for keyless alternate news sources.
+
+Fetches an RSS 2.0 search feed (Google News by default) through the shared
+HTTP client and normalizes its items to the article dict shape used by the
+GNews provider. RSS feeds do not paginate, so pages are sliced from the
+single feed response.
+"""
+import xml.etree.ElementTree as ET
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+from urllib.parse import quote_plus
+
+import httpx
+
+from . import http
+from .base import Article, NewsProvider
+
+GOOGLE_NEWS_RSS_URL = (
+    "https://news.google.com/rss/search?q={query}&hl={language}")
+
+_MEDIA_NS = "{http://search.yahoo.com/mrss/}"
+
+
+def _iso8601(pub_date: Optional[str]) -> str:
+    """Convert an RFC 822 ``pubDate`` to GNews-style ISO 8601 UTC."""
+    if not pub_date:
+        return ""
+    try:
+        parsed = parsedate_to_datetime(pub_date)
+    except (TypeError, ValueError):
+        return ""
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_feed(xml: bytes) -> List[Article]:
+    """
+    Parse an RSS 2.0 document into normalized articles.
+
+    Raises:
+        httpx.DecodingError: If the document is not valid RSS
+    """
+    try:
+        root = ET.fromstring(xml)
+    except ET.ParseError as e:
+        raise httpx.DecodingError(f"Invalid RSS feed: {e}")
+
+    articles = []
+    for item in root.iter("item"):
+        image = item.find(f"{_MEDIA_NS}content")
+        if image is None:
+            image = item.find("enclosure")
+        articles.append({
+            "title": item.findtext("title", ""),
+            "url": item.findtext("link", ""),
+            "description": item.findtext("description", ""),
+            "source": item.findtext("source") or "Unknown",
+            "publishedAt": _iso8601(item.findtext("pubDate")),
+            "urlToImage": image.get("url", "") if image is not None else ""
+        })
+    # Feeds are usually newest first, but not guaranteed
+    articles.sort(key=lambda a: a["publishedAt"], reverse=True)
+    return articles
+
+
+class RSSProvider(NewsProvider):
+    """
+    News from an RSS search feed.
+
+    Args:
+        url_template: Feed URL with ``{query}`` and ``{language}`` fields
+        name: Provider name used in routing stats
+    """
+
+    def __init__(self, url_template: str = GOOGLE_NEWS_RSS_URL,
+                 name: str = "rss"):
+        self.url_template = url_template
+        self.name = name
+
+    async def fetch(self, query: str, limit: int, language: str,
+                    page: int = 1) -> List[Article]:
+        url = self.url_template.format(query=quote_plus(query),
+                                       language=quote_plus(language))
+        try:
+            response = await http.get(url)
+            response.raise_for_status()
+        except httpx.TimeoutException:
+            raise httpx.TimeoutException("Request timeout")
+        except httpx.HTTPError as e:
+            raise http.upstream_error(e, f"Error fetching feed: {e}")
+        start = (page - 1) * limit
+        return parse_feed(response.content)[start:start + limit]
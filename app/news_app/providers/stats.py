@@ -0,0 +1,63 @@
+"""
+Rolling latency and error statistics per provider.
+"""
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+
+class ProviderStats:
+    """
+    Keep the last ``window`` call outcomes of one provider.
+
+    Args:
+        window: Number of recent calls used for percentiles and error rate
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record one call's latency in seconds and whether it succeeded."""
+        self._samples.append((latency, ok))
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        """Latency at quantile ``q`` (0-1) over the window; 0 if empty."""
+        if not self._samples:
+            return 0.0
+        latencies = sorted(latency for latency, _ in self._samples)
+        index = min(int(q * len(latencies)), len(latencies) - 1)
+        return latencies[index]
+
+    def p95(self) -> float:
+        return self.percentile(0.95)
+
+    def error_rate(self) -> float:
+        """Fraction of failed calls over the window."""
+        if not self._samples:
+            return 0.0
+        return sum(not ok for _, ok in self._samples) / len(self._samples)
+
+    def score(self) -> float:
+        """
+        Routing cost: p95 latency inflated by the error rate.
+
+        Lower is better; a provider without samples scores 0 so it gets
+        tried.
+        """
+        return self.p95() / max(1.0 - self.error_rate(), 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "p95_ms": round(self.p95() * 1000, 1),
+            "error_rate": round(self.error_rate(), 3),
+        }
@@ -0,0 +1,499 @@
+"""
+Upstream quota accounting and admission control.
+
+GNews enforces both a per-second request rate and a daily request quota.
+:class:`UpstreamLimiter` combines a token bucket (rate + burst) with a
+daily budget that resets at midnight UTC, so provider calls are admitted
+only while both have room.
+
+By default the bucket and budget live in each worker process. With
+``NEWS_LIMITER_PATH`` set they are kept in a SQLite file instead
+(:class:`QuotaFile`), so every worker of a host draws from one quota
+rather than each spending the full rate and daily budget.
+
+Calls waiting for a token are admitted in weighted fair order: each call
+is charged to the client it runs for (see :func:`charge_to`), and a client
+with weight 2 gets twice the upstream slots of one with weight 1 while both
+are queuing, however many requests either sends.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from . import deadline
+from .config import env_float, env_int, env_list
+
+
+class RateLimited(Exception):
+    """The upstream budget cannot admit a call within the allowed wait."""
+
+    def __init__(self, retry_after: float, reason: str = "rate"):
+        super().__init__(
+            f"Upstream {reason} limit reached, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens per second up to ``burst``.
+
+    A ``rate`` of 0 disables the bucket (every acquire succeeds).
+    """
+
+    # Whether calls do blocking I/O and must run off the event loop
+    shared = False
+
+    def __init__(self, rate: float, burst: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; return 0 or seconds until they are due."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        if self._tokens >= cost:
+            self._tokens -= cost
+            return 0.0
+        return (cost - self._tokens) / self.rate
+
+    def refund(self, cost: float = 1.0) -> None:
+        """Give back tokens taken for a call that was not made."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self._tokens = min(self.burst, self._tokens + cost)
+
+    def reset(self) -> None:
+        self._tokens = float(self.burst)
+        self._updated = self._clock()
+
+
+class DailyBudget:
+    """
+    Request quota that resets at midnight UTC.
+
+    A ``limit`` of 0 disables the budget.
+    """
+
+    shared = False
+
+    def __init__(self, limit: int, clock: Callable[[], float] = time.time):
+        self.limit = limit
+        self._clock = clock
+        self._day = self._today()
+        self.used = 0
+
+    def _today(self) -> int:
+        return int(self._clock() // 86400)
+
+    def _roll(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self.used = 0
+
+    @property
+    def remaining(self) -> float:
+        if self.limit <= 0:
+            return math.inf
+        self._roll()
+        return max(self.limit - self.used, 0)
+
+    def seconds_until_reset(self) -> float:
+        return (self._today() + 1) * 86400 - self._clock()
+
+    def try_consume(self) -> bool:
+        if self.limit <= 0:
+            return True
+        self._roll()
+        if self.used >= self.limit:
+            return False
+        self.used += 1
+        return True
+
+    def reset(self) -> None:
+        self._day = self._today()
+        self.used = 0
+
+
+T = TypeVar("T")
+
+_QUOTA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upstream_quota (
+    name TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+class QuotaFile:
+    """
+    Quota counters in a SQLite file shared by the workers of one host.
+
+    Each counter is a (level, updated) pair changed in an ``IMMEDIATE``
+    transaction, so concurrent workers take tokens one at a time. Updates
+    block while another worker holds the file, so the limiter calls them
+    from a worker thread.
+
+    Args:
+        path: Database file; every worker pointing at it shares the quota
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0,
+                                     check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_QUOTA_SCHEMA)
+
+    def update(self, name: str, initial: Tuple[float, float],
+               change: Callable[[float, float], Tuple[float, float, T]]
+               ) -> T:
+        """
+        Atomically replace counter ``name`` with ``change(level, updated)``.
+
+        Args:
+            name: Counter name
+            initial: (level, updated) of a counter not stored yet
+            change: Returns the new level and updated values plus a result
+
+        Returns:
+            The result returned by ``change``
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT level, updated FROM upstream_quota "
+                    "WHERE name = ?", (name,)).fetchone()
+                level, updated, result = change(*(row or initial))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO upstream_quota "
+                    "(name, level, updated) VALUES (?, ?, ?)",
+                    (name, level, updated))
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return result
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    :class:`TokenBucket` whose tokens are kept in a :class:`QuotaFile`.
+
+    Uses wall-clock time, since monotonic clocks are not comparable
+    between processes.
+    """
+
+    shared = True
+
+    def __init__(self, quota: QuotaFile, rate: float, burst: int,
+                 name: str = "bucket",
+                 clock: Callable[[], float] = time.time):
+        self.quota = quota
+        self.name = name
+        super().__init__(rate, burst, clock)
+
+    def _update(self, cost: float) -> float:
+        def change(tokens: float, updated: float):
+            now = self._clock()
+            tokens = min(self.burst,
+                         tokens + max(now - updated, 0.0) * self.rate)
+            if not cost:
+                return tokens, now, tokens
+            if tokens >= cost:
+                # A negative cost is a refund
+                return min(self.burst, tokens - cost), now, 0.0
+            return tokens, now, (cost - tokens) / self.rate
+
+        return self.quota.update(self.name, (self.burst, self._clock()),
+                                 change)
+
+    @property
+    def tokens(self) -> float:
+        return self._update(0)
+
+    def try_acquire(self, cost: float = 1.0) -> float:
+        if self.rate <= 0:
+            return 0.0
+        return self._update(cost)
+
+    def refund(self, cost: float = 1.0) -> None:
+        if self.rate > 0:
+            self._update(-cost)
+
+    def reset(self) -> None:
+        self.quota.update(self.name, (0, 0), lambda *_: (
+            self.burst, self._clock(), None))
+
+
+class SharedDailyBudget(DailyBudget):
+    """:class:`DailyBudget` whose usage is kept in a :class:`QuotaFile`."""
+
+    shared = True
+
+    def __init__(self, quota: QuotaFile, limit: int, name: str = "budget",
+                 clock: Callable[[], float] = time.time):
+        # DailyBudget.__init__ would zero the usage other workers recorded
+        self.quota = quota
+        self.name = name
+        self.limit = limit
+        self._clock = clock
+
+    def _update(self, consume: bool) -> Tuple[int, bool]:
+        today = self._today()
+
+        def change(used: float, day: float):
+            used = used if day == today else 0
+            if consume and used < self.limit:
+                return used + 1, today, (int(used) + 1, True)
+            return used, today, (int(used), False)
+
+        return self.quota.update(self.name, (0, today), change)
+
+    @property
+    def used(self) -> int:
+        return self._update(consume=False)[0]
+
+    @used.setter
+    def used(self, value: int) -> None:
+        self.quota.update(self.name, (0, 0), lambda *_: (
+            value, self._today(), None))
+
+    @property
+    def remaining(self) -> float:
+        if self.limit <= 0:
+            return math.inf
+        return max(self.limit - self.used, 0)
+
+    def try_consume(self) -> bool:
+        if self.limit <= 0:
+            return True
+        return self._update(consume=True)[1]
+
+    def reset(self) -> None:
+        self.used = 0
+
+
+async def _quota(call: Callable[[], T], shared: bool) -> T:
+    """Run ``call``, in a worker thread when it reads a quota file."""
+    if shared:
+        return await asyncio.to_thread(call)
+    return call()
+
+
+# (client, weight) upstream calls made in this context are charged to
+_share: ContextVar[Tuple[str, float]] = ContextVar("news_upstream_share",
+                                                   default=("", 1.0))
+
+
+def charge_to(client: str, weight: float = 1.0) -> None:
+    """Queue upstream calls of the current context as ``client``'s."""
+    _share.set((client, weight))
+
+
+class FairQueue:
+    """
+    Weighted fair order of calls waiting for an upstream token.
+
+    Start-time fair queuing: a call's tag is its client's previous tag (or
+    the current virtual time, if later) plus ``1 / weight``, and the call
+    with the lowest tag goes next. A client sending many requests thus only
+    delays its own calls.
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._tags: Dict[str, float] = {}
+        self._virtual = 0.0
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return sum(ticket[3] for ticket in self._heap)
+
+    def enter(self, client: str, weight: float) -> list:
+        """Queue a call for ``client``; returns its ticket."""
+        tag = (max(self._virtual, self._tags.get(client, 0.0))
+               + 1 / max(weight, 1e-6))
+        self._tags[client] = tag
+        # [tag, seq, wakeup future, still queued]
+        ticket = [tag, next(self._seq),
+                  asyncio.get_running_loop().create_future(), True]
+        heapq.heappush(self._heap, ticket)
+        return ticket
+
+    def head(self) -> Optional[list]:
+        """The ticket whose turn it is, if any."""
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def leave(self, ticket: list, served: bool) -> None:
+        """Dequeue ``ticket`` and wake the next call."""
+        ticket[3] = False
+        if served:
+            self._virtual = max(self._virtual, ticket[0])
+        following = self.head()
+        if following is None:
+            # Idle: tags of clients that gave up no longer matter
+            self._tags.clear()
+        elif not following[2].done():
+            following[2].set_result(None)
+
+
+class UpstreamLimiter:
+    """
+    Admission control for provider calls.
+
+    Args:
+        bucket: Per-second rate limit
+        budget: Daily quota
+        max_wait: Longest a call may queue for a token before being
+            rejected with :class:`RateLimited`
+    """
+
+    def __init__(self, bucket: TokenBucket, budget: DailyBudget,
+                 max_wait: float):
+        self.bucket = bucket
+        self.budget = budget
+        self.max_wait = max_wait
+        self.queue = FairQueue()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "UpstreamLimiter":
+        """
+        Build the limiter from ``GNEWS_RATE_LIMIT`` (requests/second, 1),
+        ``GNEWS_BURST`` (5), ``GNEWS_DAILY_LIMIT`` (100, the free tier) and
+        ``GNEWS_ADMISSION_WAIT`` (seconds a call may queue, 2), shared
+        through ``NEWS_LIMITER_PATH`` when set. The rate and daily limit
+        are per key and grow with the keys in ``GNEWS_API_KEYS``.
+        """
+        keys = max(len(env_list("GNEWS_API_KEYS")), 1)
+        rate = env_float("GNEWS_RATE_LIMIT", 1.0) * keys
+        burst = env_int("GNEWS_BURST", 5)
+        limit = env_int("GNEWS_DAILY_LIMIT", 100) * keys
+        path = os.getenv("NEWS_LIMITER_PATH")
+        if path:
+            quota = QuotaFile(path)
+            bucket: TokenBucket = SharedTokenBucket(quota, rate, burst)
+            budget: DailyBudget = SharedDailyBudget(quota, limit)
+        else:
+            bucket, budget = TokenBucket(rate, burst), DailyBudget(limit)
+        return cls(bucket, budget,
+                   max_wait=env_float("GNEWS_ADMISSION_WAIT", 2.0))
+
+    async def acquire(self) -> None:
+        """
+        Admit one upstream call, queuing briefly for a rate-limit token.
+
+        Queued calls are admitted in weighted fair order of the clients
+        they are charged to.
+
+        Raises:
+            RateLimited: If the daily quota is spent or no token frees up
+                within ``max_wait`` seconds (or the request deadline)
+        """
+        remaining = await _quota(lambda: self.budget.remaining,
+                                 self.budget.shared)
+        if remaining < 1:
+            self.rejected += 1
+            raise RateLimited(self.budget.seconds_until_reset(), "daily")
+
+        max_wait = deadline.cap(self.max_wait)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        ticket = self.queue.enter(*_share.get())
+        queued = served = False
+        try:
+            while True:
+                left = max_wait - (loop.time() - start)
+                at_head = self.queue.head() is ticket
+                if at_head:
+                    wait = await _quota(self.bucket.try_acquire,
+                                        self.bucket.shared)
+                    if wait == 0:
+                        served = True
+                        break
+                    if wait > left:
+                        self.rejected += 1
+                        raise RateLimited(wait)
+                elif left <= 0:
+                    # The calls ahead of this one hold the next tokens
+                    self.rejected += 1
+                    raise RateLimited(len(self.queue) / self.bucket.rate
+                                      if self.bucket.rate > 0 else 1.0)
+                if not queued:
+                    queued = True
+                    self.queued += 1
+                if at_head:
+                    await asyncio.sleep(wait)
+                else:
+                    if ticket[2].done():
+                        # Overtaken by a call with an earlier tag
+                        ticket[2] = loop.create_future()
+                    # Woken when this call reaches the head of the queue
+                    await asyncio.wait([ticket[2]], timeout=left)
+        finally:
+            self.queue.leave(ticket, served)
+
+        if not await _quota(self.budget.try_consume, self.budget.shared):
+            # Another caller spent the last of the quota while we queued;
+            # the token taken for this call goes back to the bucket
+            await _quota(self.bucket.refund, self.bucket.shared)
+            self.rejected += 1
+            raise RateLimited(self.budget.seconds_until_reset(), "daily")
+        self.admitted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Remaining budget and admission counters for the health check."""
+        remaining = self.budget.remaining
+        return {
+            "daily_limit": self.budget.limit or None,
+            "daily_remaining": None if math.isinf(remaining) else remaining,
+            "daily_resets_in": int(self.budget.seconds_until_reset()),
+            "tokens": round(self.bucket.tokens, 2),
+            "rate_per_second": self.bucket.rate,
+            "burst": self.bucket.burst,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "waiting": len(self.queue),
+            "rejected": self.rejected,
+        }
+
+    def reset(self) -> None:
+        """Refill the bucket and budget and reset counters (used by tests)."""
+        self.bucket.reset()
+        self.budget.reset()
+        self.queue = FairQueue()
+        self.admitted = self.queued = self.rejected = 0
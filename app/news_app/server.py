@@ -0,0 +1,120 @@
+"""
+Production entry point: ``python -m news_app.server``.
+
+Runs ``NEWS_WORKERS`` uvicorn worker processes behind one listening socket,
+using uvloop and httptools when they are installed. Each worker admits at
+most ``NEWS_WORKER_CONCURRENCY`` connections (excess requests get 503) and
+on SIGTERM stops accepting, lets in-flight requests finish for up to
+``NEWS_DRAIN_TIMEOUT`` seconds, then waits for background refreshes before
+closing its upstream client.
+
+With more than one worker, state that must not be multiplied by the worker
+count is moved out of the processes unless configured otherwise: the cache
+uses the SQLite backend, the upstream rate and daily budget a shared quota
+file, the article store and subscriptions a shared database, and topics are
+polled, and subscribers pushed to, by one separate poller and one pusher
+process instead of every worker.
+"""
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, Optional
+
+import uvicorn
+
+from .config import env_bool, env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+def _installed(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def shared_state_env(workers: int,
+                     directory: Optional[str] = None) -> Dict[str, str]:
+    """
+    Environment defaults coordinating state across ``workers`` processes.
+
+    Only variables not already set are returned, so explicit settings
+    (e.g. a Redis cache shared across hosts) win. The shared files go in
+    ``directory`` (the temporary directory by default).
+    """
+    if workers <= 1:
+        return {}
+    tmp = directory or tempfile.gettempdir()
+    defaults = {
+        "NEWS_CACHE_BACKEND": "sqlite",
+        "NEWS_CACHE_PATH": os.path.join(tmp, "gnews-cache.sqlite3"),
+        "NEWS_LIMITER_PATH": os.path.join(tmp, "gnews-quota.sqlite3"),
+        "NEWS_STORE_PATH": os.path.join(tmp, "gnews-store.sqlite3"),
+        "NEWS_POLL_IN_APP": "false",
+        "NEWS_PUSH_IN_APP": "false",
+    }
+    return {name: value for name, value in defaults.items()
+            if not os.getenv(name)}
+
+
+def uvicorn_options() -> Dict[str, Any]:
+    """
+    uvicorn settings from ``HOST`` (0.0.0.0), ``PORT`` (8000),
+    ``NEWS_WORKERS`` (CPU count), ``NEWS_WORKER_CONCURRENCY`` (0, no
+    limit), ``NEWS_BACKLOG`` (2048) and ``NEWS_DRAIN_TIMEOUT`` (10).
+    """
+    concurrency = env_int("NEWS_WORKER_CONCURRENCY", 0)
+    return {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": env_int("PORT", 8000),
+        "workers": max(env_int("NEWS_WORKERS", os.cpu_count() or 1), 1),
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "limit_concurrency": concurrency if concurrency > 0 else None,
+        "backlog": env_int("NEWS_BACKLOG", 2048),
+        "timeout_graceful_shutdown": env_float("NEWS_DRAIN_TIMEOUT", 10.0),
+    }
+
+
+def _start_poller() -> Optional[subprocess.Popen]:
+    if not os.getenv("NEWS_POLL_TOPICS", "").strip():
+        return None
+    return subprocess.Popen([sys.executable, "-m", "news_app.poller"])
+
+
+def _start_pusher() -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "news_app.subscriptions"])
+
+
+def main() -> None:
+    """Serve the API with the configured worker processes."""
+    logging.basicConfig(level=logging.INFO)
+    options = uvicorn_options()
+    os.environ.update(shared_state_env(options["workers"]))
+    logger.info("Starting %d workers (loop=%s, http=%s)",
+                options["workers"], options["loop"], options["http"])
+
+    # Not poller.in_app() and subscriptions.in_app(): importing the
+    # service here would open its cache and store in the supervisor process
+    helpers = [
+        None if env_bool("NEWS_POLL_IN_APP", True) else _start_poller(),
+        None if env_bool("NEWS_PUSH_IN_APP", True) else _start_pusher(),
+    ]
+    try:
+        uvicorn.run("news_app.api:app", **options)
+    finally:
+        for helper in helpers:
+            if helper is not None:
+                helper.terminate()
+        for helper in helpers:
+            if helper is not None:
+                helper.wait(timeout=options["timeout_graceful_shutdown"] + 5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,575 @@
+"""
+News lookup service sitting between the API routes and the providers.
+
+Upstream results are cached per normalized (query, language) pair together
+with the ``limit`` they were fetched with, so a later request for the same
+topic with a smaller ``limit`` or a different ``sort_by`` is answered by
+slicing and re-sorting the cached articles instead of calling GNews again.
+Concurrent cache misses for the same parameters share one upstream call.
+
+Cached results follow HTTP-style freshness rules (RFC 5861): within
+``NEWS_CACHE_TTL`` they are fresh; for ``NEWS_CACHE_STALE_WHILE_REVALIDATE``
+seconds after that they are served immediately while a background task
+refreshes them; and for ``NEWS_CACHE_STALE_IF_ERROR`` seconds they are
+served instead of an upstream error. When the upstream quota is short
+(see :mod:`news_app.ratelimit`), any cached result is preferred over a 429.
+
+Results past the first page are addressed by an opaque cursor mapping to a
+GNews ``page`` of a fixed size. While a client pages through a topic, the
+next ``NEWS_PREFETCH_PAGES`` pages are fetched concurrently in the
+background so sequential reads are served from the cache.
+
+Results are stored through the pluggable backend chosen by
+``NEWS_CACHE_BACKEND`` (see :mod:`news_app.cache`) as compact ``marshal``
+bytes, so workers sharing an out-of-process backend skip JSON parsing.
+
+Every fetched article is also kept in the local full-text article store
+(see :mod:`news_app.store`), which answers ``source="local"`` lookups and
+``source="auto"`` lookups the upstream cannot serve. Fetched articles are
+clustered by :mod:`news_app.dedupe`: near-duplicates of a story already
+seen stay out of the store, and ``dedupe`` lookups keep one article per
+cluster.
+"""
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import marshal
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from datetime import datetime, timezone
+from typing import (Any, AsyncIterator, Dict, List, Optional, Sequence, Set,
+                    Tuple, Union)
+
+import httpx
+
+from . import deadline, encoding, metrics
+from .cache import build_backend
+from .config import env_float, env_int
+from .dedupe import DuplicateIndex
+from .providers import gnews
+from .providers.breaker import CircuitOpen
+from .providers.registry import ProviderRegistry
+from .ratelimit import RateLimited, UpstreamLimiter
+from .singleflight import SingleFlight
+from .store import ArticleStore
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, ...]
+
+# Bumped whenever the serialized CachedResult layout changes
+_CACHE_FORMAT = 1
+
+# Values of NewsResult.cache_status
+FRESH = "fresh"
+STALE = "stale"
+REVALIDATED = "revalidated"
+LOCAL = "local"
+
+
+@dataclass
+class CachePolicy:
+    """Freshness windows, in seconds, applied to cached results."""
+
+    ttl: float
+    stale_while_revalidate: float
+    stale_if_error: float
+
+    @classmethod
+    def from_env(cls) -> "CachePolicy":
+        return cls(
+            ttl=env_float("NEWS_CACHE_TTL", 60.0),
+            stale_while_revalidate=env_float(
+                "NEWS_CACHE_STALE_WHILE_REVALIDATE", 120.0),
+            stale_if_error=env_float("NEWS_CACHE_STALE_IF_ERROR", 600.0),
+        )
+
+    @property
+    def retention(self) -> float:
+        """How long an entry is kept at all, fresh or stale."""
+        return self.ttl + max(self.stale_while_revalidate,
+                              self.stale_if_error, 0.0)
+
+    def cache_control(self) -> str:
+        return (f"max-age={int(self.ttl)}, "
+                f"stale-while-revalidate={int(self.stale_while_revalidate)}, "
+                f"stale-if-error={int(self.stale_if_error)}")
+
+
+@dataclass
+class CachedResult:
+    """Articles in upstream order and the ``limit`` they were fetched with."""
+
+    articles: List[Dict[str, Any]]
+    limit: int
+    # Wall-clock time, comparable between workers sharing a backend
+    fetched_at: float = field(default_factory=time.time)
+
+    def covers(self, limit: int) -> bool:
+        """True if this result can answer a request for ``limit`` articles."""
+        # Fewer articles than requested means upstream had no more to give
+        return self.limit >= limit or len(self.articles) < self.limit
+
+    def age(self) -> float:
+        return max(time.time() - self.fetched_at, 0.0)
+
+    def to_bytes(self) -> bytes:
+        return marshal.dumps(
+            (_CACHE_FORMAT, self.limit, self.fetched_at, self.articles))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional["CachedResult"]:
+        """Decode a stored result; unreadable or outdated data is a miss."""
+        try:
+            version, limit, fetched_at, articles = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            return None
+        if version != _CACHE_FORMAT:
+            return None
+        return cls(articles, limit, fetched_at)
+
+
+@dataclass
+class NewsResult:
+    """A /news response body plus how the cache produced it."""
+
+    body: Dict[str, Any]
+    cache_status: str
+    age: float = 0.0
+    # What the body was built from (cache entry and request parameters),
+    # when that determines it; the ETag is then derived without encoding
+    version: Optional[str] = None
+
+    def headers(self) -> Dict[str, str]:
+        """Response headers describing freshness of the body."""
+        return {
+            "X-Cache-Status": self.cache_status,
+            "Age": str(int(self.age)),
+            "Cache-Control": policy.cache_control(),
+        }
+
+    @cached_property
+    def json(self) -> bytes:
+        """The body encoded as JSON, once per result."""
+        return encoding.dumps(self.body)
+
+    def etag(self) -> str:
+        """
+        Weak validator for the body, hashed from its ``version`` or, without
+        one, from its JSON encoding.
+        """
+        source = self.version.encode() if self.version else self.json
+        digest = hashlib.blake2b(source, digest_size=12)
+        return f'W/"{digest.hexdigest()}"'
+
+
+policy = CachePolicy.from_env()
+cache = build_backend()
+flights = SingleFlight()
+limiter = UpstreamLimiter.from_env()
+providers = ProviderRegistry.from_env(limiter)
+store = ArticleStore.from_env()
+duplicates = DuplicateIndex.from_env()
+prefetch_pages = env_int("NEWS_PREFETCH_PAGES", 2)
+
+# Strong references to background refreshes so they are not collected
+_background: Set["asyncio.Task[Any]"] = set()
+
+
+def cache_key(query: str, language: str, page: int = 1,
+              page_size: int = 0) -> CacheKey:
+    """
+    Normalize request parameters into a cache key.
+
+    The first page is keyed by query and language only, so any smaller
+    ``limit`` is served from it. Later pages also depend on the page size.
+    """
+    key = (" ".join(query.lower().split()), language.lower())
+    if page > 1:
+        key += (str(page), str(page_size))
+    return key
+
+
+def encode_cursor(page: int, page_size: int) -> str:
+    """Opaque cursor pointing at ``page`` of ``page_size`` articles."""
+    raw = json.dumps({"p": page, "n": page_size}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Decode a cursor from :func:`encode_cursor`.
+
+    Returns:
+        (page, page_size)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        page, page_size = int(data["p"]), int(data["n"])
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if page < 1 or not 1 <= page_size <= 20:
+        raise ValueError("Invalid cursor")
+    return page, page_size
+
+
+def storage_key(key: CacheKey) -> str:
+    """Backend key for a normalized cache key."""
+    # \x1f (unit separator) cannot appear in a normalized query
+    return "news:" + "\x1f".join(key)
+
+
+async def load_cached(key: CacheKey) -> Optional[CachedResult]:
+    """Read and decode the cached result for ``key``, if any."""
+    data = await cache.get(storage_key(key))
+    return CachedResult.from_bytes(data) if data is not None else None
+
+
+async def store_cached(key: CacheKey, result: CachedResult) -> None:
+    """Encode and store ``result`` for as long as it may be served."""
+    if policy.retention > 0:
+        await cache.set(storage_key(key), result.to_bytes(),
+                        policy.retention)
+
+
+def _build_response(articles: List[Dict[str, Any]], query: str, limit: int,
+                    sort_by: str, page: int = 1) -> Dict[str, Any]:
+    # A full page means upstream may have more
+    has_next = len(articles) >= limit
+    with metrics.stage("sort"):
+        articles = gnews.sort_articles(articles[:limit], sort_by)
+    return {
+        "articles": articles,
+        "total": len(articles),
+        "query": query,
+        "next_cursor": encode_cursor(page + 1, limit) if has_next else None
+    }
+
+
+def parse_since(value: str) -> str:
+    """
+    Normalize a ``since`` timestamp to the ``publishedAt`` format.
+
+    Accepts ISO 8601 with a "Z" or numeric offset (naive times are UTC).
+
+    Raises:
+        ValueError: If ``value`` is not an ISO 8601 timestamp
+    """
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError("since must be an ISO 8601 timestamp")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _only_since(result: NewsResult, since: str) -> NewsResult:
+    """Drop articles published at or before ``since``."""
+    articles = [a for a in result.body["articles"]
+                if a.get("publishedAt", "") > since]
+    if len(articles) == len(result.body["articles"]):
+        return result
+    # Pages are newest first, so later pages hold nothing newer
+    body = dict(result.body, articles=articles, total=len(articles),
+                next_cursor=None)
+    version = f"{result.version}|since={since}" if result.version else None
+    return NewsResult(body, result.cache_status, result.age, version)
+
+
+def _deduplicated(result: NewsResult) -> NewsResult:
+    """Keep the first article of each near-duplicate cluster."""
+    articles = duplicates.dedupe(result.body["articles"])
+    if len(articles) == len(result.body["articles"]):
+        return result
+    body = dict(result.body, articles=articles, total=len(articles))
+    # Clusters depend on every article seen so far, not just this entry
+    return NewsResult(body, result.cache_status, result.age)
+
+
+async def fetch_news(query: str, limit: int, sort_by: str,
+                     language: str, page: int = 1,
+                     source: str = "upstream",
+                     since: Optional[str] = None,
+                     dedupe: bool = False) -> NewsResult:
+    """
+    Fetch news articles, serving from the cache when possible.
+
+    Args:
+        query: Search query term
+        limit: Number of articles to return (1-20); the page size when
+            ``page`` is past the first
+        sort_by: Sort order - "publishedAt", "title" or "relevance"
+            (provider order upstream, BM25 rank locally)
+        language: Language code (e.g., "en")
+        page: 1-based page, usually taken from a cursor
+        source: "upstream" (cache, then providers), "local" (article
+            store only) or "auto" (upstream, falling back to the store
+            when the upstream cannot answer)
+        since: Only return articles published after this timestamp (as
+            normalized by :func:`parse_since`)
+        dedupe: Return one article per near-duplicate cluster
+
+    Returns:
+        NewsResult with the response body and its cache status
+
+    Raises:
+        ValueError: If GNEWS_API_KEY is not configured
+        RateLimited: If the upstream quota is exhausted and nothing is
+            cached for the query
+        CircuitOpen: If every provider's circuit breaker is open and
+            nothing is cached for the query
+        httpx.HTTPError: If the upstream request fails and no cached
+            result is recent enough to serve instead
+    """
+    if source == "local":
+        result = await _lookup_local(query, limit, sort_by, language, page,
+                                     since)
+    else:
+        try:
+            result = await _lookup(query, limit, sort_by, language, page)
+        except (RateLimited, httpx.HTTPError):
+            if source != "auto":
+                raise
+            result = await _lookup_local(query, limit, sort_by, language,
+                                         page, since)
+            if not result.body["articles"]:
+                raise
+        else:
+            if page > 1 and result.body["next_cursor"]:
+                _prefetch(query, limit, language, page)
+            if since is not None:
+                result = _only_since(result, since)
+    if dedupe:
+        result = _deduplicated(result)
+    metrics.RESULTS.inc(cache_status=result.cache_status)
+    return result
+
+
+async def _lookup_local(query: str, limit: int, sort_by: str,
+                        language: str, page: int,
+                        since: Optional[str] = None) -> NewsResult:
+    """Answer from the article store without calling upstream."""
+    # One extra row tells whether another page exists
+    articles = await store.search(query, language, limit + 1, sort_by,
+                                  offset=(page - 1) * limit, since=since)
+    has_next = len(articles) > limit
+    articles = articles[:limit]
+    body = {
+        "articles": articles,
+        "total": len(articles),
+        "query": query,
+        "next_cursor": encode_cursor(page + 1, limit) if has_next else None
+    }
+    return NewsResult(body, LOCAL)
+
+
+async def _lookup(query: str, limit: int, sort_by: str, language: str,
+                  page: int) -> NewsResult:
+    key = cache_key(query, language, page, limit)
+    with metrics.stage("cache"):
+        stored = await load_cached(key)
+    cached = stored if stored is not None and stored.covers(limit) else None
+
+    def respond(source: CachedResult, status: str,
+                age: float = 0.0) -> NewsResult:
+        body = _build_response(source.articles, query, limit, sort_by, page)
+        version = repr((key, source.fetched_at, source.limit, query, limit,
+                        sort_by, page))
+        return NewsResult(body, status, age, version)
+
+    if cached is not None:
+        age = cached.age()
+        if age < policy.ttl:
+            return respond(cached, FRESH, age)
+        if age < policy.ttl + policy.stale_while_revalidate:
+            _refresh_in_background(key, query, cached.limit, language, page)
+            return respond(cached, STALE, age)
+
+    try:
+        fetched = await _fetch_coalesced(key, query, limit, language, page)
+    except (RateLimited, CircuitOpen):
+        if stored is None:
+            raise
+        # Out of quota or upstream tripped: any cached answer, even short
+        # or old, beats failing fast
+        return respond(stored, STALE, stored.age())
+    except httpx.HTTPError:
+        if cached is not None and (
+                cached.age() < policy.ttl + policy.stale_if_error):
+            logger.warning("Upstream failed, serving stale result for %r",
+                           key)
+            return respond(cached, STALE, cached.age())
+        raise
+    return respond(fetched, REVALIDATED)
+
+
+async def warm(query: str, limit: int, language: str,
+               max_age: float = 0.0) -> bool:
+    """
+    Refresh the cache and article store for a standing topic.
+
+    Args:
+        query: Search query term
+        limit: Page size to fetch
+        language: Language code
+        max_age: Skip the fetch if a covering cached result is younger
+
+    Returns:
+        True if upstream was called, False if the cached result was kept
+    """
+    key = cache_key(query, language)
+    stored = await load_cached(key)
+    if stored is not None and stored.covers(limit) and (
+            stored.age() < max_age):
+        return False
+    await _fetch_coalesced(key, query, limit, language)
+    return True
+
+
+def _prefetch(query: str, page_size: int, language: str, page: int) -> None:
+    """Warm the cache with the pages after ``page`` in the background."""
+    for ahead in range(page + 1, page + 1 + prefetch_pages):
+        key = cache_key(query, language, ahead, page_size)
+        _refresh_in_background(key, query, page_size, language, ahead,
+                               only_if_missing=True)
+
+
+NewsSpec = Tuple[str, int, str, str]
+
+
+async def iter_batch(
+        specs: Sequence[NewsSpec],
+        concurrency: Optional[int] = None,
+) -> AsyncIterator[Tuple[int, Union[NewsResult, Exception]]]:
+    """
+    Fetch many (query, limit, sort_by, language) specs concurrently.
+
+    Identical specs are fetched once. Specs sharing a cache key run in
+    descending ``limit`` order so the largest fetch fills the cache for the
+    rest. At most ``concurrency`` cache keys (``NEWS_BATCH_CONCURRENCY``,
+    default 8) are fetched at the same time.
+
+    Yields:
+        (index into ``specs``, NewsResult or the raised exception) pairs,
+        as soon as each spec completes
+    """
+    if concurrency is None:
+        concurrency = env_int("NEWS_BATCH_CONCURRENCY", 8)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    groups: Dict[CacheKey, Dict[NewsSpec, List[int]]] = {}
+    for index, spec in enumerate(specs):
+        query, _, _, language = spec
+        group = groups.setdefault(cache_key(query, language), {})
+        group.setdefault(spec, []).append(index)
+
+    done: "asyncio.Queue[Tuple[NewsSpec, Any]]" = asyncio.Queue()
+
+    async def run_group(group: Dict[NewsSpec, List[int]]) -> None:
+        async with semaphore:
+            for spec in sorted(group, key=lambda spec: -spec[1]):
+                try:
+                    outcome = await fetch_news(*spec)
+                except Exception as e:
+                    outcome = e
+                done.put_nowait((spec, outcome))
+
+    tasks = [asyncio.ensure_future(run_group(group))
+             for group in groups.values()]
+    indices = {spec: positions for group in groups.values()
+               for spec, positions in group.items()}
+    try:
+        for _ in range(len(indices)):
+            spec, outcome = await done.get()
+            for index in indices[spec]:
+                yield index, outcome
+    finally:
+        # The consumer may stop early, e.g. a streaming client went away
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_batch(
+        specs: Sequence[NewsSpec],
+        concurrency: Optional[int] = None,
+) -> List[Union[NewsResult, Exception]]:
+    """
+    Fetch many specs concurrently, see :func:`iter_batch`.
+
+    Returns:
+        One NewsResult or the raised exception per spec, in input order
+    """
+    outcomes: List[Union[NewsResult, Exception, None]] = [None] * len(specs)
+    async for index, outcome in iter_batch(specs, concurrency):
+        outcomes[index] = outcome
+    return outcomes
+
+
+async def _fetch_coalesced(key: CacheKey, query: str, limit: int,
+                           language: str, page: int = 1) -> CachedResult:
+    flight = flights.do(
+        key + (str(limit),),
+        lambda: _fetch_upstream(key, query, limit, language, page))
+    left = deadline.remaining()
+    if left is None:
+        return await flight
+    # The shared fetch runs under the first caller's deadline; later
+    # callers stop waiting at their own
+    try:
+        return await asyncio.wait_for(flight, left)
+    except asyncio.TimeoutError:
+        raise httpx.TimeoutException("Request timeout")
+
+
+async def _fetch_upstream(key: CacheKey, query: str, limit: int,
+                          language: str, page: int) -> CachedResult:
+    """Fetch one result set from the providers and store it in the cache."""
+    # Providers return newest first; sorting is applied per request
+    with metrics.stage("upstream"):
+        _, articles = await providers.fetch(query, limit, language, page)
+    fetched = CachedResult(articles, limit)
+    await store_cached(key, fetched)
+    try:
+        # Syndicated copies of a stored story would only bloat the store
+        with metrics.stage("store"):
+            await store.add(duplicates.originals(articles), language)
+    except sqlite3.Error as e:
+        logger.warning("Could not add articles for %r to the store: %s",
+                       key, e)
+    return fetched
+
+
+def _refresh_in_background(key: CacheKey, query: str, limit: int,
+                           language: str, page: int = 1,
+                           only_if_missing: bool = False) -> None:
+    """Refresh (or prefetch) an entry without making the caller wait."""
+    async def refresh():
+        # Runs past the response, so not bound by the request deadline
+        deadline.set_timeout(None)
+        metrics.detach()
+        try:
+            if only_if_missing and await load_cached(key) is not None:
+                return
+            await _fetch_coalesced(key, query, limit, language, page)
+        except Exception as e:
+            logger.warning("Background refresh of %r failed: %s", key, e)
+
+    task = asyncio.ensure_future(refresh())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def drain(timeout: float = 10.0) -> None:
+    """Wait for background refreshes and prefetches still in flight."""
+    if _background:
+        await asyncio.wait(set(_background), timeout=timeout)
@@ -0,0 +1,265 @@
+"""
+Local article store with a full-text index.
+
+Every article fetched from a provider is kept in SQLite, deduplicated by
+URL, with an FTS5 index over title and description. Keyword queries can
+then be answered locally, ranked by BM25 or read in ``publishedAt`` /
+``title`` order straight from B-tree indexes. Articles are dropped once
+they have been stored longer than ``max_age`` seconds, and the oldest
+published articles go first when the store holds more than
+``max_articles``.
+
+Statements run in a worker thread so a slow disk or a writer in another
+worker never stalls the event loop.
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import env_float, env_int
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    source TEXT NOT NULL,
+    published_at TEXT NOT NULL,
+    image TEXT NOT NULL,
+    language TEXT NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published
+    ON articles (language, published_at);
+DROP INDEX IF EXISTS articles_title;
+CREATE INDEX IF NOT EXISTS articles_title_published
+    ON articles (language, title COLLATE NOCASE, published_at);
+CREATE INDEX IF NOT EXISTS articles_stored ON articles (stored_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, content='articles', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, description)
+    VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO articles_fts (rowid, title, description)
+    VALUES (new.id, new.title, new.description);
+END;
+"""
+
+_COLUMNS = "a.title, a.url, a.description, a.source, a.published_at, a.image"
+
+# Matches are read through an index in the requested order; the FTS lookup
+# becomes a rowid set probed for each index entry. The index is named
+# because with ``since`` the planner would otherwise pick the published_at
+# range and sort titles in a temporary B-tree; the title index carries
+# published_at so that filter is still answered from the index.
+_ORDERED_SEARCH = (
+    f"SELECT {_COLUMNS} FROM articles a INDEXED BY {{index}} "
+    "WHERE a.language = ? {since}AND a.id IN "
+    "(SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?) "
+    "ORDER BY {order} LIMIT ? OFFSET ?")
+_ORDERS = {
+    "publishedAt": ("articles_published", "a.published_at DESC"),
+    "title": ("articles_title_published", "a.title COLLATE NOCASE"),
+}
+_RANKED_SEARCH = (
+    f"SELECT {_COLUMNS} FROM articles_fts f "
+    "JOIN articles a ON a.id = f.rowid "
+    "WHERE articles_fts MATCH ? AND a.language = ? {since}"
+    "ORDER BY bm25(articles_fts, 2.0, 1.0) LIMIT ? OFFSET ?")
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    Turn a free-text query into an FTS5 expression matching every word.
+
+    Words are quoted so FTS5 operators in user input are taken literally.
+    Returns None when the query has no searchable words.
+    """
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+class ArticleStore:
+    """
+    SQLite article store with FTS5 search.
+
+    Args:
+        path: Database file, or ":memory:" for a per-process store
+        max_age: Seconds an article is kept after it was last fetched
+        max_articles: Maximum number of articles kept (0 disables storing)
+        clock: Wall-clock time source (overridable for tests)
+    """
+
+    def __init__(self, path: str = ":memory:", max_age: float = 7 * 86400,
+                 max_articles: int = 10000,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_age = max_age
+        self.max_articles = max_articles
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.searches = 0
+        self.expired = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """The open connection, reopened if the store was closed."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0,
+                                   check_same_thread=False,
+                                   isolation_level=None)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @classmethod
+    def from_env(cls) -> "ArticleStore":
+        """
+        Build the store from ``NEWS_STORE_PATH`` (in memory by default),
+        ``NEWS_STORE_MAX_AGE_HOURS`` (168) and ``NEWS_STORE_MAX_ARTICLES``
+        (10000).
+        """
+        return cls(
+            path=os.getenv("NEWS_STORE_PATH") or ":memory:",
+            max_age=env_float("NEWS_STORE_MAX_AGE_HOURS", 168.0) * 3600,
+            max_articles=env_int("NEWS_STORE_MAX_ARTICLES", 10000),
+        )
+
+    async def add(self, articles: List[Dict[str, Any]],
+                  language: str) -> None:
+        """Store articles, replacing earlier copies of the same URL."""
+        if self.max_articles <= 0:
+            return
+        now = self._clock()
+        rows = [
+            (a.get("url", ""), a.get("title", ""),
+             a.get("description") or "", a.get("source", "Unknown"),
+             a.get("publishedAt", ""), a.get("urlToImage") or "",
+             language, now)
+            for a in articles if a.get("url")
+        ]
+        await asyncio.to_thread(self._add, rows, now)
+
+    def _add(self, rows: List[Tuple[Any, ...]], now: float) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN")
+            try:
+                db.executemany(
+                    "INSERT INTO articles (url, title, description, source, "
+                    "published_at, image, language, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (url) DO UPDATE SET "
+                    "title = excluded.title, "
+                    "description = excluded.description, "
+                    "source = excluded.source, "
+                    "published_at = excluded.published_at, "
+                    "image = excluded.image, "
+                    "language = excluded.language, "
+                    "stored_at = excluded.stored_at", rows)
+                self._enforce_retention(db, now)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _enforce_retention(self, db: sqlite3.Connection, now: float) -> None:
+        """Drop expired articles, then the oldest published over budget."""
+        cursor = db.execute(
+            "DELETE FROM articles WHERE stored_at < ?", (now - self.max_age,))
+        self.expired += cursor.rowcount
+        count = db.execute("SELECT COUNT(*) FROM articles").fetchone()
+        excess = count[0] - self.max_articles
+        if excess > 0:
+            db.execute(
+                "DELETE FROM articles WHERE id IN (SELECT id FROM articles "
+                "ORDER BY published_at LIMIT ?)", (excess,))
+            self.expired += excess
+
+    async def search(self, query: str, language: str, limit: int,
+                     sort_by: str = "relevance", offset: int = 0,
+                     since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find stored articles matching every word of ``query``.
+
+        Args:
+            query: Free-text keywords
+            language: Language code the articles were fetched for
+            limit: Maximum number of articles
+            sort_by: "relevance" (BM25), "publishedAt" or "title"
+            offset: Number of matches to skip
+            since: Only articles with a later ``publishedAt``
+
+        Returns:
+            Article dicts in the same shape providers return
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        newer = (since,) if since else ()
+        since_clause = "AND a.published_at > ? " if since else ""
+        if sort_by in _ORDERS:
+            index, order = _ORDERS[sort_by]
+            sql = _ORDERED_SEARCH.format(index=index, order=order,
+                                         since=since_clause)
+            params = (language, *newer, expression, limit, offset)
+        else:
+            sql = _RANKED_SEARCH.format(since=since_clause)
+            params = (expression, language, *newer, limit, offset)
+        rows = await asyncio.to_thread(self._fetch, sql, params)
+        self.searches += 1
+        return [
+            {"title": title, "url": url, "description": description,
+             "source": source, "publishedAt": published_at,
+             "urlToImage": image}
+            for title, url, description, source, published_at, image in rows
+        ]
+
+    def _fetch(self, sql: str, params: Tuple[Any, ...]) -> List[Any]:
+        with self._lock:
+            return self._db().execute(sql, params).fetchall()
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._fetch, "DELETE FROM articles", ())
+        self.searches = self.expired = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._db().execute(
+                "SELECT COUNT(*) FROM articles").fetchone()[0]
+        return {
+            "articles": count,
+            "max_articles": self.max_articles,
+            "max_age_hours": round(self.max_age / 3600, 1),
+            "searches": self.searches,
+            "expired": self.expired,
+        }
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
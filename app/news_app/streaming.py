@@ -0,0 +1,54 @@
+"""
+Streaming response encodings for /news and /news/batch.
+
+Results can be streamed as newline-delimited JSON (``application/x-ndjson``)
+or Server-Sent Events (``text/event-stream``), selected with the ``stream``
+query parameter or the ``Accept`` header. Both carry the same events: one
+``{"event": name, "data": payload}`` record per line for NDJSON, or an
+``event:``/``data:`` pair per SSE message.
+"""
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from .encoding import dumps
+
+NDJSON = "application/x-ndjson"
+SSE = "text/event-stream"
+
+_FORMATS = {"ndjson": NDJSON, "sse": SSE}
+
+Event = Tuple[str, Any]
+
+
+def negotiate(stream: Optional[str], accept: Optional[str]) -> Optional[str]:
+    """
+    Pick the streaming media type for a request, if any.
+
+    Args:
+        stream: Value of the ``stream`` query parameter ("ndjson"/"sse")
+        accept: The request ``Accept`` header
+
+    Returns:
+        NDJSON or SSE media type, or None for a regular JSON response
+    """
+    if stream:
+        return _FORMATS.get(stream)
+    if accept:
+        for media_range in accept.split(","):
+            media_type = media_range.split(";")[0].strip().lower()
+            if media_type in (NDJSON, SSE):
+                return media_type
+    return None
+
+
+def encode_event(media_type: str, event: str, data: Any) -> bytes:
+    """Encode one event in the given streaming media type."""
+    if media_type == SSE:
+        return b"event: %s\ndata: %s\n\n" % (event.encode(), dumps(data))
+    return dumps({"event": event, "data": data}) + b"\n"
+
+
+async def encode_stream(media_type: str,
+                        events: AsyncIterator[Event]) -> AsyncIterator[bytes]:
+    """Encode an async stream of (event, data) pairs as it is produced."""
+    async for event, data in events:
+        yield encode_event(media_type, event, data)
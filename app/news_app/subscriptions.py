@@ -0,0 +1,865 @@
+"""
+Push delivery of new articles to topic subscribers.
+
+Instead of every consumer polling ``/news``, clients subscribe to a
+(query, language) topic with a webhook URL or over a websocket. Each topic
+is fetched once per ``NEWS_PUSH_INTERVAL`` through the same cached,
+coalesced and rate-limited path as ``/news``, however many subscribers it
+has, and only articles whose URL was not seen before are pushed. The
+first fetch of a topic only records what is already there.
+
+Deliveries are sent in batches of up to ``NEWS_PUSH_BATCH`` articles, at
+most ``NEWS_PUSH_CONCURRENCY`` webhook calls at a time. A failed webhook
+call is queued for retry with exponential backoff, up to
+``NEWS_PUSH_RETRIES`` times, then dropped.
+
+Webhooks are only called on public addresses: a callback URL whose host
+resolves to a loopback, private, link-local, reserved or multicast address
+is refused when subscribing, and the host is resolved and checked again
+for every call, which then goes to the address checked, so the service
+cannot be used to reach internal endpoints. Each body is signed with the
+subscription's secret (see :func:`sign`) so receivers can tell it came
+from this service.
+
+Subscriptions, the URLs seen per topic and recent batches are kept in
+SQLite next to the article store (``NEWS_STORE_PATH``), so any worker can
+create, show or cancel any subscription. Topics are fetched and webhooks
+called by a single process: the API itself, or with ``NEWS_PUSH_IN_APP``
+off a separate pusher (``python -m news_app.subscriptions``), as the
+production server arranges for several workers. Each worker holding
+websocket connections reads new batches from the database once per
+``follow_interval``, in a worker thread, and hands them to the sockets
+following their topics, which skip the oldest when more than
+``WEBSOCKET_BACKLOG`` are waiting.
+"""
+import asyncio
+import hashlib
+import heapq
+import hmac
+import ipaddress
+import itertools
+import json
+import logging
+import os
+import secrets
+import signal
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple)
+
+import httpx
+
+from . import metrics, service
+from .config import env_bool, env_float, env_int
+from .encoding import dumps
+from .providers import http
+from .providers.base import Article
+
+logger = logging.getLogger(__name__)
+
+# Topics are fetched at the largest page size, like the poller's
+PUSH_LIMIT = 20
+
+# Batches a websocket subscriber may have waiting before the oldest are
+# skipped
+WEBSOCKET_BACKLOG = 100
+
+# A websocket subscription not refreshed for this long belongs to a worker
+# that is gone, and is dropped
+STALE_AFTER = 60.0
+
+# Seconds batches are kept for websocket subscribers to read
+BATCH_RETENTION = 600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    id TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    language TEXT NOT NULL,
+    callback_url TEXT,
+    secret TEXT,
+    owner TEXT,
+    created REAL NOT NULL,
+    heartbeat REAL NOT NULL,
+    delivered INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    dropped INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS subscriptions_topic
+    ON subscriptions (query, language);
+
+CREATE TABLE IF NOT EXISTS subscription_topics (
+    query TEXT NOT NULL,
+    language TEXT NOT NULL,
+    primed REAL NOT NULL,
+    PRIMARY KEY (query, language)
+);
+CREATE TABLE IF NOT EXISTS subscription_seen (
+    query TEXT NOT NULL,
+    language TEXT NOT NULL,
+    key TEXT NOT NULL,
+    seen INTEGER NOT NULL,
+    PRIMARY KEY (query, language, key)
+);
+CREATE INDEX IF NOT EXISTS subscription_seen_order
+    ON subscription_seen (query, language, seen);
+
+CREATE TABLE IF NOT EXISTS subscription_batches (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    query TEXT NOT NULL,
+    language TEXT NOT NULL,
+    articles TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subscription_batches_topic
+    ON subscription_batches (query, language, seq);
+"""
+
+_FIELDS = ("id, query, language, callback_url, created, delivered, failed, "
+           "dropped, secret, owner")
+
+
+class UnsafeCallback(ValueError):
+    """A webhook URL whose host resolves to a non-public address."""
+
+
+def _public(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    # Not global: loopback, private, link-local, shared, reserved, ...
+    return ip.is_global and not ip.is_multicast
+
+
+async def _addresses(host: str, port: int) -> List[str]:
+    """IP addresses of ``host``, which may be an address already."""
+    try:
+        return [str(ipaddress.ip_address(host))]
+    except ValueError:
+        pass
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise httpx.ConnectError(f"Cannot resolve {host}: {e}")
+    return [info[4][0] for info in infos]
+
+
+async def pin_callback(url: str, allow_private: bool = False
+                       ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """
+    Resolve a webhook URL and point it at the address checked.
+
+    The call then goes to that address with the original ``Host`` header
+    and TLS server name, so a DNS answer changing between the check and
+    the call cannot redirect it.
+
+    Returns:
+        The URL with its host replaced by the address, the headers and the
+        request extensions to send with it
+
+    Raises:
+        UnsafeCallback: If the host resolves to a non-public address and
+            ``allow_private`` is off
+        httpx.ConnectError: If the host does not resolve
+    """
+    parsed = httpx.URL(url)
+    addresses = await _addresses(
+        parsed.host,
+        parsed.port or (443 if parsed.scheme == "https" else 80))
+    if not allow_private:
+        for address in addresses:
+            if not _public(address):
+                raise UnsafeCallback(
+                    f"{parsed.host} resolves to non-public address "
+                    f"{address}")
+    extensions = {"sni_hostname": parsed.host} if (
+        parsed.scheme == "https") else {}
+    return (str(parsed.copy_with(host=addresses[0])),
+            {"Host": parsed.netloc.decode()}, extensions)
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    """
+    The ``X-News-Signature`` of a webhook body: HMAC-SHA256 keyed with the
+    subscription secret over ``"{timestamp}."`` followed by the body, sent
+    with the ``X-News-Timestamp`` header, as ``sha256=<hex digest>``.
+    """
+    message = f"{timestamp}.".encode() + body
+    return "sha256=" + hmac.new(secret.encode(), message,
+                                hashlib.sha256).hexdigest()
+
+
+@dataclass
+class Subscription:
+    """A subscriber to one topic, reached by webhook or websocket."""
+
+    id: str
+    query: str
+    language: str = "en"
+    callback_url: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    delivered: int = 0
+    failed: int = 0
+    dropped: int = 0
+    # Webhook signing key, only shown when the subscription is created
+    secret: Optional[str] = field(default=None, repr=False)
+    # Name of the client that created it, when clients are configured
+    owner: Optional[str] = None
+
+    @property
+    def transport(self) -> str:
+        return "webhook" if self.callback_url else "websocket"
+
+    def describe(self) -> Dict[str, Any]:
+        """Public view of the subscription."""
+        return {
+            "id": self.id,
+            "query": self.query,
+            "language": self.language,
+            "transport": self.transport,
+            "callback_url": self.callback_url,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+class SubscriptionStore:
+    """
+    Subscriptions, seen article URLs and recent batches in SQLite.
+
+    Args:
+        path: Database file shared by the workers, or ":memory:" for a
+            single process
+        seen_capacity: Article URLs remembered per topic
+        clock: Wall-clock time source (overridable for tests)
+    """
+
+    def __init__(self, path: str = ":memory:", seen_capacity: int = 1000,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.seen_capacity = seen_capacity
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """The open connection, reopened if the store was closed."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0,
+                                   check_same_thread=False,
+                                   isolation_level=None)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def add(self, subscription: Subscription, limit: int) -> None:
+        """
+        Store a new subscription.
+
+        Raises:
+            OverflowError: If ``limit`` subscriptions are stored already
+        """
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                count = db.execute(
+                    "SELECT COUNT(*) FROM subscriptions").fetchone()[0]
+                if count >= limit:
+                    raise OverflowError("Too many subscriptions")
+                db.execute(
+                    "INSERT INTO subscriptions (id, query, language, "
+                    "callback_url, secret, owner, created, heartbeat) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (subscription.id, subscription.query,
+                     subscription.language, subscription.callback_url,
+                     subscription.secret, subscription.owner,
+                     subscription.created, self._clock()))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def remove(self, subscription_id: str) -> bool:
+        """
+        Delete a subscription, and its topic's state once it has no
+        subscribers left; False if it does not exist.
+        """
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT query, language FROM subscriptions WHERE id = ?",
+                    (subscription_id,)).fetchone()
+                if row is not None:
+                    db.execute("DELETE FROM subscriptions WHERE id = ?",
+                               (subscription_id,))
+                    self._forget_topics(db)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return row is not None
+
+    def get(self, subscription_id: str) -> Optional[Subscription]:
+        with self._lock:
+            row = self._db().execute(
+                f"SELECT {_FIELDS} FROM subscriptions WHERE id = ?",
+                (subscription_id,)).fetchone()
+        return Subscription(*row) if row is not None else None
+
+    def subscribers(self, query: str, language: str) -> List[Subscription]:
+        """Live subscribers of a topic."""
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {_FIELDS} FROM subscriptions "
+                "WHERE query = ? AND language = ? ORDER BY created",
+                (query, language)).fetchall()
+        return [Subscription(*row) for row in rows]
+
+    def topics(self) -> List[Tuple[str, str]]:
+        """Topics with subscribers, after dropping stale websockets."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                stale = db.execute(
+                    "DELETE FROM subscriptions WHERE callback_url IS NULL "
+                    "AND heartbeat < ?", (self._clock() - STALE_AFTER,))
+                if stale.rowcount:
+                    self._forget_topics(db)
+                rows = db.execute(
+                    "SELECT DISTINCT query, language FROM subscriptions"
+                ).fetchall()
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return [(query, language) for query, language in rows]
+
+    @staticmethod
+    def _forget_topics(db: sqlite3.Connection) -> None:
+        """Drop the state of topics nobody subscribes to any more."""
+        for table in ("subscription_topics", "subscription_seen",
+                      "subscription_batches"):
+            db.execute(
+                f"DELETE FROM {table} WHERE NOT EXISTS (SELECT 1 FROM "
+                f"subscriptions s WHERE s.query = {table}.query "
+                f"AND s.language = {table}.language)")
+
+    def diff(self, query: str, language: str,
+             articles: List[Article]) -> List[Article]:
+        """
+        Articles of a topic not seen before, remembering them. Nothing is
+        new on the first fetch of a topic.
+        """
+        keys: Dict[str, Article] = {}
+        for article in articles:
+            keys.setdefault(article.get("url") or article.get("title", ""),
+                            article)
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                primed = db.execute(
+                    "SELECT 1 FROM subscription_topics "
+                    "WHERE query = ? AND language = ?",
+                    (query, language)).fetchone() is not None
+                seen = {key for key, in db.execute(
+                    "SELECT key FROM subscription_seen WHERE query = ? "
+                    "AND language = ? AND key IN "
+                    f"({', '.join('?' * len(keys))})",
+                    (query, language, *keys))} if keys else set()
+                new = [key for key in keys if key not in seen]
+                # URLs are numbered in the order seen; the oldest go first
+                order = db.execute(
+                    "SELECT COALESCE(MAX(seen), 0) FROM subscription_seen "
+                    "WHERE query = ? AND language = ?",
+                    (query, language)).fetchone()[0]
+                db.executemany(
+                    "INSERT INTO subscription_seen (query, language, key, "
+                    "seen) VALUES (?, ?, ?, ?)",
+                    [(query, language, key, order + n)
+                     for n, key in enumerate(new, 1)])
+                db.execute(
+                    "DELETE FROM subscription_seen WHERE query = ? AND "
+                    "language = ? AND seen <= ?",
+                    (query, language,
+                     order + len(new) - self.seen_capacity))
+                db.execute(
+                    "INSERT OR IGNORE INTO subscription_topics "
+                    "(query, language, primed) VALUES (?, ?, ?)",
+                    (query, language, self._clock()))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return [keys[key] for key in new] if primed else []
+
+    def add_batch(self, query: str, language: str,
+                  articles: List[Article]) -> None:
+        """Keep a batch for websocket subscribers, dropping old ones."""
+        now = self._clock()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO subscription_batches (query, language, "
+                "articles, created) VALUES (?, ?, ?, ?)",
+                (query, language, dumps(articles).decode(), now))
+            db.execute("DELETE FROM subscription_batches WHERE created < ?",
+                       (now - BATCH_RETENTION,))
+
+    def last_batch(self) -> int:
+        """Sequence number of the latest batch."""
+        with self._lock:
+            return self._db().execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM subscription_batches"
+            ).fetchone()[0]
+
+    def batches_after(self, seq: int
+                      ) -> List[Tuple[int, str, str, List[Article]]]:
+        """
+        Batches of every topic newer than ``seq``, oldest first, as
+        (seq, query, language, articles).
+        """
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT seq, query, language, articles "
+                "FROM subscription_batches WHERE seq > ? ORDER BY seq",
+                (seq,)).fetchall()
+        return [(seq, query, language, json.loads(articles))
+                for seq, query, language, articles in rows]
+
+    def touch(self, subscription_id: str) -> None:
+        """Mark a websocket subscription as still connected."""
+        with self._lock:
+            self._db().execute(
+                "UPDATE subscriptions SET heartbeat = ? WHERE id = ?",
+                (self._clock(), subscription_id))
+
+    def count(self, subscription_id: str, outcome: str,
+              amount: int = 1) -> None:
+        """Add to a delivery counter: "delivered", "failed" or "dropped"."""
+        if outcome not in ("delivered", "failed", "dropped"):
+            raise ValueError(f"Unknown outcome {outcome!r}")
+        with self._lock:
+            self._db().execute(
+                f"UPDATE subscriptions SET {outcome} = {outcome} + ? "
+                "WHERE id = ?", (amount, subscription_id))
+
+    def sizes(self) -> Tuple[int, int]:
+        """Number of subscriptions and of topics."""
+        with self._lock:
+            return self._db().execute(
+                "SELECT (SELECT COUNT(*) FROM subscriptions), "
+                "(SELECT COUNT(*) FROM (SELECT DISTINCT query, language "
+                "FROM subscriptions))").fetchone()
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            for table in ("subscriptions", "subscription_topics",
+                          "subscription_seen", "subscription_batches"):
+                db.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class PushHub:
+    """
+    Fetch subscribed topics and push new articles to their subscribers.
+
+    Args:
+        store: Where subscriptions and topic state are kept
+        interval: Seconds between fetches of a topic
+        batch_size: Most articles per delivery
+        concurrency: Most webhook calls in flight
+        retries: Retries of a failed webhook delivery
+        retry_base: Seconds before the first retry, doubled each time
+        max_subscriptions: Most subscriptions accepted
+        follow_interval: Seconds between reads of new batches for the
+            websockets connected to this process
+        webhooks: Whether webhook subscriptions are accepted
+        allow_private: Let webhooks reach non-public addresses (for
+            development only)
+    """
+
+    def __init__(self, store: Optional[SubscriptionStore] = None,
+                 interval: float = 60.0, batch_size: int = 20,
+                 concurrency: int = 10, retries: int = 5,
+                 retry_base: float = 1.0, max_subscriptions: int = 1000,
+                 follow_interval: float = 1.0, webhooks: bool = True,
+                 allow_private: bool = False):
+        self.store = store if store is not None else SubscriptionStore()
+        self.interval = interval
+        self.batch_size = max(batch_size, 1)
+        self.concurrency = max(concurrency, 1)
+        self.retries = retries
+        self.retry_base = retry_base
+        self.max_subscriptions = max_subscriptions
+        self.follow_interval = follow_interval
+        self.webhooks = webhooks
+        self.allow_private = allow_private
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> "PushHub":
+        """
+        Build the hub from ``NEWS_PUSH_INTERVAL`` (seconds, 60),
+        ``NEWS_PUSH_BATCH`` (20), ``NEWS_PUSH_CONCURRENCY`` (10),
+        ``NEWS_PUSH_RETRIES`` (5), ``NEWS_PUSH_MAX_SUBSCRIPTIONS`` (1000),
+        ``NEWS_PUSH_WEBHOOKS`` (on when ``NEWS_CLIENTS`` requires client
+        keys), ``NEWS_PUSH_ALLOW_PRIVATE`` (off) and ``NEWS_STORE_PATH``.
+        """
+        store = SubscriptionStore(os.getenv("NEWS_STORE_PATH") or ":memory:")
+        # An open API would otherwise let anyone make the service call out
+        webhooks = env_bool("NEWS_PUSH_WEBHOOKS",
+                            bool(os.getenv("NEWS_CLIENTS", "").strip()))
+        return cls(store, interval=env_float("NEWS_PUSH_INTERVAL", 60.0),
+                   batch_size=env_int("NEWS_PUSH_BATCH", 20),
+                   concurrency=env_int("NEWS_PUSH_CONCURRENCY", 10),
+                   retries=env_int("NEWS_PUSH_RETRIES", 5),
+                   max_subscriptions=env_int("NEWS_PUSH_MAX_SUBSCRIPTIONS",
+                                             1000),
+                   webhooks=webhooks,
+                   allow_private=env_bool("NEWS_PUSH_ALLOW_PRIVATE"))
+
+    def subscribe(self, query: str, language: str = "en",
+                  callback_url: Optional[str] = None,
+                  owner: Optional[str] = None) -> Subscription:
+        """
+        Subscribe to a topic; without ``callback_url`` the subscription is
+        read by a websocket through :meth:`follow`. A webhook subscription
+        gets the ``secret`` its deliveries are signed with. ``owner`` names
+        the client allowed to show and cancel it. The topic is normalized
+        like a cache key, so "AI" and " ai " share one topic.
+
+        Raises:
+            OverflowError: If ``max_subscriptions`` exist already
+        """
+        query, language = service.cache_key(query, language)
+        subscription = Subscription(
+            secrets.token_urlsafe(12), query, language, callback_url,
+            secret=secrets.token_urlsafe(32) if callback_url else None,
+            owner=owner)
+        self.store.add(subscription, self.max_subscriptions)
+        return subscription
+
+    async def check_callback(self, url: str) -> None:
+        """
+        Refuse a webhook URL this hub will not call.
+
+        Raises:
+            PermissionError: If webhooks are disabled
+            UnsafeCallback: If the host resolves to a non-public address
+            httpx.ConnectError: If the host does not resolve
+            httpx.InvalidURL: If the URL cannot be parsed
+        """
+        if not self.webhooks:
+            raise PermissionError("Webhook subscriptions are disabled")
+        await pin_callback(url, self.allow_private)
+
+    def unsubscribe(self, subscription_id: str) -> bool:
+        """Remove a subscription; False if it does not exist."""
+        return self.store.remove(subscription_id)
+
+    def get(self, subscription_id: str) -> Optional[Subscription]:
+        return self.store.get(subscription_id)
+
+    async def poll(self) -> int:
+        """
+        Fetch every topic that is due and push its new articles.
+
+        Returns:
+            The number of topics fetched
+        """
+        loop = asyncio.get_running_loop()
+        fetched = 0
+        topics = self.store.topics()
+        # Topics that lost their subscribers start afresh if they return
+        self._due = {topic: self._due.get(topic, 0.0) for topic in topics}
+        for query, language in topics:
+            if self._due[(query, language)] > loop.time():
+                continue
+            self._due[(query, language)] = loop.time() + self.interval
+            try:
+                result = await service.fetch_news(query, PUSH_LIMIT,
+                                                  "publishedAt", language)
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Fetching %r for subscribers failed: %s",
+                               query, e)
+                continue
+            fetched += 1
+            self.fetches += 1
+            new = self.store.diff(query, language, result.body["articles"])
+            if new:
+                self.published += len(new)
+                self._publish(query, language, new)
+        return fetched
+
+    def _publish(self, query: str, language: str,
+                 articles: List[Article]) -> None:
+        subscribers = self.store.subscribers(query, language)
+        for start in range(0, len(articles), self.batch_size):
+            batch = articles[start:start + self.batch_size]
+            if any(s.callback_url is None for s in subscribers):
+                self.store.add_batch(query, language, batch)
+            for subscription in subscribers:
+                if subscription.callback_url is not None:
+                    self._spawn(subscription,
+                                _payload(subscription, batch), 0)
+
+    async def follow(self, subscription: Subscription
+                     ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the batches published for a websocket subscription from now
+        on, keeping it alive while the caller consumes them.
+        """
+        topic = (subscription.query, subscription.language)
+        queue: "asyncio.Queue[List[Article]]" = asyncio.Queue()
+        seq = await asyncio.to_thread(self.store.last_batch)
+        if self._reader is None:
+            self._read_seq = seq
+            self._reader = asyncio.ensure_future(self._read_batches())
+        self._followers.setdefault(topic, set()).add(queue)
+        touched = time.monotonic()
+        try:
+            while True:
+                try:
+                    batches = [await asyncio.wait_for(queue.get(),
+                                                      STALE_AFTER / 4)]
+                except asyncio.TimeoutError:
+                    batches = []
+                while not queue.empty():
+                    batches.append(queue.get_nowait())
+                if len(batches) > WEBSOCKET_BACKLOG:
+                    skipped = len(batches) - WEBSOCKET_BACKLOG
+                    batches = batches[skipped:]
+                    await asyncio.to_thread(self.store.count,
+                                            subscription.id, "dropped",
+                                            skipped)
+                    metrics.PUSHES.inc(skipped, transport="websocket",
+                                       outcome="dropped")
+                for articles in batches:
+                    yield _payload(subscription, articles)
+                    await asyncio.to_thread(self.store.count,
+                                            subscription.id, "delivered")
+                    metrics.PUSHES.inc(transport="websocket", outcome="ok")
+                if time.monotonic() - touched >= STALE_AFTER / 4:
+                    await asyncio.to_thread(self.store.touch,
+                                            subscription.id)
+                    touched = time.monotonic()
+        finally:
+            followers = self._followers.get(topic, set())
+            followers.discard(queue)
+            if not followers:
+                self._followers.pop(topic, None)
+
+    async def _read_batches(self) -> None:
+        """
+        Hand new batches to the websockets following their topics, reading
+        the database once per ``follow_interval`` while any are connected.
+        """
+        try:
+            while self._followers:
+                batches = await asyncio.to_thread(self.store.batches_after,
+                                                  self._read_seq)
+                for seq, query, language, articles in batches:
+                    self._read_seq = seq
+                    for queue in self._followers.get((query, language), ()):
+                        queue.put_nowait(articles)
+                await asyncio.sleep(self.follow_interval)
+        finally:
+            self._reader = None
+
+    def _spawn(self, subscription: Subscription, payload: Dict[str, Any],
+               attempt: int) -> None:
+        task = asyncio.ensure_future(
+            self._deliver(subscription, payload, attempt))
+        self._deliveries.add(task)
+        task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, subscription: Subscription,
+                       payload: Dict[str, Any], attempt: int) -> None:
+        """POST one batch to a webhook, queuing a retry on failure."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            if self.store.get(subscription.id) is None:
+                return
+            body = dumps(payload)
+            timestamp = int(time.time())
+            try:
+                url, headers, extensions = await pin_callback(
+                    subscription.callback_url, self.allow_private)
+                headers.update({
+                    "Content-Type": "application/json",
+                    "X-News-Timestamp": str(timestamp),
+                    "X-News-Signature": sign(subscription.secret or "",
+                                             timestamp, body),
+                })
+                response = await http.get_client().post(
+                    url, content=body, headers=headers,
+                    extensions=extensions)
+                response.raise_for_status()
+            except UnsafeCallback as e:
+                # The host now points inside; retrying will not help
+                self.store.count(subscription.id, "failed")
+                metrics.PUSHES.inc(transport="webhook", outcome="refused")
+                logger.warning("Refusing delivery to %s: %s",
+                               subscription.callback_url, e)
+                return
+            except httpx.HTTPError as e:
+                error: Optional[Exception] = e
+            else:
+                error = None
+        if error is None:
+            self.store.count(subscription.id, "delivered")
+            metrics.PUSHES.inc(transport="webhook", outcome="ok")
+            return
+        if attempt >= self.retries:
+            self.store.count(subscription.id, "failed")
+            metrics.PUSHES.inc(transport="webhook", outcome="failed")
+            logger.warning("Giving up delivery to %s: %s",
+                           subscription.callback_url, error)
+            return
+        metrics.PUSHES.inc(transport="webhook", outcome="retried")
+        due = (asyncio.get_running_loop().time()
+               + self.retry_base * 2 ** attempt)
+        heapq.heappush(self._retries, (due, next(self._seq), subscription,
+                                       payload, attempt + 1))
+
+    def _retry_due(self) -> None:
+        """Resend deliveries whose backoff has passed."""
+        now = asyncio.get_running_loop().time()
+        while self._retries and self._retries[0][0] <= now:
+            _, _, subscription, payload, attempt = heapq.heappop(
+                self._retries)
+            self._spawn(subscription, payload, attempt)
+
+    def _next_wakeup(self) -> float:
+        times = list(self._due.values())
+        if self._retries:
+            times.append(self._retries[0][0])
+        now = asyncio.get_running_loop().time()
+        # Checked at least every second so new subscriptions start quickly
+        return min(min(times, default=now + 1.0), now + 1.0)
+
+    async def run(self) -> None:
+        """Fetch topics and resend failed deliveries until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.poll()
+            self._retry_due()
+            await asyncio.sleep(max(self._next_wakeup() - loop.time(), 0))
+
+    def start(self) -> None:
+        """Run the hub in the background of the current event loop."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop fetching and wait for deliveries still in flight."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._deliveries:
+            await asyncio.wait(set(self._deliveries), timeout=timeout)
+
+    def reset(self) -> None:
+        """Drop subscriptions, pending retries and counters (for tests)."""
+        self.store.clear()
+        self._due: Dict[Tuple[str, str], float] = {}
+        self._retries: List[Tuple[float, int, Subscription,
+                                  Dict[str, Any], int]] = []
+        self._seq = itertools.count()
+        self._deliveries: Set["asyncio.Task[None]"] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._followers: Dict[Tuple[str, str],
+                              Set["asyncio.Queue[List[Article]]"]] = {}
+        self._reader: Optional["asyncio.Task[None]"] = None
+        self._read_seq = 0
+        self.fetches = 0
+        self.published = 0
+        self.errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        subscriptions, topics = self.store.sizes()
+        return {
+            "running": self._task is not None,
+            "subscriptions": subscriptions,
+            "topics": topics,
+            "fetches": self.fetches,
+            "published": self.published,
+            "errors": self.errors,
+            "deliveries_in_flight": len(self._deliveries),
+            "retries_queued": len(self._retries),
+        }
+
+
+def _payload(subscription: Subscription,
+             articles: List[Article]) -> Dict[str, Any]:
+    return {
+        "subscription": subscription.id,
+        "query": subscription.query,
+        "language": subscription.language,
+        "articles": articles,
+    }
+
+
+def in_app() -> bool:
+    """Whether API processes run the hub (``NEWS_PUSH_IN_APP``)."""
+    return env_bool("NEWS_PUSH_IN_APP", True)
+
+
+hub = PushHub.from_env()
+
+
+async def _serve() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await http.startup()
+    hub.start()
+    logger.info("Pushing to subscribers from %s", hub.store.path)
+    try:
+        await stop.wait()
+    finally:
+        await hub.stop(env_float("NEWS_DRAIN_TIMEOUT", 10.0))
+        await service.drain()
+        await http.close()
+        await service.cache.close()
+        await service.store.close()
+        hub.store.close()
+
+
+def main() -> None:
+    """Entry point of the standalone pusher."""
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()
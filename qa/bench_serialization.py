@@ -0,0 +1,66 @@
+"""
+Per-article cost of normalizing and serializing a /news response.
+
+Compares FastAPI's generic path (``jsonable_encoder`` then ``json.dumps``)
+with the direct bytes path of ``news_app.encoding``, with and without
+orjson. Run with ``make bench`` or
+``PYTHONPATH=app python qa/bench_serialization.py [articles] [rounds]``.
+"""
+import json
+import sys
+import timeit
+from unittest.mock import patch
+
+from fastapi.encoders import jsonable_encoder
+
+from news_app import encoding
+from news_app.providers.gnews import to_article
+
+
+def _gnews_payload(count):
+    return [{
+        "title": f"Headline number {i} about artificial intelligence",
+        "description": "A few sentences summarizing the story. " * 4,
+        "content": "Article body truncated by the API... [1234 chars]",
+        "url": f"https://news.example.com/2025/01/15/story-{i}",
+        "image": f"https://images.example.com/story-{i}.jpg",
+        "publishedAt": "2025-01-15T10:00:00Z",
+        "source": {"name": "Example News", "url": "https://example.com"},
+    } for i in range(count)]
+
+
+def _generic(body):
+    # What FastAPI's JSONResponse does with a returned dict
+    return json.dumps(jsonable_encoder(body), ensure_ascii=False,
+                      allow_nan=False, indent=None,
+                      separators=(",", ":")).encode()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    raw = _gnews_payload(count)
+    body = {"articles": [to_article(a) for a in raw], "total": count,
+            "query": "AI", "next_cursor": None}
+
+    def per_article(fn):
+        seconds = min(timeit.repeat(fn, number=rounds, repeat=5))
+        return seconds / rounds / count * 1e6
+
+    results = {
+        "normalize": per_article(lambda: [to_article(a) for a in raw]),
+        "jsonable_encoder+json": per_article(lambda: _generic(body)),
+        "encoding.dumps": per_article(lambda: encoding.dumps(body)),
+    }
+    if encoding.orjson is not None:
+        with patch.object(encoding, "orjson", None):
+            results["encoding.dumps (stdlib)"] = per_article(
+                lambda: encoding.dumps(body))
+
+    print(f"{count} articles x {rounds} rounds, microseconds per article")
+    for name, micros in results.items():
+        print(f"  {name:<26}{micros:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,78 @@
+import asyncio
 import pytest
 import sys
 import os
+from unittest.mock import MagicMock
 from fastapi.testclient import TestClient
 
 # Add the app directory to the Python path BEFORE importing
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
 
 from news_app.api import app  # noqa: E402
+from news_app import (  # noqa: E402
+    api, clients, metrics, service, subscriptions)
+from news_app.providers import keys  # noqa: E402
+from news_app.providers.base import NewsProvider  # noqa: E402
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProvider(NewsProvider):
+    """Provider stand-in with a fixed delay and outcome."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def fetch(self, query, limit, language, page=1):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return [{"title": f"{self.name} story"}]
+
+
+@pytest.fixture(autouse=True)
+def reset_service_state():
+    """Start every test with empty cache and store, no flights, full quota."""
+    asyncio.run(service.cache.clear())
+    service.flights.reset()
+    service.limiter.reset()
+    service.providers.reset()
+    asyncio.run(service.store.clear())
+    service.duplicates.clear()
+    api.responses.clear()
+    metrics.registry.reset()
+    clients.registry.reset()
+    keys.reset()
+    subscriptions.hub.reset()
+    yield
+    asyncio.run(service.cache.clear())
+    service.flights.reset()
+    service.limiter.reset()
+    service.providers.reset()
+    asyncio.run(service.store.clear())
+    service.duplicates.clear()
+    api.responses.clear()
+    metrics.registry.reset()
+    clients.registry.reset()
+    keys.reset()
+    subscriptions.hub.reset()
 
 
 @pytest.fixture
@@ -15,6 +81,32 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def clock():
+    """A manually advanced clock starting at 0."""
+    return FakeClock()
+
+
+@pytest.fixture
+def fake_provider():
+    """Factory of provider stand-ins: ``fake_provider(name, delay, error)``."""
+    return FakeProvider
+
+
+@pytest.fixture
+def upstream():
+    """
+    Make a patched upstream ``get`` answer every call with a payload:
+    ``upstream(mock_get, payload)``.
+    """
+    def answer(mock_get, payload):
+        response = MagicMock()
+        response.json.return_value = payload
+        response.raise_for_status.return_value = None
+        mock_get.return_value = response
+    return answer
+
+
 @pytest.fixture
 def mock_gnews_response():
     """Mock response from GNews.io API."""
@@ -0,0 +1,409 @@
+"""
+Load test for /news against a local GNews stand-in.
+
+Starts a fake GNews server with configurable latency, error and payload
+distributions, runs the API against it with uvicorn (or targets a running
+API with ``--target``), and drives ``/news`` either at a fixed concurrency
+(closed loop) or at a fixed arrival rate (open loop). In the open loop,
+latency is measured from each request's scheduled start, so a slow server
+cannot hide its queueing delay. The report is printed as JSON: throughput,
+status counts and p50/p95/p99 latency.
+
+With ``--baseline`` the run is compared against an earlier report and the
+exit status is 1 if latency percentiles or throughput regressed by more
+than ``--tolerance``.
+
+Examples::
+
+    make loadtest
+    PYTHONPATH=app python qa/loadtest.py --concurrency 32 --duration 20 \\
+        --output baseline.json
+    PYTHONPATH=app python qa/loadtest.py --rate 200 \\
+        --baseline baseline.json --tolerance 0.15
+    PYTHONPATH=app python qa/loadtest.py --upstream-only --port 9000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from news_app import server
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                       "app")
+
+# (latency in seconds, HTTP status; 0 for a transport error)
+Sample = Tuple[float, int]
+
+
+def fake_gnews_app(latency_ms: float = 50.0, latency_sigma: float = 0.5,
+                   error_rate: float = 0.0, articles: int = 20,
+                   description_bytes: int = 200,
+                   seed: Optional[int] = None) -> Starlette:
+    """
+    ASGI app answering ``/search`` like GNews.
+
+    Args:
+        latency_ms: Median response delay
+        latency_sigma: Spread of the log-normal delay (0 for constant)
+        error_rate: Share of calls failing with a 500, 502 or 503
+        articles: Most articles returned per call (capped by ``max``)
+        description_bytes: Approximate size of each description
+        seed: Seed for reproducible delays and errors
+    """
+    rng = random.Random(seed)
+
+    def article(query: str, page: int, i: int) -> Dict[str, Any]:
+        words = [f"{query}{page}x{i}w{j}"
+                 for j in range(max(description_bytes // 12, 1))]
+        return {
+            "title": f"{query} story {page}-{i}",
+            "description": " ".join(words)[:description_bytes],
+            "content": "",
+            "url": f"https://loadtest.example/{query}/{page}/{i}",
+            "image": f"https://loadtest.example/{query}/{page}/{i}.jpg",
+            "publishedAt": f"2025-01-{28 - i % 28:02d}T00:00:00Z",
+            "source": {"name": "Load Test", "url": "https://loadtest.example"},
+        }
+
+    async def search(request):
+        if latency_ms > 0:
+            await asyncio.sleep(
+                latency_ms / 1000 * rng.lognormvariate(0, latency_sigma))
+        if rng.random() < error_rate:
+            return JSONResponse({"errors": ["Simulated upstream failure"]},
+                                status_code=rng.choice((500, 502, 503)))
+        params = request.query_params
+        count = min(int(params.get("max", 10)), articles)
+        page = int(params.get("page", 1))
+        query = "".join(c for c in params.get("q", "") if c.isalnum())
+        return JSONResponse({
+            "totalArticles": count * 10,
+            "articles": [article(query, page, i) for i in range(count)],
+        })
+
+    return Starlette(routes=[Route("/search", search)])
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(q * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """Throughput, status counts and latency percentiles of a run."""
+    latencies = [latency * 1000 for latency, _ in samples]
+    statuses: Dict[str, int] = {}
+    for _, status in samples:
+        key = str(status) if status else "error"
+        statuses[key] = statuses.get(key, 0) + 1
+    errors = sum(1 for _, status in samples if not status or status >= 500)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(max(latencies, default=0.0), 2),
+            "mean": round(sum(latencies) / len(latencies), 2)
+            if latencies else 0.0,
+        },
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float) -> List[str]:
+    """
+    Regressions of ``report`` against ``baseline``.
+
+    Latency percentiles may grow and throughput may drop by at most
+    ``tolerance`` (a fraction); the error rate may grow by at most
+    ``tolerance`` percentage points.
+    """
+    regressions = []
+    for name in ("p50", "p95", "p99"):
+        old = baseline["latency_ms"][name]
+        new = report["latency_ms"][name]
+        if old > 0 and new > old * (1 + tolerance):
+            regressions.append(
+                f"latency {name} {old:.1f}ms -> {new:.1f}ms")
+    old, new = baseline["throughput_rps"], report["throughput_rps"]
+    if new < old * (1 - tolerance):
+        regressions.append(f"throughput {old:.1f} -> {new:.1f} req/s")
+    old, new = baseline["error_rate"], report["error_rate"]
+    if new > old + tolerance / 100:
+        regressions.append(f"error rate {old:.2%} -> {new:.2%}")
+    return regressions
+
+
+def _paths(queries: int, limit: int, seed: Optional[int]):
+    """Endless /news paths over a Zipf-like mix of hot and cold topics."""
+    rng = random.Random(seed)
+    topics = [f"topic{i}" for i in range(queries)]
+    weights = [1 / (rank + 1) for rank in range(queries)]
+    while True:
+        topic = rng.choices(topics, weights)[0]
+        yield f"/news?query={topic}&limit={limit}"
+
+
+async def _request(client: httpx.AsyncClient, path: str) -> int:
+    try:
+        response = await client.get(path)
+    except httpx.HTTPError:
+        return 0
+    return response.status_code
+
+
+async def closed_loop(client: httpx.AsyncClient, paths, concurrency: int,
+                      duration: float) -> List[Sample]:
+    """
+    Run ``concurrency`` clients for ``duration`` seconds, each sending its
+    next request as soon as the last one answered.
+    """
+    samples: List[Sample] = []
+    stop = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            status = await _request(client, next(paths))
+            samples.append((time.perf_counter() - start, status))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def open_loop(client: httpx.AsyncClient, paths, rate: float,
+                    duration: float, poisson: bool = False,
+                    seed: Optional[int] = None) -> List[Sample]:
+    """
+    Start requests at ``rate`` per second whether or not earlier ones
+    finished; latency counts from each request's scheduled start.
+    """
+    rng = random.Random(seed)
+    samples: List[Sample] = []
+    tasks = []
+
+    async def send(scheduled: float, path: str):
+        status = await _request(client, path)
+        samples.append((time.perf_counter() - scheduled, status))
+
+    start = time.perf_counter()
+    scheduled = start
+    while scheduled < start + duration:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(send(scheduled, next(paths))))
+        scheduled += rng.expovariate(rate) if poisson else 1 / rate
+    await asyncio.gather(*tasks)
+    return samples
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url: str, process: subprocess.Popen,
+                   timeout: float = 15.0) -> None:
+    give_up = time.monotonic() + timeout
+    while time.monotonic() < give_up:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited early")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server for {url} did not start in {timeout}s")
+
+
+def _start_upstream(args) -> Tuple[str, subprocess.Popen]:
+    port = _free_port()
+    command = [sys.executable, os.path.abspath(__file__), "--upstream-only",
+               "--port", str(port),
+               "--upstream-latency-ms", str(args.upstream_latency_ms),
+               "--upstream-latency-sigma", str(args.upstream_latency_sigma),
+               "--upstream-error-rate", str(args.upstream_error_rate),
+               "--upstream-articles", str(args.upstream_articles),
+               "--description-bytes", str(args.description_bytes)]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+    process = subprocess.Popen(command)
+    url = f"http://127.0.0.1:{port}"
+    _wait_until_up(url + "/search", process)
+    return url, process
+
+
+def _start_api(args, upstream: str,
+               scratch: str) -> Tuple[str, subprocess.Popen]:
+    port = _free_port()
+    env = dict(os.environ, GNEWS_BASE_URL=upstream,
+               GNEWS_API_KEY="loadtest", NEWS_POLL_TOPICS="")
+    # Workers share cache, quota and store as under the production server,
+    # in files of this run only so an earlier run cannot warm the cache
+    env.update(server.shared_state_env(args.workers, scratch))
+    # The stand-in has no quota; keep the limiter out of the measurement
+    env.setdefault("GNEWS_RATE_LIMIT", "0")
+    env.setdefault("GNEWS_DAILY_LIMIT", "0")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "news_app.api:app",
+         "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=APP_DIR, env=env)
+    url = f"http://127.0.0.1:{port}"
+    _wait_until_up(url + "/", process)
+    return url, process
+
+
+async def _drive(args, target: str) -> Tuple[List[Sample], float]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    paths = _paths(args.queries, args.limit, args.seed)
+    async with httpx.AsyncClient(base_url=target, limits=limits,
+                                 timeout=args.timeout) as client:
+        if args.warmup > 0:
+            await closed_loop(client, paths, args.concurrency, args.warmup)
+        started = time.perf_counter()
+        if args.rate:
+            samples = await open_loop(client, paths, args.rate,
+                                      args.duration, args.poisson, args.seed)
+        else:
+            samples = await closed_loop(client, paths, args.concurrency,
+                                        args.duration)
+        return samples, time.perf_counter() - started
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load test /news against a local GNews stand-in.")
+    load = parser.add_argument_group("load")
+    load.add_argument("--target", help="Base URL of a running API to test "
+                      "instead of starting one")
+    load.add_argument("--concurrency", type=int, default=16,
+                      help="Clients in the closed loop (default 16)")
+    load.add_argument("--rate", type=float, default=0.0,
+                      help="Requests per second for an open loop instead")
+    load.add_argument("--poisson", action="store_true",
+                      help="Poisson arrivals in the open loop")
+    load.add_argument("--duration", type=float, default=10.0,
+                      help="Measured seconds (default 10)")
+    load.add_argument("--warmup", type=float, default=2.0,
+                      help="Unmeasured seconds first (default 2)")
+    load.add_argument("--queries", type=int, default=50,
+                      help="Distinct topics, Zipf distributed (default 50)")
+    load.add_argument("--limit", type=int, default=10,
+                      help="limit of each /news request (default 10)")
+    load.add_argument("--timeout", type=float, default=30.0,
+                      help="Client timeout in seconds (default 30)")
+    load.add_argument("--workers", type=int, default=1,
+                      help="uvicorn workers for the started API, "
+                      "sharing state as under the production server")
+    load.add_argument("--seed", type=int, help="Seed for a repeatable mix")
+
+    upstream = parser.add_argument_group("GNews stand-in")
+    upstream.add_argument("--upstream-only", action="store_true",
+                          help="Only serve the stand-in on --port")
+    upstream.add_argument("--port", type=int, default=9000)
+    upstream.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    upstream.add_argument("--upstream-latency-sigma", type=float,
+                          default=0.5)
+    upstream.add_argument("--upstream-error-rate", type=float, default=0.0)
+    upstream.add_argument("--upstream-articles", type=int, default=20)
+    upstream.add_argument("--description-bytes", type=int, default=200)
+
+    report = parser.add_argument_group("report")
+    report.add_argument("--output", help="Also write the report here")
+    report.add_argument("--baseline", help="Report of an earlier run to "
+                        "compare against")
+    report.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed regression as a fraction (0.1)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.upstream_only:
+        import uvicorn
+        uvicorn.run(fake_gnews_app(
+            args.upstream_latency_ms, args.upstream_latency_sigma,
+            args.upstream_error_rate, args.upstream_articles,
+            args.description_bytes, args.seed),
+            host="127.0.0.1", port=args.port, log_level="warning")
+        return 0
+
+    processes = []
+    scratch = tempfile.mkdtemp(prefix="gnews-loadtest-")
+    try:
+        target = args.target
+        if not target:
+            upstream, process = _start_upstream(args)
+            processes.append(process)
+            target, process = _start_api(args, upstream, scratch)
+            processes.append(process)
+        samples, elapsed = asyncio.run(_drive(args, target))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "mode": "open" if args.rate else "closed",
+        "concurrency": None if args.rate else args.concurrency,
+        "rate": args.rate or None,
+        "duration_s": args.duration,
+        "upstream": None if args.target else {
+            "latency_ms": args.upstream_latency_ms,
+            "latency_sigma": args.upstream_latency_sigma,
+            "error_rate": args.upstream_error_rate,
+            "articles": args.upstream_articles,
+            "description_bytes": args.description_bytes,
+        },
+        **summarize(samples, elapsed),
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("mode") != report["mode"]:
+            print(f"Baseline is a {baseline.get('mode')} loop run, this is "
+                  f"a {report['mode']} loop run", file=sys.stderr)
+            return 2
+        regressions = compare(report, baseline, args.tolerance)
+        report["baseline"] = {"path": args.baseline,
+                              "tolerance": args.tolerance,
+                              "regressions": regressions}
+        status = 1 if regressions else 0
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
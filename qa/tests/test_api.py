@@ -1,7 +1,11 @@
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
+import httpx
+import pytest
 import requests
 
+from news_app.providers import gnews, keys
+
 
 class TestAPI:
     """P0 Critical API tests with mocked GNews responses."""
@@ -25,11 +29,13 @@ class TestAPI:
             assert data["api_key_configured"] is True
 
         with patch.dict(os.environ, {}, clear=True):
+            # Keys are loaded once; reload them for the new environment
+            keys.reset()
             response = client.get("/")
             data = response.json()
             assert data["api_key_configured"] is False
 
-    @patch('news_app.providers.gnews.requests.get')
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
     @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
     def test_news_endpoint_success(
             self,
@@ -56,7 +62,7 @@ class TestAPI:
         assert isinstance(data["articles"], list)
         assert data["total"] == len(data["articles"])
 
-    @patch('news_app.providers.gnews.requests.get')
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
     @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
     def test_news_endpoint_with_custom_query(
             self, mock_requests, client, mock_gnews_response):
@@ -77,7 +83,7 @@ class TestAPI:
         call_args = mock_requests.call_args
         assert call_args[1]["params"]["q"] == "machine learning"
 
-    @patch('news_app.providers.gnews.requests.get')
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
     @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
     def test_news_endpoint_limit_parameter(
             self, mock_requests, client, mock_gnews_response):
@@ -113,7 +119,7 @@ class TestAPI:
         response = client.get("/news?sort_by=invalid")
         assert response.status_code == 422
 
-    @patch('news_app.providers.gnews.requests.get')
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
     @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
     def test_news_endpoint_sort_by_title(
             self, mock_requests, client, mock_gnews_response):
@@ -137,13 +143,12 @@ class TestAPI:
         response = client.get("/news")
         assert response.status_code == 502  # Error due to None API key
 
-    @patch('news_app.providers.gnews.requests.get')
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
     @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
     def test_news_endpoint_gnews_error(self, mock_requests, client):
         """Test handling of GNews API errors."""
         # Simulate an HTTP error from GNews
-        mock_requests.side_effect = requests.exceptions.HTTPError(
-            "HTTP Error")
+        mock_requests.side_effect = httpx.HTTPError("HTTP Error")
 
         response = client.get("/news")
         assert response.status_code == 502
@@ -151,11 +156,11 @@ class TestAPI:
         data = response.json()
         assert "Error fetching news" in data["detail"]
 
-    @patch('news_app.providers.gnews.requests.get')
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
     @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
     def test_news_endpoint_request_timeout(self, mock_requests, client):
         """Test handling of request timeouts."""
-        mock_requests.side_effect = requests.exceptions.Timeout(
+        mock_requests.side_effect = httpx.TimeoutException(
             "Request timeout")
 
         response = client.get("/news")
@@ -164,7 +169,7 @@ class TestAPI:
         data = response.json()
         assert "Request timeout" in data["detail"]
 
-    @patch('news_app.providers.gnews.requests.get')
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
     @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
     def test_news_endpoint_language_parameter(
             self, mock_requests, client, mock_gnews_response):
@@ -181,3 +186,23 @@ class TestAPI:
         mock_requests.assert_called_once()
         call_args = mock_requests.call_args
         assert call_args[1]["params"]["lang"] == "es"
+
+    @patch('news_app.providers.gnews.requests.get')
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_sync_fetch_still_supported(
+            self, mock_requests, mock_gnews_response):
+        """Test the blocking provider API used outside the event loop."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = mock_gnews_response
+        mock_response.raise_for_status.return_value = None
+        mock_requests.return_value = mock_response
+
+        result = gnews.fetch("ai", 2, "title", "en")
+
+        assert result["total"] == 2
+        assert result["articles"][0]["title"].startswith("AI Technology")
+        mock_requests.assert_called_once()
+
+        mock_requests.side_effect = requests.exceptions.Timeout("slow")
+        with pytest.raises(requests.exceptions.Timeout):
+            gnews.fetch("ai", 2, "title", "en")
@@ -0,0 +1,65 @@
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+
+def _upstream_by_query(payload, failing=()):
+    """Upstream stand-in answering per query, failing for ``failing``."""
+    async def fake_get(url, params=None, **kwargs):
+        if params["q"] in failing:
+            raise httpx.ConnectError("upstream down")
+        response = MagicMock()
+        response.json.return_value = payload
+        response.raise_for_status.return_value = None
+        return response
+    return AsyncMock(side_effect=fake_get)
+
+
+class TestBatchEndpoint:
+    """POST /news/batch fans out queries and isolates failures."""
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_batch_returns_per_query_results_and_errors(
+            self, client, mock_gnews_response):
+        fake = _upstream_by_query(mock_gnews_response, failing={"broken"})
+        body = {"queries": [{"query": "AI"}, {"query": "broken"},
+                            {"query": "space", "limit": 1}]}
+
+        with patch('news_app.providers.gnews.http.get', fake):
+            response = client.post("/news/batch", json=body)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["total"], data["succeeded"], data["failed"]) == (3, 2, 1)
+        ok, failed, limited = data["results"]
+        assert ok["status"] == 200 and ok["data"]["total"] == 2
+        assert failed["status"] == 502
+        assert "Error fetching news" in failed["error"]
+        assert limited["request"]["query"] == "space"
+        assert limited["data"]["total"] == 1
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_batch_deduplicates_upstream_calls(
+            self, client, mock_gnews_response):
+        fake = _upstream_by_query(mock_gnews_response)
+        body = {"queries": [{"query": "AI", "limit": 5},
+                            {"query": "AI", "limit": 5},
+                            {"query": "ai", "limit": 10, "sort_by": "title"}]}
+
+        with patch('news_app.providers.gnews.http.get', fake):
+            response = client.post("/news/batch", json=body)
+
+        assert response.json()["succeeded"] == 3
+        # The largest limit is fetched first and serves the others
+        fake.assert_called_once()
+        assert fake.call_args[1]["params"]["max"] == 10
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_batch_validation(self, client):
+        assert client.post("/news/batch", json={"queries": []}
+                           ).status_code == 422
+        too_many = {"queries": [{"query": f"q{i}"} for i in range(51)]}
+        assert client.post("/news/batch", json=too_many).status_code == 422
+        bad_limit = {"queries": [{"query": "AI", "limit": 25}]}
+        assert client.post("/news/batch", json=bad_limit).status_code == 422
@@ -0,0 +1,172 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from news_app import service
+from news_app.providers.breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen)
+from news_app.providers.registry import ProviderRegistry
+
+
+def _trip(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(0.01, False)
+
+
+class TestCircuitBreaker:
+    """Closed, open and half-open transitions."""
+
+    def test_trips_on_failure_rate(self):
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=4)
+        for ok in (True, False, True):
+            breaker.record(0.01, ok)
+        assert breaker.state == CLOSED
+
+        breaker.record(0.01, False)
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.trips == 1
+
+    def test_trips_on_slow_calls(self):
+        breaker = CircuitBreaker(slow_call=1.0, min_calls=2)
+        breaker.record(2.0, True)
+        breaker.record(3.0, True)
+
+        assert breaker.state == OPEN
+
+    def test_half_open_admits_one_probe(self, clock):
+        breaker = CircuitBreaker(min_calls=1, open_for=30, clock=clock)
+        _trip(breaker)
+        assert breaker.retry_after() == 30
+
+        clock.now = 31
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record(0.01, True)
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self, clock):
+        breaker = CircuitBreaker(min_calls=1, open_for=30, clock=clock)
+        _trip(breaker)
+        clock.now = 31
+        assert breaker.allow()
+
+        breaker.record(0.01, False)
+
+        assert breaker.state == OPEN
+        assert breaker.trips == 2
+
+    def test_released_probe_can_be_retried(self, clock):
+        breaker = CircuitBreaker(min_calls=1, clock=clock)
+        _trip(breaker)
+        clock.now = breaker.open_for
+        assert breaker.allow()
+
+        breaker.release()
+
+        assert breaker.allow()
+
+
+class TestRegistryResilience:
+    """Breakers and adaptive timeouts in provider routing."""
+
+    def test_open_provider_is_skipped(self, fake_provider):
+        primary, backup = fake_provider("primary"), fake_provider("backup")
+        registry = ProviderRegistry([primary, backup])
+        _trip(registry.breakers["primary"])
+
+        name, _ = asyncio.run(registry.fetch("AI", 10, "en"))
+
+        assert name == "backup"
+        assert primary.calls == 0
+
+    def test_all_open_fails_fast(self, fake_provider):
+        registry = ProviderRegistry([fake_provider("a")])
+        _trip(registry.breakers["a"])
+
+        with pytest.raises(CircuitOpen) as error:
+            asyncio.run(registry.fetch("AI", 10, "en"))
+        assert error.value.retry_after > 0
+
+    @pytest.mark.parametrize("status,trips", [
+        (400, False), (404, False), (429, True), (503, True)])
+    def test_only_provider_faults_trip(self, fake_provider, status, trips):
+        request = httpx.Request("GET", "https://gnews.io/api/v4/search")
+        error = httpx.HTTPStatusError(
+            "answer", request=request,
+            response=httpx.Response(status, request=request))
+        registry = ProviderRegistry([fake_provider("a", error=error)])
+
+        for _ in range(registry.breakers["a"].min_calls):
+            with pytest.raises(httpx.HTTPStatusError):
+                asyncio.run(registry.fetch("AI", 10, "en"))
+
+        assert (registry.breakers["a"].state == OPEN) is trips
+
+    def test_timeout_adapts_to_latency(self, fake_provider):
+        registry = ProviderRegistry([fake_provider("a")], timeout_min=0.05,
+                                    timeout_max=10.0)
+        provider = registry.providers[0]
+        assert registry.timeout_for(provider) == 10.0
+
+        for _ in range(20):
+            registry.stats_by_name["a"].record(0.001, True)
+
+        assert registry.timeout_for(provider) == 0.05
+
+    def test_adaptive_timeout_cuts_slow_call(self, fake_provider):
+        slow = fake_provider("slow", delay=1.0)
+        registry = ProviderRegistry([slow], timeout_min=0.05)
+        for _ in range(20):
+            registry.stats_by_name["slow"].record(0.001, True)
+
+        with pytest.raises(httpx.TimeoutException):
+            asyncio.run(registry.fetch("AI", 10, "en"))
+        assert slow.cancelled
+
+
+def _open_all_breakers():
+    for breaker in service.providers.breakers.values():
+        _trip(breaker)
+
+
+class TestBreakerFallback:
+    """While the breaker is open /news falls back to cache or fails fast."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_open_breaker_serves_cached_result(
+            self, mock_get, client, mock_gnews_response):
+        response = MagicMock()
+        response.json.return_value = mock_gnews_response
+        response.raise_for_status.return_value = None
+        mock_get.return_value = response
+        client.get("/news?query=AI&limit=1")
+        _open_all_breakers()
+
+        # A larger page is not covered, but any cached answer beats a 503
+        result = client.get("/news?query=AI&limit=5")
+
+        assert result.status_code == 200
+        assert result.headers["X-Cache-Status"] == "stale"
+        mock_get.assert_called_once()
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_open_breaker_without_cache_is_503(self, mock_get, client):
+        _open_all_breakers()
+
+        response = client.get("/news?query=AI")
+
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) > 0
+        mock_get.assert_not_called()
+        breaker = client.get("/").json()["routing"]["providers"]["gnews"]
+        assert breaker["breaker"]["state"] == OPEN
@@ -0,0 +1,172 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from news_app import service
+from news_app.cache import TTLCache
+
+
+class TestTTLCache:
+    """Unit tests for the bounded TTL + LRU cache."""
+
+    def test_entries_expire_after_ttl(self, clock):
+        cache = TTLCache(ttl=10, max_entries=10, max_bytes=1000, clock=clock)
+        cache.set("k", "v", size=1)
+
+        assert cache.get("k") == "v"
+        clock.now = 10
+        assert cache.get("k") is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["expirations"] == 1
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = TTLCache(ttl=60, max_entries=2, max_bytes=1000)
+        cache.set("a", 1, size=1)
+        cache.set("b", 2, size=1)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3, size=1)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_lru_eviction_by_byte_size(self):
+        cache = TTLCache(ttl=60, max_entries=10, max_bytes=100)
+        cache.set("a", 1, size=60)
+        cache.set("b", 2, size=60)
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 60
+        assert cache.stats()["evictions"] == 1
+
+
+class TestResponseCache:
+    """The /news route is served from cache for equivalent requests."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_repeated_query_hits_cache(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        first = client.get("/news?query=AI&limit=10")
+        second = client.get("/news?query=%20ai%20&limit=10")
+
+        assert first.status_code == second.status_code == 200
+        assert second.json()["articles"] == first.json()["articles"]
+        assert second.json()["query"] == " ai "
+        mock_requests.assert_called_once()
+        assert client.get("/").json()["cache"]["hits"] == 1
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_smaller_limit_and_other_sort_served_from_cache(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        client.get("/news?query=AI&limit=10")
+        response = client.get("/news?query=AI&limit=1&sort_by=title")
+
+        data = response.json()
+        assert data["total"] == 1
+        assert data["articles"][0]["title"].startswith("AI Technology")
+        mock_requests.assert_called_once()
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_larger_limit_goes_upstream(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        client.get("/news?query=AI&limit=1")
+        client.get("/news?query=AI&limit=5")
+
+        assert mock_requests.call_count == 2
+        assert mock_requests.call_args[1]["params"]["max"] == 5
+        key = service.cache_key("AI", "en")
+        assert asyncio.run(service.load_cached(key)).limit == 5
+
+
+async def _rewind(query, seconds):
+    """Pretend the cached result for ``query`` was fetched earlier."""
+    key = service.cache_key(query, "en")
+    cached = await service.load_cached(key)
+    cached.fetched_at -= seconds
+    await service.store_cached(key, cached)
+
+
+def _age_entry(query, seconds):
+    asyncio.run(_rewind(query, seconds))
+
+
+class TestStaleWhileRevalidate:
+    """Expired entries are served stale while refreshing in the background."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_cache_status_headers(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        first = client.get("/news?query=AI")
+        second = client.get("/news?query=AI")
+
+        assert first.headers["X-Cache-Status"] == "revalidated"
+        assert second.headers["X-Cache-Status"] == "fresh"
+        assert "stale-while-revalidate" in second.headers["Cache-Control"]
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_expired_entry_served_stale_and_refreshed(
+            self, mock_requests, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        async def run():
+            await service.fetch_news("AI", 10, "publishedAt", "en")
+            await _rewind("AI", service.policy.ttl + 1)
+            stale = await service.fetch_news("AI", 10, "publishedAt", "en")
+            await service.drain()
+            fresh = await service.fetch_news("AI", 10, "publishedAt", "en")
+            return stale, fresh
+
+        stale, fresh = asyncio.run(run())
+
+        assert stale.cache_status == "stale"
+        assert stale.age >= service.policy.ttl
+        assert fresh.cache_status == "fresh"
+        assert mock_requests.call_count == 2
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_stale_if_error_instead_of_502(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+        client.get("/news?query=AI")
+        policy = service.policy
+        _age_entry("AI", policy.ttl + policy.stale_while_revalidate + 1)
+        mock_requests.side_effect = httpx.TimeoutException("slow")
+
+        response = client.get("/news?query=AI")
+
+        assert response.status_code == 200
+        assert response.headers["X-Cache-Status"] == "stale"
+        assert response.json()["total"] == 2
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_error_after_stale_if_error_window(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+        client.get("/news?query=AI")
+        _age_entry("AI", service.policy.retention)
+        mock_requests.side_effect = httpx.TimeoutException("slow")
+
+        response = client.get("/news?query=AI")
+
+        assert response.status_code == 504
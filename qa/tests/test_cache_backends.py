@@ -0,0 +1,207 @@
+import asyncio
+import fnmatch
+import time
+
+import pytest
+
+from news_app.cache import (
+    MemoryBackend,
+    RedisBackend,
+    SQLiteBackend,
+    build_backend,
+)
+from news_app.cache.redis import encode_command, read_reply
+from news_app.service import CachedResult
+
+
+class RedisStandIn:
+    """Minimal in-process RESP server implementing GET/SET/DEL/SCAN."""
+
+    def __init__(self):
+        self.data = {}
+        self.server = None
+        # Keys whose GET is answered only after this many seconds
+        self.slow = {}
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                args = await read_reply(reader)
+                if args[0].upper() == b"GET" and args[1] in self.slow:
+                    await asyncio.sleep(self.slow[args[1]])
+                writer.write(self._dispatch(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+
+    def _live(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def _dispatch(self, args):
+        command = args[0].upper()
+        if command == b"GET":
+            value = self._live(args[1])
+            if value is None:
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET":
+            expires_at = None
+            if len(args) == 5 and args[3].upper() == b"PX":
+                expires_at = time.time() + int(args[4]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            removed = sum(self.data.pop(k, None) is not None for k in args[1:])
+            return b":%d\r\n" % removed
+        if command == b"SCAN":
+            pattern = args[3].decode()
+            keys = [k for k in self.data
+                    if fnmatch.fnmatch(k.decode(), pattern)]
+            return b"*2\r\n$1\r\n0\r\n" + encode_command(*keys)
+        return b"-ERR unknown command\r\n"
+
+
+class TestCacheBackends:
+    """Every backend stores bytes with expiry and reports stats."""
+
+    def test_memory_backend_round_trip(self):
+        backend = MemoryBackend(max_entries=10, max_bytes=100)
+
+        async def run():
+            await backend.set("k", b"value", ttl=60)
+            return await backend.get("k"), await backend.get("missing")
+
+        assert asyncio.run(run()) == (b"value", None)
+        assert backend.stats()["bytes"] == 5
+
+    def test_sqlite_backend_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        worker_a = SQLiteBackend(path, max_entries=10, max_bytes=1000)
+        worker_b = SQLiteBackend(path, max_entries=10, max_bytes=1000)
+
+        async def run():
+            await worker_a.set("k", b"shared", ttl=60)
+            return await worker_b.get("k")
+
+        assert asyncio.run(run()) == b"shared"
+        assert worker_b.stats()["hits"] == 1
+
+    def test_sqlite_backend_expiry_and_lru(self, tmp_path):
+        now = [1000.0]
+        backend = SQLiteBackend(str(tmp_path / "c.sqlite3"), max_entries=2,
+                                max_bytes=1000, clock=lambda: now[0])
+
+        async def run():
+            await backend.set("a", b"1", ttl=10)
+            now[0] += 1
+            await backend.set("b", b"2", ttl=10)
+            now[0] += 1
+            await backend.get("a")  # "b" is now least recently used
+            now[0] += 1
+            await backend.set("c", b"3", ttl=10)
+            evicted = await backend.get("b")
+            now[0] += 20
+            expired = await backend.get("a")
+            return evicted, expired
+
+        assert asyncio.run(run()) == (None, None)
+        assert backend.stats()["evictions"] == 1
+
+    def test_sqlite_backend_batches_access_times(self, tmp_path):
+        path = str(tmp_path / "c.sqlite3")
+        backend = SQLiteBackend(path, max_entries=10, max_bytes=1000,
+                                touch_batch=3)
+
+        async def run():
+            for key in "abc":
+                await backend.set(key, b"12345", ttl=60)
+            await backend.set("a", b"123", ttl=60)
+            await backend.delete("c")
+            noted = []
+            for key in "aab":
+                await backend.get(key)
+                noted.append(len(backend._touched))
+            await backend.set("d", b"1", ttl=60)
+            await backend.get("d")
+            return noted
+
+        # Hits are noted in memory until the batch is full
+        assert asyncio.run(run()) == [1, 1, 2]
+        stats = backend.stats()
+        assert (stats["entries"], stats["bytes"]) == (3, 9)
+        # Another process opening the file reads the same totals
+        assert SQLiteBackend(path, 10, 1000).stats()["bytes"] == 9
+        assert len(backend._touched) == 0
+
+    def test_redis_backend_against_stand_in(self):
+        stand_in = RedisStandIn()
+
+        async def run():
+            backend = RedisBackend(await stand_in.start())
+            await backend.set("k", b"\x00binary", ttl=60)
+            value = await backend.get("k")
+            await backend.clear()
+            cleared = await backend.get("k")
+            await backend.close()
+            await stand_in.stop()
+            return value, cleared
+
+        assert asyncio.run(run()) == (b"\x00binary", None)
+        assert list(stand_in.data) == []
+
+    def test_cancelled_redis_call_leaves_no_reply_behind(self):
+        stand_in = RedisStandIn()
+        stand_in.slow[b"gnews:a"] = 0.2
+
+        async def run():
+            backend = RedisBackend(await stand_in.start())
+            await backend.set("a", b"value-of-a", ttl=60)
+            await backend.set("b", b"value-of-b", ttl=60)
+            pending = asyncio.ensure_future(backend.get("a"))
+            await asyncio.sleep(0.05)
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+            await asyncio.sleep(0.3)  # the reply to "a" has arrived
+            value = await backend.get("b")
+            await backend.close()
+            await stand_in.stop()
+            return value
+
+        assert asyncio.run(run()) == b"value-of-b"
+
+    def test_redis_backend_unavailable_is_a_miss(self):
+        backend = RedisBackend("redis://127.0.0.1:1/0", timeout=0.5)
+
+        assert asyncio.run(backend.get("k")) is None
+        assert backend.stats()["errors"] == 1
+
+    def test_build_backend_from_environment(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("NEWS_CACHE_BACKEND", "sqlite")
+        monkeypatch.setenv("NEWS_CACHE_PATH", str(tmp_path / "c.sqlite3"))
+        assert isinstance(build_backend(), SQLiteBackend)
+
+        monkeypatch.setenv("NEWS_CACHE_BACKEND", "bogus")
+        with pytest.raises(ValueError):
+            build_backend()
+
+    def test_cached_result_serialization(self):
+        result = CachedResult([{"title": "T", "url": "u"}], 5, 123.0)
+
+        decoded = CachedResult.from_bytes(result.to_bytes())
+
+        assert decoded == result
+        assert CachedResult.from_bytes(b"garbage") is None
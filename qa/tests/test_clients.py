@@ -0,0 +1,125 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from news_app import clients, ratelimit
+from news_app.clients import Client, ClientRegistry, parse_clients
+from news_app.ratelimit import (
+    DailyBudget, FairQueue, TokenBucket, UpstreamLimiter)
+
+
+def _registry():
+    return ClientRegistry([Client("alice", "alice-key", rate=0.1),
+                           Client("bob", "bob-key", rate=0.1)], burst=2)
+
+
+class TestParseClients:
+    """NEWS_CLIENTS entries are name:key[:rate[:weight]]."""
+
+    def test_defaults_and_overrides(self):
+        parsed = parse_clients("dashboard:s3cret:10:2, job:t0ken", 5.0)
+
+        assert parsed == [Client("dashboard", "s3cret", 10.0, 2.0),
+                          Client("job", "t0ken", 5.0, 1.0)]
+
+    @pytest.mark.parametrize("spec", ["nokey", "a:k:fast", "a:k:1:0"])
+    def test_invalid_entries(self, spec):
+        with pytest.raises(ValueError):
+            parse_clients(spec)
+
+
+class TestClientAuth:
+    """Configured clients authenticate and are throttled one by one."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_missing_or_unknown_key_rejected(self, mock_get, client, upstream):
+        upstream(mock_get, {"articles": []})
+        with patch.object(clients, "registry", _registry()):
+            missing = client.get("/news?query=AI")
+            unknown = client.get("/news?query=AI",
+                                 headers={"X-API-Key": "guess"})
+            known = client.get("/news?query=AI",
+                               headers={"X-API-Key": "alice-key"})
+
+        assert missing.status_code == unknown.status_code == 401
+        assert missing.headers["WWW-Authenticate"] == "ApiKey"
+        assert known.status_code == 200
+        assert known.headers["Cache-Control"].startswith("private, ")
+        assert "private" not in client.get(
+            "/news?query=AI").headers["Cache-Control"]
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_noisy_client_throttled_alone(self, mock_get, client, upstream):
+        upstream(mock_get, {"articles": []})
+        registry = _registry()
+        with patch.object(clients, "registry", registry):
+            statuses = [client.get("/news?query=AI",
+                                   headers={"X-API-Key": "alice-key"})
+                        for _ in range(3)]
+            other = client.get("/news?query=AI",
+                               headers={"X-API-Key": "bob-key"})
+
+        assert [r.status_code for r in statuses] == [200, 200, 429]
+        assert int(statuses[2].headers["Retry-After"]) > 0
+        assert other.status_code == 200
+        assert registry.stats()["clients"]["alice"]["throttled"] == 1
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_batch_costs_one_request_per_query(
+            self, mock_get, client, upstream):
+        upstream(mock_get, {"articles": []})
+        batch = {"queries": [{"query": "AI"}, {"query": "climate"}]}
+        with patch.object(clients, "registry", _registry()):
+            first = client.post("/news/batch", json=batch,
+                                headers={"X-API-Key": "alice-key"})
+            second = client.get("/news?query=AI",
+                                headers={"X-API-Key": "alice-key"})
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+
+    def test_open_without_configured_clients(self, client):
+        assert not clients.registry.enabled
+        assert client.get("/").json()["clients"]["enabled"] is False
+
+
+class TestFairQueue:
+    """Queued upstream calls are admitted in weighted fair order."""
+
+    def test_light_client_not_stuck_behind_heavy_one(self):
+        limiter = UpstreamLimiter(TokenBucket(rate=50, burst=1),
+                                  DailyBudget(limit=0), max_wait=1.0)
+        order = []
+
+        async def call(name, weight=1.0):
+            ratelimit.charge_to(name, weight)
+            await limiter.acquire()
+            order.append(name)
+
+        async def run():
+            heavy = [asyncio.ensure_future(call("heavy")) for _ in range(4)]
+            await asyncio.sleep(0)
+            light = asyncio.ensure_future(call("light"))
+            await asyncio.gather(*heavy, light)
+
+        asyncio.run(run())
+
+        assert order.index("light") <= 2
+        assert limiter.stats()["waiting"] == 0
+
+    def test_weights_share_slots(self):
+        queue = FairQueue()
+
+        async def tags():
+            return ([queue.enter("gold", 2.0)[0] for _ in range(2)],
+                    queue.enter("basic", 1.0)[0])
+
+        gold, basic = asyncio.run(tags())
+
+        assert gold == [0.5, 1.0]
+        assert basic == 1.0
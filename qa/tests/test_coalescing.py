@@ -0,0 +1,80 @@
+import asyncio
+import os
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from news_app import service
+from news_app.singleflight import SingleFlight
+
+
+def _slow_upstream(payload, calls, error=None):
+    """Build an async upstream stand-in that takes a moment to answer."""
+    async def fake_get(url, **kwargs):
+        calls.append(kwargs["params"])
+        await asyncio.sleep(0.05)
+        if error is not None:
+            raise error
+        response = MagicMock()
+        response.json.return_value = payload
+        response.raise_for_status.return_value = None
+        return response
+    return fake_get
+
+
+class TestSingleFlight:
+    """Concurrent identical fetches share one upstream request."""
+
+    def test_concurrent_calls_share_one_result(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(
+                *(flights.do("k", work) for _ in range(5)))
+
+        assert asyncio.run(run()) == ["result"] * 5
+        assert len(calls) == 1
+        assert flights.stats() == {
+            "in_flight": 0, "leaders": 1, "coalesced": 4}
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_concurrent_news_requests_coalesce(self, mock_gnews_response):
+        calls = []
+        fake = _slow_upstream(mock_gnews_response, calls)
+
+        async def run():
+            return await asyncio.gather(
+                *(service.fetch_news("AI", 10, "publishedAt", "en")
+                  for _ in range(10)))
+
+        with patch('news_app.providers.gnews.http.get', side_effect=fake):
+            results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(r.body["total"] == 2 for r in results)
+        assert service.flights.stats()["coalesced"] == 9
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_upstream_error_is_shared(self, mock_gnews_response):
+        calls = []
+        fake = _slow_upstream(mock_gnews_response, calls,
+                              error=httpx.ConnectError("down"))
+
+        async def run():
+            return await asyncio.gather(
+                *(service.fetch_news("AI", 10, "publishedAt", "en")
+                  for _ in range(3)), return_exceptions=True)
+
+        with patch('news_app.providers.gnews.http.get', side_effect=fake):
+            results = asyncio.run(run())
+
+        # One shared lookup, retried as a transient failure
+        assert len(calls) == service.providers.retry.attempts
+        assert all(isinstance(r, httpx.HTTPError) for r in results)
+        assert service.flights.stats()["in_flight"] == 0
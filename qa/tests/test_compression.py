@@ -0,0 +1,149 @@
+import gzip
+import json
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from news_app import api, compression, encoding
+from news_app.compression import ResponseEncoder
+
+
+def _gnews_articles(count):
+    return {"articles": [{
+        "title": f"Headline {i} about artificial intelligence",
+        "description": "A few sentences summarizing the story. " * 3,
+        "url": f"https://news.example.com/story-{i}",
+        "image": f"https://images.example.com/{i}.jpg",
+        "publishedAt": f"2025-01-{i + 1:02d}T00:00:00Z",
+        "source": {"name": "Example News"},
+    } for i in range(count)]}
+
+
+class TestNegotiation:
+    """Accept-Encoding and Accept pick the coding and format."""
+
+    def test_content_coding(self):
+        assert compression.negotiate("gzip, deflate") == "gzip"
+        assert compression.negotiate("gzip;q=0, identity") is None
+        assert compression.negotiate("*;q=0.5") == next(
+            iter(compression.CODECS))
+        assert compression.negotiate(None) is None
+
+    def test_format(self):
+        assert encoding.negotiate(None) == encoding.JSON
+        assert encoding.negotiate("*/*") == encoding.JSON
+        assert encoding.negotiate("text/html") == encoding.JSON
+        expected = (encoding.MSGPACK if encoding.msgpack is not None
+                    else encoding.JSON)
+        assert encoding.negotiate(
+            "application/json;q=0.5, application/x-msgpack") == expected
+        assert encoding.negotiate(
+            "application/msgpack", formats=(encoding.JSON,)) == encoding.JSON
+
+
+class TestResponseEncoder:
+    """Size threshold and caching of compressed representations."""
+
+    def test_small_bodies_sent_as_is(self):
+        encoder = ResponseEncoder(min_size=1024)
+
+        content, coding = encoder.render({"total": 0}, encoding.JSON, "gzip")
+
+        assert (content, coding) == (b'{"total":0}', None)
+
+    def test_compressed_once_per_key(self):
+        encoder = ResponseEncoder(min_size=10)
+        body = {"articles": ["x" * 100] * 10}
+
+        first = encoder.render(body, encoding.JSON, "gzip", key="etag")
+        second = encoder.render(body, encoding.JSON, "gzip", key="etag")
+
+        assert first == second
+        assert json.loads(gzip.decompress(first[0])) == body
+        assert (encoder.hits, encoder.misses, encoder.compressed) == (1, 1, 1)
+
+    def test_cache_bounded_by_bytes(self):
+        encoder = ResponseEncoder(min_size=0, cache_bytes=100)
+        body = {"articles": ["x" * 1000]}
+
+        for key in range(5):
+            encoder.render(body, encoding.JSON, "gzip", key=key)
+
+        assert encoder.stats()["cached_bytes"] <= 100
+
+    @pytest.mark.parametrize("coding,module", [("br", "brotli"),
+                                               ("zstd", "zstandard")])
+    def test_optional_codings(self, coding, module):
+        codec = pytest.importorskip(module)
+        encoder = ResponseEncoder(min_size=10)
+        body = {"articles": ["x" * 100] * 10}
+
+        content, applied = encoder.render(body, encoding.JSON, coding)
+
+        assert applied == coding
+        if coding == "br":
+            assert json.loads(codec.decompress(content)) == body
+        else:
+            decompressor = codec.ZstdDecompressor()
+            assert json.loads(decompressor.decompress(content)) == body
+
+
+class TestNewsEncoding:
+    """/news compresses large bodies and offers binary formats."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_large_response_gzipped_and_cached(
+            self, mock_get, client, upstream):
+        upstream(mock_get, _gnews_articles(20))
+
+        first = client.get("/news?query=AI",
+                           headers={"Accept-Encoding": "gzip"})
+        second = client.get("/news?query=AI",
+                            headers={"Accept-Encoding": "gzip"})
+
+        assert first.headers["Content-Encoding"] == "gzip"
+        assert first.headers["Vary"] == "Accept, Accept-Encoding"
+        assert first.json()["total"] == 20
+        assert second.content == first.content
+        assert api.responses.hits == 1
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_uncompressed_without_accept_encoding(
+            self, mock_get, client, upstream):
+        upstream(mock_get, _gnews_articles(20))
+
+        response = client.get("/news?query=AI",
+                              headers={"Accept-Encoding": "identity"})
+
+        assert "Content-Encoding" not in response.headers
+        assert response.json()["total"] == 20
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_msgpack(self, mock_get, client, upstream):
+        msgpack = pytest.importorskip("msgpack")
+        upstream(mock_get, _gnews_articles(3))
+
+        response = client.get("/news?query=AI",
+                              headers={"Accept": "application/msgpack"})
+
+        assert response.headers["content-type"] == encoding.MSGPACK
+        assert msgpack.unpackb(response.content)["total"] == 3
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_arrow_stream(self, mock_get, client, upstream):
+        pyarrow = pytest.importorskip("pyarrow")
+        import pyarrow.ipc
+        upstream(mock_get, _gnews_articles(3))
+
+        response = client.get("/news?query=AI",
+                              headers={"Accept": encoding.ARROW})
+
+        table = pyarrow.ipc.open_stream(response.content).read_all()
+        assert table.num_rows == 3
+        assert table.column_names == list(encoding.ARTICLE_COLUMNS)
+        assert json.loads(table.schema.metadata[b"query"]) == "AI"
@@ -0,0 +1,117 @@
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from news_app import service
+from news_app.dedupe import DuplicateIndex, MinHasher, shingles, similarity
+
+
+def _article(n, title, description, source="Example"):
+    return {"title": title, "url": f"https://example.com/{n}",
+            "description": description, "source": source,
+            "publishedAt": f"2025-01-1{n}T00:00:00Z", "urlToImage": ""}
+
+
+LAUNCH = ("Apple on Tuesday unveiled its latest iPhone featuring a faster "
+          "processor and improved camera.")
+STORY = [
+    _article(1, "Apple unveils new iPhone with faster chip", LAUNCH),
+    _article(2, "Apple unveils new iPhone with faster chip - Reuters",
+             LAUNCH, source="Reuters"),
+    _article(3, "Apple's new iPhone gets a faster chip",
+             LAUNCH.replace("iPhone", "iPhone,")),
+]
+OTHER = [
+    _article(4, "Samsung reports record profits",
+             "Samsung said quarterly profit hit a record on chip demand."),
+    _article(5, "Apple unveils new iPad",
+             "Apple on Tuesday unveiled a new iPad with a larger screen."),
+]
+
+
+class TestDuplicateIndex:
+    """MinHash LSH clustering of near-duplicate articles."""
+
+    def test_shingles_ignore_source_suffix_and_case(self):
+        assert shingles(STORY[0]) == shingles(STORY[1])
+
+    def test_signature_estimates_jaccard(self):
+        hasher = MinHasher()
+        a, b = (hasher.signature(shingles(x)) for x in (STORY[0], OTHER[0]))
+
+        assert similarity(a, a) == 1.0
+        assert similarity(a, b) < 0.3
+        assert hasher.signature(frozenset()) == ()
+
+    def test_syndicated_copies_share_cluster(self):
+        index = DuplicateIndex()
+
+        clusters = [index.assign(a) for a in STORY + OTHER]
+
+        assert clusters[:3] == [STORY[0]["url"]] * 3
+        assert clusters[3:] == [OTHER[0]["url"], OTHER[1]["url"]]
+        assert index.assign(STORY[2]) == STORY[0]["url"]
+        assert index.stats()["duplicates"] == 2
+
+    def test_dedupe_keeps_first_of_each_cluster(self):
+        index = DuplicateIndex()
+
+        unique = index.dedupe(OTHER[:1] + STORY)
+
+        assert unique == [OTHER[0], STORY[0]]
+
+    def test_oldest_articles_forgotten(self):
+        index = DuplicateIndex(capacity=2)
+        index.assign(STORY[0])
+        index.assign(OTHER[0])
+        index.assign(OTHER[1])
+
+        assert index.stats()["articles"] == 2
+        # The first copy was forgotten, so the next one starts a cluster
+        assert index.assign(STORY[1]) == STORY[1]["url"]
+
+    def test_copies_are_not_kept_as_candidates(self):
+        index = DuplicateIndex()
+        copies = [{**STORY[0], "url": f"https://example.com/copy/{n}"}
+                  for n in range(2000)]
+
+        clusters = {index.assign(a) for a in copies}
+
+        assert clusters == {copies[0]["url"]}
+        # Only the representative sits in the bands
+        assert {len(b) for b in index._buckets.values()} == {1}
+
+    def test_band_buckets_are_capped(self):
+        # Nothing is similar enough to join, so each copy is a cluster
+        index = DuplicateIndex(threshold=1.1, bucket_size=4)
+        copies = [{**STORY[0], "url": f"https://example.com/copy/{n}"}
+                  for n in range(10)]
+
+        for article in copies:
+            index.assign(article)
+
+        assert {len(b) for b in index._buckets.values()} == {4}
+        assert index.stats()["articles"] == 10
+
+
+class TestDedupeEndpoint:
+    """dedupe=true on /news and keeping copies out of the store."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_dedupe_returns_one_per_story(self, mock_get, client):
+        response = MagicMock()
+        response.json.return_value = {"articles": [
+            {**a, "source": {"name": a["source"]}, "image": ""}
+            for a in STORY + OTHER]}
+        response.raise_for_status.return_value = None
+        mock_get.return_value = response
+
+        plain = client.get("/news?query=apple").json()
+        deduped = client.get("/news?query=apple&dedupe=true").json()
+
+        assert plain["total"] == 5
+        assert [a["url"] for a in deduped["articles"]] == [
+            a["url"] for a in STORY[:1] + OTHER]
+        assert deduped["total"] == 3
+        assert service.store.stats()["articles"] == 3
+        mock_get.assert_called_once()
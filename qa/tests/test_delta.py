@@ -0,0 +1,112 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+from news_app import service
+
+
+class TestSince:
+    """since returns only articles newer than the client's last seen."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_only_newer_articles(
+            self, mock_get, client, mock_gnews_response, upstream):
+        upstream(mock_get, mock_gnews_response)
+
+        response = client.get(
+            "/news?query=AI&limit=2&since=2025-01-14T12:00:00Z")
+
+        data = response.json()
+        assert [a["publishedAt"] for a in data["articles"]] == [
+            "2025-01-15T10:00:00Z"]
+        assert data["total"] == 1
+        assert data["next_cursor"] is None
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_since_offset_normalized_to_utc(
+            self, mock_get, client, mock_gnews_response, upstream):
+        upstream(mock_get, mock_gnews_response)
+
+        # 08:00 UTC, just before the older article
+        response = client.get(
+            "/news", params={"query": "AI",
+                             "since": "2025-01-14T10:00:00+02:00"})
+
+        assert response.json()["total"] == 2
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_invalid_since_rejected(self, client):
+        response = client.get("/news?query=AI&since=yesterday")
+
+        assert response.status_code == 422
+
+    def test_since_filters_local_store(self, client):
+        asyncio.run(service.store.add([
+            {"title": "AI old", "url": "https://example.com/1",
+             "publishedAt": "2025-01-01T00:00:00Z"},
+            {"title": "AI new", "url": "https://example.com/2",
+             "publishedAt": "2025-01-03T00:00:00Z"},
+        ], "en"))
+
+        response = client.get("/news?query=AI&source=local"
+                              "&since=2025-01-02T00:00:00Z")
+
+        assert [a["title"] for a in response.json()["articles"]] == [
+            "AI new"]
+
+
+class TestConditionalRequests:
+    """ETag and If-None-Match give 304 when nothing changed."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_unchanged_result_is_304(
+            self, mock_get, client, mock_gnews_response, upstream):
+        upstream(mock_get, mock_gnews_response)
+
+        first = client.get("/news?query=AI")
+        etag = first.headers["ETag"]
+        second = client.get("/news?query=AI",
+                            headers={"If-None-Match": etag})
+
+        assert etag.startswith('W/"')
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == etag
+        assert second.headers["X-Cache-Status"] == "fresh"
+        mock_get.assert_called_once()
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_304_skips_encoding(
+            self, mock_get, client, mock_gnews_response, upstream):
+        upstream(mock_get, mock_gnews_response)
+        etag = client.get("/news?query=AI").headers["ETag"]
+
+        with patch.object(service.encoding, "dumps") as dumps, \
+                patch.object(service.encoding, "encode") as encode:
+            response = client.get("/news?query=AI",
+                                  headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        dumps.assert_not_called()
+        encode.assert_not_called()
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_changed_result_is_sent(
+            self, mock_get, client, mock_gnews_response, upstream):
+        upstream(mock_get, mock_gnews_response)
+
+        etag = client.get("/news?query=AI").headers["ETag"]
+        other = client.get("/news?query=AI&limit=1",
+                           headers={"If-None-Match": f'"x", {etag[2:]}'})
+        same = client.get("/news?query=AI",
+                          headers={"If-None-Match": f'"x", {etag[2:]}'})
+
+        assert other.status_code == 200
+        assert other.headers["ETag"] != etag
+        # Weak comparison ignores the W/ prefix
+        assert same.status_code == 304
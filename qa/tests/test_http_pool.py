@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from news_app.api import app
+from news_app.providers import http
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"articles": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Local keep-alive HTTP server standing in for the upstream."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+class TestHTTPPool:
+    """Shared upstream connection pool lifecycle and reuse stats."""
+
+    def test_connections_are_reused(self, local_server):
+        """Sequential requests share one keep-alive connection."""
+        async def run():
+            await http.startup()
+            try:
+                for _ in range(5):
+                    response = await http.get(local_server)
+                    assert response.status_code == 200
+            finally:
+                await http.close()
+
+        asyncio.run(run())
+
+        stats = http.pool_stats()
+        assert stats["requests"] == 5
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 4
+        assert stats["reuse_ratio"] == 0.8
+
+    def test_lifespan_opens_and_closes_client(self):
+        """The app lifespan owns the shared client."""
+        with TestClient(app) as client:
+            assert http._client is not None
+            assert not http._client.is_closed
+            data = client.get("/").json()
+            assert "reuse_ratio" in data["http_pool"]
+        assert http._client is None
+
+    def test_pool_limits_from_environment(self, monkeypatch):
+        """Pool size and keep-alive settings are configurable."""
+        monkeypatch.setenv("HTTP_POOL_SIZE", "7")
+        monkeypatch.setenv("HTTP_POOL_KEEPALIVE", "3")
+        monkeypatch.setenv("HTTP_KEEPALIVE_EXPIRY", "12.5")
+
+        limits = http.build_limits()
+
+        assert limits.max_connections == 7
+        assert limits.max_keepalive_connections == 3
+        assert limits.keepalive_expiry == 12.5
@@ -0,0 +1,105 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from news_app.providers import gnews, keys
+from news_app.providers.keys import KeyPool
+from news_app.ratelimit import RateLimited, UpstreamLimiter
+
+
+def _response(status, headers=None):
+    request = httpx.Request("GET", gnews.search_url())
+    return httpx.Response(status, json={"articles": []}, headers=headers,
+                          request=request)
+
+
+class TestKeyPool:
+    """Keys rotate by remaining quota and rest after 429/403."""
+
+    def test_calls_spread_across_keys(self):
+        pool = KeyPool(["key-one-1111", "key-two-2222"], daily_limit=10)
+
+        used = [pool.acquire().key for _ in range(4)]
+
+        assert used == ["key-one-1111", "key-two-2222"] * 2
+        assert [u["calls"] for u in pool.stats()["usage"]] == [2, 2]
+
+    def test_rate_limited_key_rests_for_retry_after(self):
+        now = [1000.0]
+        pool = KeyPool(["key-one-1111", "key-two-2222"], daily_limit=0,
+                       clock=lambda: now[0])
+        first = pool.acquire()
+
+        pool.report(first, 429, retry_after=30)
+
+        assert [pool.acquire().key for _ in range(2)] == ["key-two-2222"] * 2
+        now[0] += 30
+        assert pool.stats()["available"] == 2
+
+    def test_forbidden_key_rests_until_daily_reset(self):
+        now = [86400 * 10 + 100.0]
+        pool = KeyPool(["key-one-1111"], daily_limit=0,
+                       clock=lambda: now[0])
+
+        pool.report(pool.acquire(), 403)
+
+        with pytest.raises(RateLimited) as excinfo:
+            pool.acquire()
+        assert excinfo.value.retry_after == 86400 - 100
+        now[0] = 86400 * 11
+        assert pool.acquire().key == "key-one-1111"
+
+    def test_no_keys_configured(self):
+        with pytest.raises(ValueError):
+            KeyPool([]).acquire()
+
+    @patch.dict(os.environ, {"GNEWS_API_KEYS": "a-key-1111, b-key-2222",
+                             "GNEWS_DAILY_LIMIT": "50",
+                             "GNEWS_RATE_LIMIT": "1"})
+    def test_limits_scale_with_keys(self):
+        limiter = UpstreamLimiter.from_env()
+
+        assert len(keys.pool()) == 2
+        assert (limiter.budget.limit, limiter.bucket.rate) == (100, 2.0)
+
+
+class TestKeyRotation:
+    """A 429 from one key is retried with the next key of the pool."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEYS": "a-key-1111,b-key-2222"})
+    def test_retried_with_next_key(self, mock_get):
+        mock_get.side_effect = [_response(429, {"Retry-After": "60"}),
+                                _response(200)]
+
+        result = asyncio.run(gnews.fetch_async("AI", 10, "publishedAt", "en"))
+
+        tokens = [call.kwargs["params"]["token"]
+                  for call in mock_get.call_args_list]
+        assert tokens == ["a-key-1111", "b-key-2222"]
+        assert result["total"] == 0
+        assert keys.pool().stats()["usage"][0]["rate_limited"] == 1
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {}, clear=True)
+    def test_no_key_raises_before_calling(self, mock_get):
+        with pytest.raises(ValueError, match="GNEWS_API_KEY"):
+            asyncio.run(gnews.fetch_async("AI", 10, "publishedAt", "en"))
+
+        mock_get.assert_not_called()
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "only-key-1111"})
+    def test_all_keys_resting_returns_429(self, mock_get, client):
+        mock_get.return_value = _response(429, {"Retry-After": "60"})
+
+        first = client.get("/news?query=AI")
+        second = client.get("/news?query=climate")
+
+        assert first.status_code == 502
+        assert second.status_code == 429
+        assert mock_get.call_count == 1
+        assert client.get("/").json()["api_keys"]["available"] == 0
@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+
+from loadtest import (closed_loop, compare, fake_gnews_app, open_loop,
+                      percentile, summarize)
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                             base_url="http://upstream")
+
+
+class TestFakeGNews:
+    """The stand-in answers like GNews with the configured payloads."""
+
+    def test_search_payload(self):
+        app = fake_gnews_app(latency_ms=0, articles=5, description_bytes=50)
+
+        async def run():
+            async with _client(app) as client:
+                return await client.get("/search?q=AI&max=10&page=2")
+
+        response = asyncio.run(run())
+
+        articles = response.json()["articles"]
+        assert len(articles) == 5
+        assert articles[0]["url"].endswith("/AI/2/0")
+        assert len(articles[0]["description"]) <= 50
+
+    def test_errors(self):
+        app = fake_gnews_app(latency_ms=0, error_rate=1.0)
+
+        async def run():
+            async with _client(app) as client:
+                return await client.get("/search?q=AI")
+
+        assert asyncio.run(run()).status_code in (500, 502, 503)
+
+
+class TestLoadDriver:
+    """Closed and open loops, percentiles and baseline comparison."""
+
+    def test_closed_and_open_loops(self):
+        app = fake_gnews_app(latency_ms=1, latency_sigma=0, seed=1)
+        paths = iter(lambda: "/search?q=AI&max=1", None)
+
+        async def run():
+            async with _client(app) as client:
+                closed = await closed_loop(client, paths, 4, 0.1)
+                opened = await open_loop(client, paths, 100, 0.2)
+                return closed, opened
+
+        closed, opened = asyncio.run(run())
+
+        assert len(closed) > 4
+        assert 15 <= len(opened) <= 25
+        assert all(status == 200 for _, status in closed + opened)
+
+    def test_summary(self):
+        samples = [(i / 1000, 200) for i in range(1, 101)] + [(0.5, 0)]
+
+        report = summarize(samples, elapsed=2.0)
+
+        assert percentile([3, 1, 2], 0.5) == 2
+        assert report["latency_ms"]["p50"] == 51.0
+        assert report["latency_ms"]["p99"] == 100.0
+        assert report["statuses"] == {"200": 100, "error": 1}
+        assert report["throughput_rps"] == 50.5
+
+    def test_compare_flags_regressions(self):
+        base = {"latency_ms": {"p50": 10, "p95": 50, "p99": 100},
+                "throughput_rps": 100, "error_rate": 0.0}
+        same = {**base, "latency_ms": {"p50": 10.5, "p95": 54, "p99": 90}}
+        worse = {"latency_ms": {"p50": 10, "p95": 70, "p99": 100},
+                 "throughput_rps": 80, "error_rate": 0.01}
+
+        assert compare(same, base, 0.1) == []
+        assert compare(worse, base, 0.1) == [
+            "latency p95 50.0ms -> 70.0ms",
+            "throughput 100.0 -> 80.0 req/s",
+            "error rate 0.00% -> 1.00%",
+        ]
+        assert compare(worse, base, 0.5) == ["error rate 0.00% -> 1.00%"]
@@ -0,0 +1,115 @@
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from news_app.metrics import CONTENT_TYPE, Registry
+
+
+def _sample(text, series):
+    """Value of one ``name{labels}`` series in an exposition."""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class TestExposition:
+    """Prometheus text format of counters, gauges and histograms."""
+
+    def test_render(self):
+        registry = Registry()
+        calls = registry.counter("calls_total", "Calls", ("route",))
+        size = registry.gauge("size", "Size")
+        latency = registry.histogram("latency_seconds", "Latency",
+                                     buckets=(0.1, 1.0))
+        calls.inc(route='/a"b')
+        calls.inc(2, route='/a"b')
+        size.set(3)
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+
+        text = registry.render()
+
+        assert "# TYPE calls_total counter" in text
+        assert _sample(text, 'calls_total{route="/a\\"b"}') == 3.0
+        assert _sample(text, "size") == 3.0
+        assert _sample(text, 'latency_seconds_bucket{le="0.1"}') == 1
+        assert _sample(text, 'latency_seconds_bucket{le="1.0"}') == 2
+        assert _sample(text, 'latency_seconds_bucket{le="+Inf"}') == 3
+        assert _sample(text, "latency_seconds_sum") == 5.55
+        assert _sample(text, "latency_seconds_count") == 3
+
+    def test_collectors_read_at_scrape_time(self):
+        registry = Registry()
+        state = {"value": 1}
+        registry.collector(lambda: [("live", "gauge", "Live value",
+                                     [({}, state["value"])])])
+        state["value"] = 7
+
+        assert _sample(registry.render(), "live") == 7.0
+
+
+class TestInstrumentation:
+    """/metrics and Server-Timing for real requests."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_news_request_metrics(
+            self, mock_get, client, mock_gnews_response, upstream):
+        upstream(mock_get, mock_gnews_response)
+        client.get("/news?query=AI")
+        client.get("/news?query=AI")
+        client.get("/nowhere")
+
+        response = client.get("/metrics")
+
+        text = response.text
+        assert response.headers["content-type"] == CONTENT_TYPE
+        assert _sample(text, 'news_http_requests_total'
+                             '{route="/news",method="GET",status="200"}') == 2
+        assert _sample(text, 'news_http_requests_total'
+                             '{route="other",method="GET",status="404"}') == 1
+        assert _sample(text, 'news_http_request_duration_seconds_count'
+                             '{route="/news"}') == 2
+        assert _sample(text, 'news_http_requests_in_flight'
+                             '{route="/metrics"}') == 1
+        assert _sample(text, 'news_results_total'
+                             '{cache_status="revalidated"}') == 1
+        assert _sample(text, 'news_results_total'
+                             '{cache_status="fresh"}') == 1
+        assert _sample(text, 'news_provider_calls_total'
+                             '{provider="gnews",outcome="ok"}') == 1
+        assert _sample(text, 'news_provider_breaker_state'
+                             '{provider="gnews",state="closed"}') == 1
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_provider_errors_counted(self, mock_get, client):
+        mock_get.side_effect = httpx.HTTPStatusError(
+            "forbidden", request=MagicMock(), response=MagicMock(
+                status_code=403))
+
+        client.get("/news?query=AI")
+
+        text = client.get("/metrics").text
+        assert _sample(text, 'news_provider_calls_total'
+                             '{provider="gnews",outcome="error"}') == 1
+        assert _sample(text, 'news_http_requests_total'
+                             '{route="/news",method="GET",status="502"}') == 1
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_server_timing_stages(
+            self, mock_get, client, mock_gnews_response, upstream):
+        upstream(mock_get, mock_gnews_response)
+
+        miss = client.get("/news?query=AI").headers["Server-Timing"]
+        hit = client.get("/news?query=AI").headers["Server-Timing"]
+
+        stages = {entry.split(";")[0] for entry in miss.split(", ")}
+        assert {"cache", "upstream", "parse", "transform", "sort",
+                "encode", "total"} <= stages
+        # Served from the cache: no upstream stage
+        assert "upstream" not in hit
+        assert "total;dur=" in hit
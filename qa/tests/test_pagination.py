@@ -0,0 +1,68 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+from news_app import service
+
+
+class TestPagination:
+    """Cursor pagination over GNews pages with background prefetch."""
+
+    def test_cursor_round_trip(self):
+        cursor = service.encode_cursor(3, 10)
+        assert service.decode_cursor(cursor) == (3, 10)
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_full_page_has_next_cursor(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        full = client.get("/news?query=AI&limit=2").json()
+        partial = client.get("/news?query=space&limit=5").json()
+
+        assert service.decode_cursor(full["next_cursor"]) == (2, 2)
+        assert partial["next_cursor"] is None
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_cursor_maps_to_gnews_page(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+        cursor = service.encode_cursor(2, 2)
+
+        response = client.get(f"/news?query=AI&limit=20&cursor={cursor}")
+
+        assert response.status_code == 200
+        params = mock_requests.call_args_list[0][1]["params"]
+        assert (params["page"], params["max"]) == (2, 2)
+        next_cursor = response.json()["next_cursor"]
+        assert service.decode_cursor(next_cursor) == (3, 2)
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_invalid_cursor(self, client):
+        response = client.get("/news?cursor=not-a-cursor")
+        assert response.status_code == 422
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_next_pages_are_prefetched(
+            self, mock_requests, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        async def run():
+            await service.fetch_news("AI", 2, "publishedAt", "en", page=2)
+            await service.drain()
+            upstream_calls = mock_requests.call_count
+            third = await service.fetch_news("AI", 2, "publishedAt", "en",
+                                             page=3)
+            await service.drain()
+            return upstream_calls, third
+
+        upstream_calls, third = asyncio.run(run())
+
+        pages = sorted(call[1]["params"]["page"]
+                       for call in mock_requests.call_args_list)
+        assert upstream_calls == 1 + service.prefetch_pages
+        assert pages[:3] == [2, 3, 4]
+        assert third.cache_status == "fresh"
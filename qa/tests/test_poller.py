@@ -0,0 +1,99 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from news_app import service
+from news_app.api import app
+from news_app.poller import Topic, TopicPoller, parse_topics
+from news_app.ratelimit import DailyBudget, TokenBucket, UpstreamLimiter
+
+
+def _upstream(payload):
+    response = MagicMock()
+    response.json.return_value = payload
+    response.raise_for_status.return_value = None
+    return AsyncMock(return_value=response)
+
+
+class TestTopicSchedule:
+    """Topic parsing and fitting the schedule into the quota."""
+
+    def test_parse_topics(self):
+        topics = parse_topics("AI:en:120, climate change::600,elections:de,",
+                              default_interval=300)
+
+        assert topics == [Topic("AI", "en", 120),
+                          Topic("climate change", "en", 600),
+                          Topic("elections", "de", 300)]
+
+    def test_invalid_interval_rejected(self):
+        with pytest.raises(ValueError):
+            parse_topics("AI:en:soon")
+
+    def test_intervals_stretched_to_daily_budget(self):
+        limiter = UpstreamLimiter(TokenBucket(1, 5), DailyBudget(100), 2)
+        poller = TopicPoller([Topic("AI", "en", 300)], limiter,
+                             budget_share=0.5)
+
+        # 288 polls a day against 50 allowed
+        assert poller.stretch == pytest.approx(5.76)
+        assert poller.interval(poller.topics[0]) == pytest.approx(1728)
+        assert poller.gap == 2
+
+    def test_first_polls_are_staggered(self):
+        poller = TopicPoller([Topic(q, "en", 60) for q in "abc"])
+
+        assert poller.first_polls() == [0, 20, 40]
+
+
+class TestPolling:
+    """Polls warm the cache and the article store."""
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_warm_skips_recent_results(self, mock_gnews_response):
+        fake = _upstream(mock_gnews_response)
+
+        async def run():
+            first = await service.warm("AI", 20, "en", max_age=60)
+            second = await service.warm("AI", 20, "en", max_age=60)
+            return first, second
+
+        with patch('news_app.providers.gnews.http.get', fake):
+            assert asyncio.run(run()) == (True, False)
+        fake.assert_called_once()
+        assert service.store.stats()["articles"] == 2
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_poller_keeps_topics_warm(self, mock_gnews_response):
+        fake = _upstream(mock_gnews_response)
+        poller = TopicPoller([Topic("AI", "en", 0.05),
+                              Topic("climate", "en", 0.05)])
+
+        async def run():
+            poller.start()
+            await asyncio.sleep(0.2)
+            await poller.stop()
+            return [await service.load_cached(service.cache_key(q, "en"))
+                    for q in ("AI", "climate")]
+
+        with patch('news_app.providers.gnews.http.get', fake):
+            cached = asyncio.run(run())
+
+        assert all(entry is not None for entry in cached)
+        assert poller.polls + poller.skipped >= 3
+        assert poller.stats()["running"] is False
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key",
+                             "NEWS_POLL_TOPICS": "AI:en:3600"})
+    def test_lifespan_runs_poller(self, mock_gnews_response):
+        fake = _upstream(mock_gnews_response)
+
+        with patch('news_app.providers.gnews.http.get', fake):
+            with TestClient(app) as client:
+                stats = client.get("/").json()["poller"]
+
+        assert stats["running"] is True
+        assert stats["topics"] == 1
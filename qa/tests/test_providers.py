@@ -0,0 +1,152 @@
+import asyncio
+import os
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from news_app.providers.registry import ProviderRegistry
+from news_app.providers.rss import RSSProvider, parse_feed
+from news_app.providers.stats import ProviderStats
+
+RSS_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+<channel>
+  <item>
+    <title>Older story</title>
+    <link>https://example.com/old</link>
+    <description>Old</description>
+    <source url="https://example.com">Example</source>
+    <pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate>
+  </item>
+  <item>
+    <title>Newer story</title>
+    <link>https://example.com/new</link>
+    <pubDate>Tue, 02 Jan 2024 12:30:00 +0200</pubDate>
+    <media:content url="https://example.com/new.jpg"/>
+  </item>
+</channel>
+</rss>"""
+
+
+class TestRSSProvider:
+    """RSS feeds are normalized to the GNews article shape."""
+
+    def test_parse_feed_normalizes_and_sorts(self):
+        articles = parse_feed(RSS_FEED)
+
+        assert [a["title"] for a in articles] == [
+            "Newer story", "Older story"]
+        assert articles[0]["publishedAt"] == "2024-01-02T10:30:00Z"
+        assert articles[0]["urlToImage"] == "https://example.com/new.jpg"
+        assert articles[0]["source"] == "Unknown"
+        assert articles[1]["source"] == "Example"
+        assert articles[1]["url"] == "https://example.com/old"
+
+    def test_invalid_feed_raises_http_error(self):
+        with pytest.raises(httpx.HTTPError):
+            parse_feed(b"not xml")
+
+    @patch('news_app.providers.rss.http.get')
+    def test_fetch_slices_pages(self, mock_get):
+        response = MagicMock(content=RSS_FEED)
+        response.raise_for_status.return_value = None
+        mock_get.return_value = response
+
+        articles = asyncio.run(
+            RSSProvider().fetch("AI news", 1, "en", page=2))
+
+        assert [a["title"] for a in articles] == ["Older story"]
+        assert "q=AI+news" in mock_get.call_args[0][0]
+
+
+class TestProviderRegistry:
+    """Routing, hedging and failover across providers."""
+
+    def test_slow_primary_is_hedged(self, fake_provider):
+        slow = fake_provider("slow", delay=1.0)
+        fast = fake_provider("fast", delay=0.0)
+        registry = ProviderRegistry([slow, fast], hedge_after=0.02)
+
+        name, articles = asyncio.run(registry.fetch("AI", 10, "en"))
+
+        assert name == "fast"
+        assert articles == [{"title": "fast story"}]
+        assert slow.cancelled
+        assert registry.hedges == 1
+        assert registry.wins == {"slow": 0, "fast": 1}
+        # The cancelled call still counts against the slow provider
+        assert registry.stats_by_name["slow"].p95() >= 0.02
+
+    def test_fast_primary_is_not_hedged(self, fake_provider):
+        primary = fake_provider("primary")
+        backup = fake_provider("backup")
+        registry = ProviderRegistry([primary, backup], hedge_after=0.5)
+
+        name, _ = asyncio.run(registry.fetch("AI", 10, "en"))
+
+        assert name == "primary"
+        assert backup.calls == 0
+        assert registry.hedges == 0
+
+    def test_failed_primary_fails_over(self, fake_provider):
+        broken = fake_provider("broken", error=httpx.ConnectError("down"))
+        backup = fake_provider("backup")
+        registry = ProviderRegistry([broken, backup], hedge_after=0)
+
+        name, _ = asyncio.run(registry.fetch("AI", 10, "en"))
+
+        assert name == "backup"
+        assert registry.stats_by_name["broken"].error_rate() == 1.0
+
+    def test_all_failing_raises_primary_error(self, fake_provider):
+        first = httpx.TimeoutException("Request timeout")
+        registry = ProviderRegistry([
+            fake_provider("a", error=first),
+            fake_provider("b", error=httpx.ConnectError("down")),
+        ])
+
+        with pytest.raises(httpx.TimeoutException):
+            asyncio.run(registry.fetch("AI", 10, "en"))
+
+    def test_routes_to_lowest_score(self, fake_provider):
+        a, b = fake_provider("a"), fake_provider("b")
+        registry = ProviderRegistry([a, b])
+        for _ in range(10):
+            registry.stats_by_name["a"].record(0.5, True)
+            registry.stats_by_name["b"].record(0.1, True)
+
+        assert [p.name for p in registry.ranked()] == ["b", "a"]
+        name, _ = asyncio.run(registry.fetch("AI", 10, "en"))
+        assert name == "b"
+
+    def test_errors_inflate_score(self):
+        stats = ProviderStats()
+        stats.record(0.1, True)
+        stats.record(0.1, False)
+
+        assert stats.error_rate() == 0.5
+        assert stats.score() == pytest.approx(0.2)
+
+    @patch.dict(os.environ, {"NEWS_PROVIDERS": "rss, gnews",
+                             "NEWS_HEDGE_AFTER_MS": "250"})
+    def test_from_env(self):
+        registry = ProviderRegistry.from_env()
+
+        assert [p.name for p in registry.providers] == ["rss", "gnews"]
+        assert registry.hedge_after == 0.25
+
+    @patch.dict(os.environ, {"NEWS_PROVIDERS": "bing"})
+    def test_unknown_provider_rejected(self):
+        with pytest.raises(ValueError):
+            ProviderRegistry.from_env()
+
+
+class TestRoutingHealth:
+    """Routing stats are reported on the health endpoint."""
+
+    def test_root_reports_routing(self, client):
+        data = client.get("/").json()
+
+        assert "gnews" in data["routing"]["providers"]
+        assert data["routing"]["hedges"] == 0
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from news_app import service
+from news_app.ratelimit import (
+    DailyBudget,
+    QuotaFile,
+    RateLimited,
+    SharedDailyBudget,
+    SharedTokenBucket,
+    TokenBucket,
+    UpstreamLimiter,
+)
+
+
+class TestLimiter:
+    """Token bucket, daily budget and admission queueing."""
+
+    def test_token_bucket_refills_at_rate(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, burst=2, clock=lambda: now[0])
+
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == pytest.approx(0.5)
+        now[0] = 0.5
+        assert bucket.try_acquire() == 0
+
+    def test_daily_budget_resets_at_midnight_utc(self):
+        now = [86400 * 10 + 100.0]
+        budget = DailyBudget(limit=1, clock=lambda: now[0])
+
+        assert budget.try_consume()
+        assert not budget.try_consume()
+        assert budget.seconds_until_reset() == 86400 - 100
+        now[0] = 86400 * 11
+        assert budget.remaining == 1
+
+    def test_acquire_queues_briefly_then_rejects(self):
+        limiter = UpstreamLimiter(TokenBucket(rate=20, burst=1),
+                                  DailyBudget(limit=0), max_wait=0.1)
+
+        async def run():
+            await limiter.acquire()
+            await limiter.acquire()  # waits ~50ms for the next token
+            limiter.max_wait = 0
+            with pytest.raises(RateLimited) as excinfo:
+                await limiter.acquire()
+            return excinfo.value
+
+        error = asyncio.run(run())
+        assert error.retry_after > 0
+        assert limiter.stats()["queued"] == 1
+        assert limiter.stats()["rejected"] == 1
+
+    @pytest.mark.parametrize("shared", [False, True])
+    def test_rejected_by_budget_keeps_the_token(self, shared, tmp_path):
+        if shared:
+            quota = QuotaFile(str(tmp_path / "quota.sqlite3"))
+            bucket = SharedTokenBucket(quota, rate=0.01, burst=1)
+            budget = SharedDailyBudget(quota, limit=1)
+        else:
+            bucket, budget = TokenBucket(rate=0.01, burst=1), DailyBudget(1)
+        limiter = UpstreamLimiter(bucket, budget, max_wait=0)
+
+        async def run():
+            # Another caller takes the last of the day while this one queues
+            with patch.object(budget, "try_consume", return_value=False):
+                with pytest.raises(RateLimited) as excinfo:
+                    await limiter.acquire()
+            await limiter.acquire()
+            return excinfo.value
+
+        assert asyncio.run(run()).reason == "daily"
+        assert limiter.stats()["admitted"] == 1
+
+
+class TestSharedQuota:
+    """Workers pointing at one quota file draw from the same quota."""
+
+    def test_token_bucket_shared_between_instances(self, tmp_path):
+        now = [1000.0]
+        path = str(tmp_path / "quota.sqlite3")
+        first, second = (
+            SharedTokenBucket(QuotaFile(path), rate=2, burst=2,
+                              clock=lambda: now[0])
+            for _ in range(2))
+
+        assert first.try_acquire() == 0
+        assert second.try_acquire() == 0
+        assert first.try_acquire() == pytest.approx(0.5)
+        now[0] += 0.5
+        assert second.try_acquire() == 0
+
+    def test_daily_budget_shared_between_instances(self, tmp_path):
+        now = [86400 * 10 + 100.0]
+        path = str(tmp_path / "quota.sqlite3")
+        first = SharedDailyBudget(QuotaFile(path), limit=2,
+                                  clock=lambda: now[0])
+        assert first.try_consume()
+        # A worker starting later keeps the usage already recorded
+        second = SharedDailyBudget(QuotaFile(path), limit=2,
+                                   clock=lambda: now[0])
+
+        assert second.try_consume()
+        assert not first.try_consume()
+        assert (first.used, second.remaining) == (2, 0)
+        now[0] = 86400 * 11
+        assert first.remaining == 2
+
+    def test_acquire_reads_quota_file_off_the_event_loop(self, tmp_path):
+        quota = QuotaFile(str(tmp_path / "quota.sqlite3"))
+        limiter = UpstreamLimiter(SharedTokenBucket(quota, rate=5, burst=5),
+                                  SharedDailyBudget(quota, limit=5),
+                                  max_wait=1)
+        threads = set()
+        update = quota.update
+
+        def recording_update(*args):
+            threads.add(threading.current_thread())
+            return update(*args)
+
+        with patch.object(quota, "update", recording_update):
+            asyncio.run(limiter.acquire())
+
+        assert threads and threading.main_thread() not in threads
+        assert limiter.stats()["daily_remaining"] == 4
+
+    @patch.dict(os.environ, {"GNEWS_DAILY_LIMIT": "5"})
+    def test_from_env_uses_limiter_path(self, tmp_path):
+        path = str(tmp_path / "quota.sqlite3")
+        with patch.dict(os.environ, {"NEWS_LIMITER_PATH": path}):
+            first = UpstreamLimiter.from_env()
+            second = UpstreamLimiter.from_env()
+
+        asyncio.run(first.acquire())
+
+        assert isinstance(second.budget, SharedDailyBudget)
+        assert second.stats()["daily_remaining"] == 4
+
+
+class TestAdmissionControl:
+    """/news prefers the cache and fails fast with 429 when out of quota."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_exhausted_budget_returns_429(self, mock_requests, client):
+        service.limiter.budget.used = service.limiter.budget.limit
+
+        response = client.get("/news?query=AI")
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        mock_requests.assert_not_called()
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_exhausted_budget_serves_cached_result(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+        client.get("/news?query=AI&limit=1")
+        service.limiter.budget.used = service.limiter.budget.limit
+
+        # A larger limit would normally go upstream
+        response = client.get("/news?query=AI&limit=10")
+
+        assert response.status_code == 200
+        assert response.headers["X-Cache-Status"] == "stale"
+        mock_requests.assert_called_once()
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_health_reports_remaining_budget(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+        client.get("/news?query=AI")
+
+        budget = client.get("/").json()["upstream_budget"]
+
+        assert budget["daily_remaining"] == budget["daily_limit"] - 1
+        assert budget["admitted"] == 1
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from news_app import deadline
+from news_app.providers import gnews
+from news_app.providers.base import NewsProvider
+from news_app.providers.registry import ProviderRegistry
+from news_app.providers.retry import RetryBudget, RetryPolicy
+from news_app.providers.rss import RSSProvider
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <item><title>One</title><link>https://example.com/1</link></item>
+  <item><title>Two</title><link>https://example.com/2</link></item>
+</channel></rss>"""
+
+
+class FlakyProvider(NewsProvider):
+    """Provider stand-in that fails its first ``failures`` calls."""
+
+    name = "flaky"
+
+    def __init__(self, failures, error=None, delay=0.0):
+        self.failures = failures
+        self.error = error or httpx.ConnectError("reset")
+        self.delay = delay
+        self.calls = 0
+
+    async def fetch(self, query, limit, language, page=1):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise self.error
+        return [{"title": "recovered"}]
+
+
+def _status_error(code):
+    request = httpx.Request("GET", "https://gnews.io/api/v4/search")
+    response = httpx.Response(code, request=request)
+    return httpx.HTTPStatusError("status", request=request,
+                                 response=response)
+
+
+def _policy(**kwargs):
+    kwargs.setdefault("base", 0.001)
+    return RetryPolicy(**kwargs)
+
+
+class TestRetryPolicy:
+    """Backoff, retryable errors and the retry budget."""
+
+    def test_backoff_is_jittered_exponential_and_capped(self):
+        policy = RetryPolicy(base=0.1, cap=0.3, rng=lambda: 1.0)
+
+        assert [policy.backoff(n) for n in (1, 2, 3)] == [0.1, 0.2, 0.3]
+        assert RetryPolicy(rng=lambda: 0.0).backoff(5) == 0.0
+
+    def test_only_transient_errors_are_retryable(self):
+        assert RetryPolicy.retryable(httpx.ConnectError("reset"))
+        assert RetryPolicy.retryable(httpx.TimeoutException("slow"))
+        assert RetryPolicy.retryable(_status_error(503))
+        assert not RetryPolicy.retryable(_status_error(404))
+        assert not RetryPolicy.retryable(httpx.DecodingError("bad"))
+        assert not RetryPolicy.retryable(ValueError("no key"))
+
+    def test_budget_caps_retries_to_share_of_calls(self):
+        budget = RetryBudget(ratio=0.5, reserve=1.0)
+
+        assert budget.try_withdraw()
+        assert not budget.try_withdraw()
+        budget.deposit()
+        budget.deposit()
+        assert budget.try_withdraw()
+        assert (budget.retries, budget.denied) == (2, 1)
+
+
+class TestRegistryRetries:
+    """Provider calls are retried within budget and deadline."""
+
+    def test_transient_failure_is_retried(self):
+        provider = FlakyProvider(failures=2)
+        registry = ProviderRegistry([provider], retry=_policy(attempts=3))
+
+        name, articles = asyncio.run(registry.fetch("AI", 10, "en"))
+
+        assert articles == [{"title": "recovered"}]
+        assert provider.calls == 3
+        assert registry.stats()["retries"]["retries"] == 2
+        assert registry.stats_by_name["flaky"].errors == 2
+
+    def test_permanent_failure_is_not_retried(self):
+        provider = FlakyProvider(failures=1, error=_status_error(401))
+        registry = ProviderRegistry([provider], retry=_policy(attempts=3))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(registry.fetch("AI", 10, "en"))
+        assert provider.calls == 1
+
+    def test_exhausted_budget_stops_retries(self):
+        provider = FlakyProvider(failures=1)
+        policy = _policy(attempts=3, budget=RetryBudget(reserve=0.0))
+        registry = ProviderRegistry([provider], retry=policy)
+
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(registry.fetch("AI", 10, "en"))
+        assert provider.calls == 1
+        assert policy.budget.denied == 1
+
+    def test_backoff_past_deadline_is_not_attempted(self):
+        provider = FlakyProvider(failures=1)
+        policy = RetryPolicy(attempts=3, base=1.0, rng=lambda: 1.0)
+        registry = ProviderRegistry([provider], retry=policy)
+
+        async def run():
+            deadline.set_timeout(0.5)
+            return await registry.fetch("AI", 10, "en")
+
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(run())
+        assert provider.calls == 1
+
+    def test_deadline_bounds_provider_call(self):
+        provider = FlakyProvider(failures=0, delay=1.0)
+        registry = ProviderRegistry([provider])
+
+        async def run():
+            deadline.set_timeout(0.05)
+            return await registry.fetch("AI", 10, "en")
+
+        started = time.monotonic()
+        with pytest.raises(httpx.TimeoutException):
+            asyncio.run(run())
+        assert time.monotonic() - started < 0.5
+
+
+class TestDeadlineHeader:
+    """X-Request-Timeout bounds the whole /news request."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_client_deadline_returns_504(self, mock_get, client):
+        async def slow_get(url, **kwargs):
+            await asyncio.sleep(1.0)
+        mock_get.side_effect = slow_get
+
+        started = time.monotonic()
+        response = client.get("/news?query=AI",
+                              headers={"X-Request-Timeout": "0.1"})
+
+        assert response.status_code == 504
+        assert time.monotonic() - started < 0.8
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_invalid_deadline_rejected(self, client):
+        response = client.get("/news?query=AI",
+                              headers={"X-Request-Timeout": "0"})
+
+        assert response.status_code == 422
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_wrapped_upstream_error_keeps_type(self, mock_get):
+        mock_get.side_effect = httpx.ConnectError("refused")
+
+        with pytest.raises(httpx.ConnectError, match="Error fetching news"):
+            asyncio.run(gnews.fetch_async("AI", 10, "publishedAt", "en"))
+
+
+class TestRSSRetries:
+    """RSS feed failures keep their type, so transient ones are retried."""
+
+    @patch('news_app.providers.rss.http.get', new_callable=AsyncMock)
+    def test_feed_server_error_is_retried(self, mock_get):
+        request = httpx.Request("GET", "https://news.google.com/rss/search")
+        mock_get.side_effect = [
+            httpx.Response(503, request=request),
+            httpx.ConnectError("reset"),
+            httpx.Response(200, content=FEED, request=request),
+        ]
+        registry = ProviderRegistry([RSSProvider()],
+                                    retry=_policy(attempts=3))
+
+        name, articles = asyncio.run(registry.fetch("AI", 10, "en"))
+
+        assert (name, len(articles)) == ("rss", 2)
+        assert mock_get.call_count == 3
+        assert registry.stats()["retries"]["retries"] == 2
+
+    @patch('news_app.providers.rss.http.get', new_callable=AsyncMock)
+    def test_feed_not_found_is_not_retried(self, mock_get):
+        request = httpx.Request("GET", "https://news.google.com/rss/search")
+        mock_get.return_value = httpx.Response(404, request=request)
+        registry = ProviderRegistry([RSSProvider()],
+                                    retry=_policy(attempts=3))
+
+        with pytest.raises(httpx.HTTPStatusError, match="Error fetching feed"):
+            asyncio.run(registry.fetch("AI", 10, "en"))
+        assert mock_get.call_count == 1
@@ -0,0 +1,47 @@
+import os
+from unittest.mock import patch
+
+from news_app import server
+
+
+class TestServerConfig:
+    """Worker, limit and shared-state settings of the production server."""
+
+    @patch.dict(os.environ, {"NEWS_WORKERS": "4", "PORT": "9000",
+                             "NEWS_WORKER_CONCURRENCY": "200",
+                             "NEWS_BACKLOG": "512",
+                             "NEWS_DRAIN_TIMEOUT": "20"})
+    def test_uvicorn_options_from_env(self):
+        options = server.uvicorn_options()
+
+        assert options["workers"] == 4
+        assert options["port"] == 9000
+        assert options["limit_concurrency"] == 200
+        assert options["backlog"] == 512
+        assert options["timeout_graceful_shutdown"] == 20.0
+        assert options["loop"] in ("uvloop", "asyncio")
+
+    @patch.dict(os.environ, {"NEWS_WORKER_CONCURRENCY": "0"})
+    def test_zero_concurrency_means_unlimited(self):
+        assert server.uvicorn_options()["limit_concurrency"] is None
+
+    def test_single_worker_keeps_process_state(self):
+        assert server.shared_state_env(1) == {}
+
+    @patch.dict(os.environ, {"NEWS_CACHE_BACKEND": "redis"})
+    def test_workers_share_state_unless_configured(self):
+        env = server.shared_state_env(4)
+
+        assert "NEWS_CACHE_BACKEND" not in env
+        assert env["NEWS_POLL_IN_APP"] == "false"
+        assert env["NEWS_PUSH_IN_APP"] == "false"
+        assert env["NEWS_LIMITER_PATH"].endswith(".sqlite3")
+        assert env["NEWS_STORE_PATH"].endswith(".sqlite3")
+
+    def test_shared_files_in_given_directory(self, tmp_path):
+        env = server.shared_state_env(2, str(tmp_path))
+
+        assert {env[name] for name in ("NEWS_CACHE_PATH", "NEWS_LIMITER_PATH",
+                                       "NEWS_STORE_PATH")} == {
+            str(tmp_path / f"gnews-{kind}.sqlite3")
+            for kind in ("cache", "quota", "store")}
@@ -0,0 +1,146 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from news_app import service
+from news_app import store as store_module
+from news_app.store import ArticleStore, match_expression
+
+
+def _article(n, title, published, description=""):
+    return {"title": title, "url": f"https://example.com/{n}",
+            "description": description, "source": "Example",
+            "publishedAt": published, "urlToImage": ""}
+
+
+ARTICLES = [
+    _article(1, "Quantum chips ship", "2025-01-10T00:00:00Z",
+             "AI hardware news"),
+    _article(2, "AI beats benchmark", "2025-01-12T00:00:00Z",
+             "AI model tops AI leaderboard"),
+    _article(3, "ai regulation debate", "2025-01-11T00:00:00Z",
+             "Lawmakers discuss"),
+    _article(4, "Football results", "2025-01-13T00:00:00Z"),
+]
+
+
+def _search(store, query, **kwargs):
+    kwargs.setdefault("limit", 10)
+    return asyncio.run(store.search(query, "en", **kwargs))
+
+
+class TestArticleStore:
+    """Storage, dedup, retention and ranked search."""
+
+    def test_sorted_by_published_and_title(self):
+        store = ArticleStore()
+        asyncio.run(store.add(ARTICLES, "en"))
+
+        newest = _search(store, "AI", sort_by="publishedAt")
+        by_title = _search(store, "AI", sort_by="title")
+
+        assert [a["url"][-1] for a in newest] == ["2", "3", "1"]
+        assert [a["title"] for a in by_title] == [
+            "AI beats benchmark", "ai regulation debate",
+            "Quantum chips ship"]
+
+    def test_title_order_since_reads_the_title_index(self):
+        store = ArticleStore()
+        asyncio.run(store.add(ARTICLES, "en"))
+        since = "2025-01-10T12:00:00Z"
+
+        by_title = _search(store, "AI", sort_by="title", since=since)
+        sql = store_module._ORDERED_SEARCH.format(
+            index="articles_title_published",
+            order=store_module._ORDERS["title"][1],
+            since="AND a.published_at > ? ")
+        plan = store._db().execute(
+            "EXPLAIN QUERY PLAN " + sql, ("en", since, '"ai"', 10, 0))
+
+        assert [a["url"][-1] for a in by_title] == ["2", "3"]
+        assert not any("TEMP B-TREE" in row[3] for row in plan)
+
+    def test_relevance_prefers_title_matches(self):
+        store = ArticleStore()
+        asyncio.run(store.add(ARTICLES, "en"))
+
+        ranked = _search(store, "ai", sort_by="relevance")
+
+        assert ranked[-1]["title"] == "Quantum chips ship"
+        assert _search(store, "AI", limit=1, offset=3) == []
+
+    def test_dedup_by_url(self):
+        store = ArticleStore()
+        asyncio.run(store.add(ARTICLES, "en"))
+        updated = dict(ARTICLES[0], title="Quantum chips delayed")
+        asyncio.run(store.add([updated], "en"))
+
+        assert store.stats()["articles"] == len(ARTICLES)
+        assert _search(store, "ship") == []
+        assert _search(store, "delayed")[0]["url"] == updated["url"]
+
+    def test_retention_by_age_and_count(self, clock):
+        store = ArticleStore(max_age=60, max_articles=2, clock=clock)
+        asyncio.run(store.add(ARTICLES[:1], "en"))
+        clock.now += 61
+        asyncio.run(store.add(ARTICLES[1:], "en"))
+
+        # Article 1 expired; of the rest, the oldest published (3) is cut
+        assert store.stats()["articles"] == 2
+        assert {a["url"][-1] for a in _search(store, "football")} == {"4"}
+        assert {a["url"][-1] for a in _search(store, "benchmark")} == {"2"}
+
+    def test_language_and_operator_safety(self):
+        store = ArticleStore()
+        asyncio.run(store.add(ARTICLES, "de"))
+
+        assert _search(store, "AI") == []
+        assert match_expression('AI" OR NEAR(') == '"ai" "or" "near"'
+        assert match_expression("  !! ") is None
+
+
+class TestLocalSource:
+    """/news answers from the store with source=local or auto."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_fetched_articles_served_locally(
+            self, mock_get, client, mock_gnews_response, upstream):
+        upstream(mock_get, mock_gnews_response)
+        client.get("/news?query=AI")
+
+        response = client.get(
+            "/news?query=machine%20learning&source=local&limit=1")
+
+        data = response.json()
+        assert response.headers["X-Cache-Status"] == "local"
+        assert data["articles"][0]["title"] == "Machine Learning Advances"
+        assert data["next_cursor"] is None
+        mock_get.assert_called_once()
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_local_source_needs_no_api_key(self, client):
+        asyncio.run(service.store.add(ARTICLES, "en"))
+
+        response = client.get("/news?query=AI&source=local&limit=2")
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+        assert response.json()["next_cursor"] is not None
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_auto_falls_back_to_store(self, mock_get, client):
+        asyncio.run(service.store.add(ARTICLES, "en"))
+        mock_get.side_effect = httpx.HTTPStatusError(
+            "forbidden", request=MagicMock(), response=MagicMock(
+                status_code=403))
+
+        auto = client.get("/news?query=AI&source=auto")
+        upstream = client.get("/news?query=AI")
+
+        assert auto.status_code == 200
+        assert auto.headers["X-Cache-Status"] == "local"
+        assert upstream.status_code == 502
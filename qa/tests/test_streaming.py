@@ -0,0 +1,98 @@
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from news_app import encoding, streaming
+
+
+class TestStreaming:
+    """NDJSON and SSE response modes for /news and /news/batch."""
+
+    def test_negotiate(self):
+        assert streaming.negotiate("sse", None) == streaming.SSE
+        assert streaming.negotiate(
+            None, "application/x-ndjson;q=0.9, */*") == streaming.NDJSON
+        assert streaming.negotiate(None, "application/json") is None
+        assert streaming.negotiate(None, None) is None
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_news_ndjson_stream(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        response = client.get("/news?query=AI&stream=ndjson")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith(
+            "application/x-ndjson")
+        assert response.headers["X-Cache-Status"] == "revalidated"
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert [e["event"] for e in events] == ["article", "article", "end"]
+        assert events[0]["data"]["title"].startswith("AI Technology")
+        assert events[-1]["data"]["total"] == 2
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_news_sse_stream_via_accept(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        response = client.get("/news?query=AI",
+                              headers={"Accept": "text/event-stream"})
+
+        assert response.headers["content-type"].startswith(
+            "text/event-stream")
+        messages = response.text.strip().split("\n\n")
+        assert messages[0].startswith("event: article\ndata: {")
+        assert messages[-1].startswith("event: end\n")
+
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_batch_ndjson_stream(self, client, mock_gnews_response):
+        async def fake_get(url, params=None, **kwargs):
+            if params["q"] == "broken":
+                raise ValueError("bad payload")
+            response = MagicMock()
+            response.json.return_value = mock_gnews_response
+            return response
+
+        body = {"queries": [{"query": "AI"}, {"query": "broken"},
+                            {"query": "AI"}]}
+        with patch('news_app.providers.gnews.http.get',
+                   AsyncMock(side_effect=fake_get)):
+            response = client.post("/news/batch?stream=ndjson", json=body)
+
+        events = [json.loads(line) for line in response.text.splitlines()]
+        results = {e["data"]["index"]: e["data"]
+                   for e in events if e["event"] == "result"}
+        assert sorted(results) == [0, 1, 2]
+        assert results[0]["status"] == results[2]["status"] == 200
+        assert results[1]["status"] == 502
+        assert events[-1] == {"event": "end", "data": {
+            "total": 3, "succeeded": 2, "failed": 1}}
+
+
+class TestEncoding:
+    """Response bodies are encoded straight to compact JSON bytes."""
+
+    def test_stdlib_fallback_matches_orjson_output(self):
+        body = {"articles": [{"title": "Café – ünïcode", "url": "u"}],
+                "total": 1, "next_cursor": None}
+
+        with patch.object(encoding, "orjson", None):
+            fallback = encoding.dumps(body)
+
+        assert fallback == json.dumps(
+            body, ensure_ascii=False, separators=(",", ":")).encode()
+        assert json.loads(encoding.dumps(body)) == body
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_news_body_is_json_bytes(
+            self, mock_requests, client, mock_gnews_response, upstream):
+        upstream(mock_requests, mock_gnews_response)
+
+        response = client.get("/news?query=AI")
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == encoding.dumps(response.json())
@@ -0,0 +1,359 @@
+import asyncio
+import json
+import os
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from news_app import clients, service, subscriptions
+from news_app.subscriptions import PushHub, SubscriptionStore
+
+
+def _gnews(urls):
+    response = MagicMock()
+    response.json.return_value = {"articles": [{
+        "title": f"Story {url}",
+        "description": "",
+        "url": f"https://news.example.com/{url}",
+        "publishedAt": "2025-01-01T00:00:00Z",
+        "source": {"name": "Example"},
+    } for url in urls]}
+    response.raise_for_status.return_value = None
+    return response
+
+
+def _webhook_client(post):
+    client = MagicMock()
+    client.post = post
+    return client
+
+
+def _delivered(post):
+    return [json.loads(call.kwargs["content"]) for call in post.call_args_list]
+
+
+def _resolving(*addresses):
+    """Make every webhook host resolve to ``addresses``."""
+    return patch.object(subscriptions, "_addresses",
+                        AsyncMock(return_value=list(addresses)))
+
+
+async def _poll(hub):
+    """Fetch due topics now and wait for the resulting deliveries."""
+    hub._due.clear()
+    await service.cache.clear()
+    await hub.poll()
+    while hub._deliveries:
+        await asyncio.gather(*hub._deliveries)
+
+
+class TestPushHub:
+    """Topics are fetched once and only new articles are pushed."""
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_new_articles_pushed_once_per_topic(self, mock_get):
+        post = AsyncMock(return_value=httpx.Response(
+            200, request=httpx.Request("POST", "http://hook")))
+        hub = PushHub()
+        first = hub.subscribe("AI", callback_url="http://hook/1")
+        # Spelled differently, still the same topic
+        second = hub.subscribe(" ai ", callback_url="http://hook/2")
+
+        async def run():
+            mock_get.return_value = _gnews(["a", "b"])
+            await _poll(hub)
+            mock_get.return_value = _gnews(["c", "a", "b"])
+            await _poll(hub)
+
+        with patch.object(subscriptions.http, "get_client",
+                          return_value=_webhook_client(post)), \
+                _resolving("93.184.216.34"):
+            asyncio.run(run())
+
+        assert mock_get.call_count == 2
+        bodies = _delivered(post)
+        assert [call.args[0] for call in post.call_args_list] == [
+            "http://93.184.216.34/1", "http://93.184.216.34/2"]
+        assert post.call_args.kwargs["headers"]["Host"] == "hook"
+        assert [a["url"] for a in bodies[0]["articles"]] == [
+            "https://news.example.com/c"]
+        assert (hub.get(first.id).delivered,
+                hub.get(second.id).delivered) == (1, 1)
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_batches_and_retries(self, mock_get):
+        ok = httpx.Response(200, request=httpx.Request("POST", "http://h"))
+        post = AsyncMock(side_effect=[httpx.ConnectError("refused"), ok, ok])
+        hub = PushHub(batch_size=2, retry_base=0)
+        subscription = hub.subscribe("AI", callback_url="http://hook")
+
+        async def run():
+            mock_get.return_value = _gnews([])
+            await _poll(hub)
+            mock_get.return_value = _gnews(["a", "b", "c"])
+            await _poll(hub)
+            assert hub.stats()["retries_queued"] == 1
+            hub._retry_due()
+            await asyncio.gather(*hub._deliveries)
+
+        with patch.object(subscriptions.http, "get_client",
+                          return_value=_webhook_client(post)), \
+                _resolving("93.184.216.34"):
+            asyncio.run(run())
+
+        sizes = sorted(len(body["articles"]) for body in _delivered(post))
+        assert sizes == [1, 2, 2]
+        counters = hub.get(subscription.id)
+        assert (counters.delivered, counters.failed) == (2, 0)
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_websocket_skips_batches_past_backlog(self, mock_get):
+        hub = PushHub(batch_size=1, follow_interval=0)
+        subscription = hub.subscribe("AI")
+
+        async def run():
+            mock_get.return_value = _gnews([])
+            await _poll(hub)
+            stream = hub.follow(subscription)
+            first = asyncio.ensure_future(stream.__anext__())
+            while not hub._followers:
+                await asyncio.sleep(0.01)
+            mock_get.return_value = _gnews(["a", "b", "c"])
+            await _poll(hub)
+            return [await first, await stream.__anext__()]
+
+        with patch.object(subscriptions, "WEBSOCKET_BACKLOG", 2):
+            batches = asyncio.run(run())
+
+        assert [b["articles"][0]["url"][-1] for b in batches] == ["b", "c"]
+        assert batches[0]["subscription"] == subscription.id
+        counters = hub.get(subscription.id)
+        assert (counters.delivered, counters.dropped) == (1, 1)
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_websockets_share_one_reader(self, mock_get):
+        hub = PushHub(follow_interval=0.01)
+        readers = []
+        batches_after = hub.store.batches_after
+
+        def recording(seq):
+            readers.append(threading.current_thread())
+            return batches_after(seq)
+
+        async def run():
+            streams = [hub.follow(hub.subscribe("AI")) for _ in range(2)]
+            mock_get.return_value = _gnews([])
+            await _poll(hub)
+            pending = [asyncio.ensure_future(stream.__anext__())
+                       for stream in streams]
+            while len(hub._followers.get(("ai", "en"), ())) < 2:
+                await asyncio.sleep(0.01)
+            mock_get.return_value = _gnews(["a"])
+            await _poll(hub)
+            received = await asyncio.gather(*pending)
+            for stream in streams:
+                await stream.aclose()
+            return received
+
+        with patch.object(hub.store, "batches_after", recording):
+            received = asyncio.run(run())
+
+        assert [b["articles"][0]["url"][-1] for b in received] == ["a", "a"]
+        assert readers and threading.main_thread() not in readers
+        assert hub._followers == {}
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_workers_share_subscriptions(self, mock_get, tmp_path):
+        path = str(tmp_path / "store.sqlite3")
+        worker = PushHub(SubscriptionStore(path))
+        pusher = PushHub(SubscriptionStore(path))
+        post = AsyncMock(return_value=httpx.Response(
+            200, request=httpx.Request("POST", "http://hook")))
+        subscription = worker.subscribe("AI", callback_url="http://hook")
+
+        async def run():
+            mock_get.return_value = _gnews(["a"])
+            await _poll(pusher)
+            mock_get.return_value = _gnews(["a", "b"])
+            await _poll(pusher)
+
+        with patch.object(subscriptions.http, "get_client",
+                          return_value=_webhook_client(post)), \
+                _resolving("93.184.216.34"):
+            asyncio.run(run())
+
+        assert post.call_count == 1
+        assert worker.get(subscription.id).delivered == 1
+        assert worker.unsubscribe(subscription.id)
+        assert pusher.get(subscription.id) is None
+        assert pusher.stats()["topics"] == 0
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_deliveries_signed_with_subscription_secret(self, mock_get):
+        post = AsyncMock(return_value=httpx.Response(
+            200, request=httpx.Request("POST", "https://hook")))
+        hub = PushHub()
+        subscription = hub.subscribe("AI",
+                                     callback_url="https://hook.example/in")
+
+        async def run():
+            mock_get.return_value = _gnews([])
+            await _poll(hub)
+            mock_get.return_value = _gnews(["a"])
+            await _poll(hub)
+
+        with patch.object(subscriptions.http, "get_client",
+                          return_value=_webhook_client(post)), \
+                _resolving("93.184.216.34"):
+            asyncio.run(run())
+
+        call = post.call_args
+        headers = call.kwargs["headers"]
+        assert headers["X-News-Signature"] == subscriptions.sign(
+            subscription.secret, int(headers["X-News-Timestamp"]),
+            call.kwargs["content"])
+        assert call.kwargs["extensions"] == {"sni_hostname": "hook.example"}
+        assert headers["X-News-Signature"] != subscriptions.sign(
+            "other", int(headers["X-News-Timestamp"]),
+            call.kwargs["content"])
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_host_turning_private_is_refused(self, mock_get):
+        post = AsyncMock()
+        hub = PushHub(retry_base=0)
+        subscription = hub.subscribe("AI", callback_url="http://hook")
+
+        async def run():
+            mock_get.return_value = _gnews([])
+            await _poll(hub)
+            mock_get.return_value = _gnews(["a"])
+            await _poll(hub)
+
+        with patch.object(subscriptions.http, "get_client",
+                          return_value=_webhook_client(post)), \
+                _resolving("93.184.216.34", "169.254.169.254"):
+            asyncio.run(run())
+
+        post.assert_not_called()
+        assert hub.get(subscription.id).failed == 1
+        assert hub.stats()["retries_queued"] == 0
+
+    def test_stale_websocket_subscriptions_dropped(self):
+        now = [1000.0]
+        hub = PushHub(SubscriptionStore(clock=lambda: now[0]))
+        socket = hub.subscribe("AI")
+        hook = hub.subscribe("AI", callback_url="http://hook")
+
+        now[0] += subscriptions.STALE_AFTER + 1
+        hub.store.touch(socket.id)
+        assert hub.store.topics() == [("ai", "en")]
+        now[0] += subscriptions.STALE_AFTER + 1
+
+        assert hub.store.topics() == [("ai", "en")]
+        assert hub.get(socket.id) is None
+        assert hub.get(hook.id) is not None
+
+
+class TestSubscriptionAPI:
+    """Subscriptions are created, inspected and cancelled over HTTP."""
+
+    def test_webhook_lifecycle(self, client):
+        with patch.object(subscriptions.hub, "webhooks", True), \
+                _resolving("93.184.216.34"):
+            created = client.post("/subscriptions", json={
+                "query": "AI", "callback_url": "https://example.com/hook"})
+        subscription_id = created.json()["id"]
+
+        assert created.status_code == 201
+        assert created.json()["secret"]
+        assert "secret" not in client.get(
+            f"/subscriptions/{subscription_id}").json()
+        assert client.get(f"/subscriptions/{subscription_id}").json()[
+            "transport"] == "webhook"
+        assert client.get("/").json()["subscriptions"]["topics"] == 1
+        assert client.delete(
+            f"/subscriptions/{subscription_id}").status_code == 204
+        assert client.get(
+            f"/subscriptions/{subscription_id}").status_code == 404
+
+    def test_only_the_owner_sees_or_cancels(self, client):
+        registry = clients.ClientRegistry([
+            clients.Client("alice", "alice-key"),
+            clients.Client("bob", "bob-key")])
+        alice, bob = ({"X-API-Key": f"{name}-key"}
+                      for name in ("alice", "bob"))
+        with patch.object(clients, "registry", registry), \
+                patch.object(subscriptions.hub, "webhooks", True), \
+                _resolving("93.184.216.34"):
+            created = client.post("/subscriptions", headers=alice, json={
+                "query": "AI", "callback_url": "https://example.com/hook"})
+            url = f"/subscriptions/{created.json()['id']}"
+            statuses = [client.get(url, headers=bob).status_code,
+                        client.delete(url, headers=bob).status_code,
+                        client.get(url, headers=alice).status_code,
+                        client.delete(url, headers=alice).status_code]
+
+        assert statuses == [404, 404, 200, 204]
+
+    def test_callback_must_be_http(self, client):
+        response = client.post("/subscriptions", json={
+            "query": "AI", "callback_url": "file:///etc/passwd"})
+
+        assert response.status_code == 422
+
+    def test_webhooks_off_without_client_keys(self, client):
+        response = client.post("/subscriptions", json={
+            "query": "AI", "callback_url": "https://example.com/hook"})
+
+        assert not subscriptions.PushHub.from_env().webhooks
+        assert response.status_code == 403
+
+    @patch.dict(os.environ, {"NEWS_CLIENTS": "app:app-key"})
+    def test_webhooks_on_with_client_keys(self):
+        assert subscriptions.PushHub.from_env().webhooks
+
+    def test_internal_callbacks_refused(self, client):
+        urls = ["http://127.0.0.1:8000/admin", "http://[::1]/",
+                "http://169.254.169.254/latest/meta-data",
+                "http://10.0.0.5/hook", "http://[zz]/"]
+        with patch.object(subscriptions.hub, "webhooks", True):
+            statuses = [client.post("/subscriptions", json={
+                "query": "AI", "callback_url": url}).status_code
+                for url in urls]
+            with _resolving("192.168.1.10"):
+                named = client.post("/subscriptions", json={
+                    "query": "AI",
+                    "callback_url": "https://intranet.example.com/"})
+
+        assert statuses == [422] * 5
+        assert named.status_code == 422
+        assert "non-public" in named.json()["detail"]
+        assert subscriptions.hub.stats()["subscriptions"] == 0
+
+    @patch('news_app.providers.gnews.http.get', new_callable=AsyncMock)
+    @patch.dict(os.environ, {"GNEWS_API_KEY": "test_api_key"})
+    def test_websocket_receives_new_articles(self, mock_get, client):
+        hub = subscriptions.hub
+        mock_get.return_value = _gnews(["a"])
+
+        with patch.object(hub, "follow_interval", 0.01), \
+                client.websocket_connect("/subscriptions/ws?query=AI") as ws:
+            first = ws.receive_json()
+            assert first["transport"] == "websocket"
+            asyncio.run(_poll(hub))
+            mock_get.return_value = _gnews(["a", "b"])
+            asyncio.run(_poll(hub))
+            batch = ws.receive_json()
+
+        assert batch["subscription"] == first["id"]
+        assert [a["url"] for a in batch["articles"]] == [
+            "https://news.example.com/b"]
+        assert hub.get(first["id"]) is None